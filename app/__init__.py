@@ -10,4 +10,7 @@ def create_app(config=None):
     from app.routes.search import search_bp
     app.register_blueprint(search_bp)
 
+    from app.mirror.cli import mirror_cli
+    app.cli.add_command(mirror_cli)
+
     return app
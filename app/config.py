@@ -3,3 +3,46 @@ MAX_RESULTS = 500  # Limit to prevent performance issues
 DATATABLES_PAGE_SIZE = 25  # Default rows per page in DataTables
 API_BASE_URL = 'https://clinicaltrials.gov/api/v2/studies'
 API_PAGE_SIZE = 100  # Max per request for efficiency
+HTTP_POOL_CONNECTIONS = 4  # Number of per-host connection pools to keep
+HTTP_POOL_MAXSIZE = 16  # Keep-alive connections per host (>= WSGI threads)
+HTTP_POOL_BLOCK = False  # Open extra connections instead of waiting when the pool is exhausted
+HTTP_CONNECT_TIMEOUT = 5  # Seconds to establish a connection
+HTTP_READ_TIMEOUT = 30  # Seconds to wait for response data
+API_RETRY_ATTEMPTS = 3  # Retries of a page request after a transient error (connection, timeout, 429/5xx)
+API_RETRY_BASE_DELAY = 0.5  # Seconds of backoff before the first retry; doubles each retry, with full jitter
+API_RETRY_MAX_DELAY = 8  # Largest backoff between retries, in seconds (Retry-After is honored as sent)
+API_RETRY_DEADLINE = 60  # Seconds one search may spend on pages and retries before retrying stops (not exports or crawls)
+UPSTREAM_RATE_LIMIT = 0  # Requests per second to the API (ClinicalTrials.gov allows about 50 a minute); 0 disables
+UPSTREAM_RATE_BURST = 10  # Requests that may be sent back to back before UPSTREAM_RATE_LIMIT applies
+UPSTREAM_RATE_LIMIT_PATH = None  # SQLite file sharing the rate limit among all workers on the host; None keeps it per process
+UPSTREAM_MAX_CONCURRENT = 0  # API requests in flight at once per process, threaded and async together; 0 disables
+CIRCUIT_FAILURE_RATE = 0.5  # Share of recent API requests failing (network, 429/5xx) or slow that opens the circuit; 0 disables
+CIRCUIT_MIN_REQUESTS = 10  # Recent requests needed before the failure rate can open the circuit
+CIRCUIT_WINDOW = 20  # Most recent API requests the failure rate is computed over
+CIRCUIT_SLOW_CALL = 10  # Seconds after which an API request counts as failed
+CIRCUIT_OPEN_SECONDS = 30  # Seconds requests fail fast once the circuit opens, before one probe is let through
+ASYNC_UPSTREAM = False  # Fetch /search and /export results on one asyncio event loop (needs aiohttp)
+ASYNC_POOL_MAXSIZE = 100  # Connections of the async transport; further requests wait without a thread
+RESULT_CACHE_TTL = 600  # Seconds a cached search result stays fresh
+RESULT_CACHE_MAX_BYTES = 64 * 1024 * 1024  # Approximate memory budget for cached results
+STALE_RESULT_TTL = 24 * 60 * 60  # Seconds an expired result is kept to serve, flagged stale, while the API is unavailable
+RESULT_HANDLE_TTL = 900  # Seconds a /search result stays available to /export
+CSV_STREAM_CHUNK_SIZE = 64 * 1024  # Bytes of CSV buffered before a chunk is flushed
+BULK_EXPORT_MAX_RESULTS = 50000  # Hard ceiling for opt-in bulk CSV exports (/export?bulk=1)
+EXPORT_STREAM_PARSE = True  # Parse API pages for CSV exports as their bytes arrive instead of per page
+DATATABLES_MAX_PAGE_SIZE = 100  # Largest page the server-side table endpoint will return
+API_PREFETCH_WORKERS = 8  # Threads fetching the next page while the current one is parsed; searches fetch inline when all are busy
+PARTITION_WORKERS = 4  # Sub-queries of a partitioned search fetched concurrently
+PARTITION_MIN_PAGES = 3  # Partition bulk pulls spanning more than this many API pages per worker; 0 disables
+API_FIELD_PROJECTION = True  # Request only the fields the Trial model needs
+API_STREAM_CHUNK_SIZE = 64 * 1024  # Bytes read per step when parsing a page body incrementally
+PAGE_CACHE_PATH = None  # SQLite file for the on-disk page cache shared by workers; None disables it
+PAGE_CACHE_TTL = 6 * 60 * 60  # Seconds a cached API page stays valid
+PAGE_CACHE_MAX_BYTES = 512 * 1024 * 1024  # Compressed size budget for the page cache
+TRIALS_BACKEND = 'api'  # 'api' queries ClinicalTrials.gov live; 'local' answers from the mirror
+MIRROR_DB_PATH = 'instance/trials_mirror.sqlite3'  # SQLite file holding the local registry mirror
+MIRROR_BATCH_SIZE = 1000  # Studies per upsert transaction when loading the mirror
+MIRROR_CRAWL_PAGE_SIZE = 1000  # Page size when crawling the API to build the mirror (API max)
+TEXT_INDEX_CACHE_TERMS = 4096  # Decoded posting lists kept in memory by the mirror text index
+FACET_TOP_SPONSORS = 10  # Sponsors listed by the /api/facets endpoint
+JSON_DECODER = 'auto'  # 'auto' uses orjson when installed, else stdlib json; 'json'/'orjson' force one
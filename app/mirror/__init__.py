@@ -0,0 +1 @@
+# Local registry mirror package
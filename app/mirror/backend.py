@@ -0,0 +1,171 @@
+import time
+from dataclasses import replace
+from typing import Iterator, List, Optional, Tuple
+
+from app.config import API_PAGE_SIZE, MAX_RESULTS, FACET_TOP_SPONSORS
+from app.mirror.bitmap_index import BitmapIndex, from_bitmap, to_bitmap
+from app.mirror.store import TrialStore
+from app.mirror.text_index import TextIndex, intersect
+from app.models.trial import Trial, SearchParams, SearchResult
+from app.services.facets import facets_response
+from app.services.metrics import Timings
+
+
+def _has_criteria(params: SearchParams) -> bool:
+    """Whether params still filter beyond an id set."""
+    return bool(params.compound or params.condition or params.phases or params.statuses)
+
+
+class LocalTrialsBackend:
+    """Answers searches from the local mirror instead of the live API.
+
+    Exposes the same search interface as ClinicalTrialsService (fetch_all,
+    iter_pages, stream_pages, stats) with the same SearchResult semantics,
+    so routes can use either one.
+
+    compound and condition are matched with the text index, and phases and
+    statuses with the bitmap index, while each is current; criteria no
+    current index covers are evaluated by the store in SQL.
+    """
+
+    def __init__(
+        self,
+        store: TrialStore,
+        index: Optional[TextIndex] = None,
+        bitmaps: Optional[BitmapIndex] = None
+    ):
+        self.store = store
+        self.index = index if index is not None else TextIndex(store)
+        self.bitmaps = bitmaps if bitmaps is not None else BitmapIndex(store)
+        self.timings = Timings()
+
+    def _text_ids(self, params: SearchParams):
+        """Ids matching compound/condition via the index, or None to scan."""
+        if not self.index.is_current():
+            return None
+
+        start = time.perf_counter()
+        # Like the API's condition search, condition terms may match titles
+        matches = [
+            ids for ids in (
+                self.index.match(('intervention',), params.compound or ''),
+                self.index.match(('condition', 'title'), params.condition or ''),
+            )
+            if ids is not None
+        ]
+        if not matches:
+            return None
+
+        ids = matches[0]
+        for other in matches[1:]:
+            ids = intersect(ids, other)
+        self.timings.observe('text_index', time.perf_counter() - start)
+        return ids
+
+    def _resolve(self, params: SearchParams):
+        """(ids, residual params): index matches plus criteria left for SQL."""
+        ids = self._text_ids(params)
+        if ids is not None:
+            params = replace(params, compound=None, condition=None)
+
+        if not self.bitmaps.is_current():
+            return ids, params
+        bitmap = self.bitmaps.match(params)
+        if bitmap is None:
+            return ids, params
+
+        start = time.perf_counter()
+        if ids is not None:
+            bitmap &= to_bitmap(ids)
+        ids = from_bitmap(bitmap)
+        self.timings.observe('bitmap_index', time.perf_counter() - start)
+        return ids, replace(params, phases=None, statuses=None)
+
+    def _count(self, params: SearchParams, ids) -> int:
+        if ids is not None and not _has_criteria(params):
+            return len(ids)
+        return self.store.count_matches(params, ids)
+
+    def fetch_all(self, params: SearchParams) -> SearchResult:
+        """Return matches up to MAX_RESULTS with the full match count."""
+        start = time.perf_counter()
+        ids, params = self._resolve(params)
+        total_count = self._count(params, ids)
+        trials = self.store.search(params, MAX_RESULTS, ids=ids)
+        self.timings.observe('search', time.perf_counter() - start)
+
+        return SearchResult(
+            trials=trials,
+            total_count=total_count,
+            truncated=total_count > len(trials)
+        )
+
+    def facets(
+        self,
+        params: SearchParams,
+        top_sponsors: int = FACET_TOP_SPONSORS,
+        fetch: bool = True
+    ) -> dict:
+        """Phase, status and top sponsor counts over every match.
+
+        Phase and status counts are popcounts of the facet bitmaps within the
+        match set when the bitmap index covers the whole query; otherwise
+        they are grouped in SQL like sponsors. fetch is accepted for
+        interface compatibility; local counts need no upstream search.
+        """
+        start = time.perf_counter()
+        ids, residual = self._resolve(params)
+        total_count = self._count(residual, ids)
+
+        if self.bitmaps.is_current() and not _has_criteria(residual):
+            counts = self.bitmaps.counts(None if ids is None else to_bitmap(ids))
+            phases, statuses = counts['phase'], counts['status']
+        else:
+            phases = dict(self.store.value_counts('phase', residual, ids))
+            statuses = dict(self.store.value_counts('status', residual, ids))
+        sponsors = self.store.value_counts('sponsor', residual, ids, top_sponsors)
+        self.timings.observe('facets', time.perf_counter() - start)
+
+        return facets_response(phases, statuses, sponsors, total_count, total_count)
+
+    def stream_pages(self, params: SearchParams) -> Iterator[List[Trial]]:
+        for trials, _ in self.iter_pages(params):
+            yield trials
+
+    def iter_pages(
+        self,
+        params: SearchParams,
+        max_results: Optional[int] = None,
+        prefetch: bool = True,
+        stream: bool = False,
+        partition: bool = False
+    ) -> Iterator[Tuple[List[Trial], int]]:
+        """Yield (trials, total_count) in API_PAGE_SIZE pages up to max_results.
+
+        prefetch, stream and partition are accepted for interface
+        compatibility; local pages need no network round trip to overlap,
+        download or parallelize.
+        """
+        if max_results is None:
+            max_results = MAX_RESULTS
+
+        ids, params = self._resolve(params)
+        total_count = self._count(params, ids)
+        offset = 0
+        while True:
+            trials = self.store.search(
+                params, min(API_PAGE_SIZE, max_results - offset), offset, ids
+            )
+            offset += len(trials)
+            yield trials, total_count
+            if len(trials) < API_PAGE_SIZE or offset >= min(max_results, total_count):
+                break
+
+    def stats(self) -> dict:
+        return {
+            'backend': 'local',
+            'studies': self.store.count(),
+            'text_index': self.index.is_current(),
+            'bitmap_index': self.bitmaps.is_current(),
+            'timings': self.timings.snapshot(),
+        }
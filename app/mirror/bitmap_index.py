@@ -0,0 +1,139 @@
+import threading
+import zlib
+from array import array
+from typing import Dict, Iterable, Optional, Tuple
+
+from app.mirror.store import TrialStore
+from app.models.trial import SearchParams, phase_codes
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS facet_bitmaps (
+    facet TEXT NOT NULL,
+    value TEXT NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (facet, value)
+) WITHOUT ROWID;
+"""
+
+BUILT_FROM = 'bitmap_index.built_from'
+
+# Bit positions set in each byte value, for expanding bitmaps back to ids
+_BYTE_BITS = [tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256)]
+
+
+def to_bitmap(ids: Iterable[int]) -> int:
+    """Bitmap (as an int) with the bit of every id set."""
+    ids = list(ids)
+    if not ids:
+        return 0
+    buffer = bytearray(max(ids) // 8 + 1)
+    for doc in ids:
+        buffer[doc >> 3] |= 1 << (doc & 7)
+    return int.from_bytes(buffer, 'little')
+
+
+def from_bitmap(bitmap: int) -> array:
+    """Sorted ids of the bits set in bitmap."""
+    data = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little')
+    return array('I', [
+        offset * 8 + bit
+        for offset, byte in enumerate(data) if byte
+        for bit in _BYTE_BITS[byte]
+    ])
+
+
+def encode_bitmap(bitmap: int) -> bytes:
+    return zlib.compress(bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little'))
+
+
+def decode_bitmap(data: bytes) -> int:
+    return int.from_bytes(zlib.decompress(data), 'little')
+
+
+class BitmapIndex:
+    """One bitmap per phase and per overall status over mirror study ids.
+
+    Phase and status have a handful of values each, so a search's OR of
+    phases and set of statuses reduce to unions of a few bitmaps and one
+    intersection, independent of how many studies match. Bitmaps are Python
+    ints (word-at-a-time AND/OR in C), stored zlib-compressed in the mirror
+    database and loaded into memory once per store version.
+    """
+
+    def __init__(self, store: TrialStore):
+        self.store = store
+        self._bitmaps: Dict[Tuple[str, str], int] = {}
+        self._loaded_from = None
+        self._lock = threading.Lock()
+        store._connection().executescript(_SCHEMA)
+
+    def is_current(self) -> bool:
+        """Whether the index was built from the store as it is now."""
+        return self.store.get_state(BUILT_FROM) == self.store.version()
+
+    def rebuild(self) -> int:
+        """Rebuild all bitmaps from the store; returns the bitmap count."""
+        version = self.store.version()
+        ids: Dict[Tuple[str, str], list] = {}
+        for doc, phase, status in self.store.iter_facets():
+            for code in phase_codes(phase):
+                ids.setdefault(('phase', code), []).append(doc)
+            ids.setdefault(('status', status), []).append(doc)
+
+        conn = self.store._connection()
+        with conn:
+            conn.execute('DELETE FROM facet_bitmaps')
+            conn.executemany(
+                'INSERT INTO facet_bitmaps (facet, value, data) VALUES (?, ?, ?)',
+                (
+                    (facet, value, encode_bitmap(to_bitmap(docs)))
+                    for (facet, value), docs in ids.items()
+                )
+            )
+        self.store.set_state(BUILT_FROM, version)
+
+        with self._lock:
+            self._loaded_from = None
+        return len(ids)
+
+    def bitmaps(self) -> Dict[Tuple[str, str], int]:
+        """All (facet, value) -> bitmap, reloaded when the index is rebuilt."""
+        built_from = self.store.get_state(BUILT_FROM)
+        with self._lock:
+            if self._loaded_from != built_from:
+                self._bitmaps = {
+                    (facet, value): decode_bitmap(data)
+                    for facet, value, data in self.store._connection().execute(
+                        'SELECT facet, value, data FROM facet_bitmaps'
+                    )
+                }
+                self._loaded_from = built_from
+            return self._bitmaps
+
+    def counts(self, within: Optional[int] = None) -> Dict[str, Dict[str, int]]:
+        """facet -> value -> number of studies, optionally within a bitmap."""
+        counts: Dict[str, Dict[str, int]] = {'phase': {}, 'status': {}}
+        for (facet, value), bitmap in self.bitmaps().items():
+            if within is not None:
+                bitmap &= within
+            counts[facet][value] = bin(bitmap).count('1')
+        return counts
+
+    def union(self, facet: str, values: Iterable[str]) -> int:
+        bitmaps = self.bitmaps()
+        result = 0
+        for value in values:
+            result |= bitmaps.get((facet, value), 0)
+        return result
+
+    def match(self, params: SearchParams) -> Optional[int]:
+        """Bitmap of studies matching the phase and status filters.
+
+        Returns None when params has neither filter.
+        """
+        result = None
+        for facet, values in (('phase', params.phases), ('status', params.statuses)):
+            if values:
+                bitmap = self.union(facet, values)
+                result = bitmap if result is None else result & bitmap
+        return result
@@ -0,0 +1,61 @@
+import click
+from flask.cli import AppGroup
+
+from app.config import MIRROR_DB_PATH
+from app.mirror.bitmap_index import BitmapIndex
+from app.mirror.loader import crawl, iter_dump, load_studies
+from app.mirror.store import TrialStore
+from app.mirror.sync import sync
+from app.mirror.text_index import TextIndex
+from app.services.clinical_trials import ClinicalTrialsService
+
+mirror_cli = AppGroup('mirror', help='Manage the local ClinicalTrials.gov mirror.')
+
+
+def _rebuild_index(store: TrialStore):
+    terms = TextIndex(store).rebuild()
+    bitmaps = BitmapIndex(store).rebuild()
+    click.echo(f'Indexed {terms:,} terms and {bitmaps:,} phase/status bitmaps')
+
+
+@mirror_cli.command('load')
+@click.argument('path', type=click.Path(exists=True))
+@click.option('--db', default=MIRROR_DB_PATH, show_default=True, help='Mirror database file.')
+def load_command(path, db):
+    """Load studies from a downloaded registry dump at PATH."""
+    store = TrialStore(db)
+    loaded = load_studies(store, iter_dump(path))
+    click.echo(f'Loaded {loaded:,} studies ({store.count():,} in mirror)')
+    _rebuild_index(store)
+
+
+@mirror_cli.command('crawl')
+@click.option('--db', default=MIRROR_DB_PATH, show_default=True, help='Mirror database file.')
+def crawl_command(db):
+    """Load every study by paginating the live API."""
+    store = TrialStore(db)
+    loaded = load_studies(store, crawl(ClinicalTrialsService()))
+    click.echo(f'Loaded {loaded:,} studies ({store.count():,} in mirror)')
+    _rebuild_index(store)
+
+
+@mirror_cli.command('sync')
+@click.option('--db', default=MIRROR_DB_PATH, show_default=True, help='Mirror database file.')
+def sync_command(db):
+    """Pull studies updated since the last sync."""
+    store = TrialStore(db)
+    report = sync(store, ClinicalTrialsService())
+    click.echo(
+        f'Synced {report.studies:,} studies in {report.seconds:.1f}s '
+        f'({report.studies_per_second:,.0f} studies/sec) since {report.since or "the beginning"}; '
+        f'high-water mark {report.high_water_mark}, lag {report.lag_days} days'
+    )
+    if report.studies:
+        _rebuild_index(store)
+
+
+@mirror_cli.command('index')
+@click.option('--db', default=MIRROR_DB_PATH, show_default=True, help='Mirror database file.')
+def index_command(db):
+    """Rebuild the text and phase/status indexes used for local searches."""
+    _rebuild_index(TrialStore(db))
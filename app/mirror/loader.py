@@ -0,0 +1,109 @@
+import os
+import zipfile
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from app.config import MIRROR_BATCH_SIZE, MIRROR_CRAWL_PAGE_SIZE
+from app.mirror.store import TrialStore
+from app.models.trial import Trial
+from app.services.clinical_trials import API_FIELDS, extract_field, parse_study
+from app.services.json_decoder import JsonDecoder
+
+LAST_UPDATE_FIELD = 'protocolSection.statusModule.lastUpdatePostDateStruct.date'
+MIRROR_FIELDS = f'{API_FIELDS},{LAST_UPDATE_FIELD}'
+
+_decoder = JsonDecoder()
+
+
+def study_record(study: dict) -> Tuple[Trial, Optional[str]]:
+    """(Trial, last update date) for a raw API study document."""
+    return parse_study(study), extract_field(study, LAST_UPDATE_FIELD)
+
+
+def _studies_in(data) -> Iterator[dict]:
+    """Studies in a decoded document: a study, a list, or an API page."""
+    if isinstance(data, list):
+        yield from data
+    elif 'studies' in data:
+        yield from data['studies']
+    else:
+        yield data
+
+
+def iter_dump(path: str) -> Iterator[dict]:
+    """Yield study documents from a registry download.
+
+    Accepts the ClinicalTrials.gov bulk JSON zip (one file per study), a
+    directory of such files, a JSON file holding a study list or API page,
+    or a JSON-lines file with one study per line.
+    """
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            if name.endswith('.json'):
+                with open(os.path.join(path, name), 'rb') as f:
+                    yield from _studies_in(_decoder.loads(f.read()))
+    elif zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for name in archive.namelist():
+                if name.endswith('.json'):
+                    yield from _studies_in(_decoder.loads(archive.read(name)))
+    elif path.endswith(('.jsonl', '.ndjson')):
+        with open(path, 'rb') as f:
+            for line in f:
+                if line.strip():
+                    yield _decoder.loads(line)
+    else:
+        with open(path, 'rb') as f:
+            yield from _studies_in(_decoder.loads(f.read()))
+
+
+def crawl_pages(service, query_params: Optional[dict] = None) -> Iterator[List[dict]]:
+    """Yield each page of studies matching query_params from the live API.
+
+    Goes straight to the service's transport, bypassing result and page
+    caches but not its upstream throttle or retry policy, and requests the
+    fields the mirror stores. Pages are retried without a deadline: a crawl
+    runs far longer than any search.
+    """
+    page_token = None
+    while True:
+        request_params = dict(query_params or {})
+        request_params['pageSize'] = MIRROR_CRAWL_PAGE_SIZE
+        request_params['fields'] = MIRROR_FIELDS
+        if page_token:
+            request_params['pageToken'] = page_token
+
+        def fetch():
+            with service.throttle.slot():
+                response = service.transport.get(service.base_url, params=request_params)
+            response.raise_for_status()
+            return response
+
+        data = _decoder.decode_response(service.retry.call(fetch))
+
+        yield data.get('studies', [])
+
+        page_token = data.get('nextPageToken')
+        if not page_token:
+            break
+
+
+def crawl(service, query_params: Optional[dict] = None) -> Iterator[dict]:
+    """Yield every study matching query_params by paginating the live API."""
+    for studies in crawl_pages(service, query_params):
+        yield from studies
+
+
+def load_studies(
+    store: TrialStore, studies: Iterable[dict], batch_size: int = MIRROR_BATCH_SIZE
+) -> int:
+    """Upsert study documents into store in batches; returns the count loaded."""
+    records = (study_record(s) for s in studies)
+    records = (r for r in records if r[0].nct_id)
+
+    loaded = 0
+    while True:
+        batch = list(islice(records, batch_size))
+        if not batch:
+            return loaded
+        loaded += store.upsert(batch)
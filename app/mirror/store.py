@@ -0,0 +1,292 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from app.models.trial import Trial, SearchParams, phase_codes
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS studies (
+    id INTEGER PRIMARY KEY,
+    nct_id TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    phase TEXT NOT NULL,
+    status TEXT NOT NULL,
+    sponsor TEXT NOT NULL,
+    conditions TEXT NOT NULL,
+    interventions TEXT NOT NULL,
+    condition_terms TEXT NOT NULL,
+    intervention_terms TEXT NOT NULL,
+    title_terms TEXT NOT NULL,
+    last_update TEXT
+);
+CREATE INDEX IF NOT EXISTS studies_status ON studies (status);
+CREATE INDEX IF NOT EXISTS studies_last_update ON studies (last_update);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS study_phases (
+    phase TEXT NOT NULL,
+    study_id INTEGER NOT NULL,
+    PRIMARY KEY (phase, study_id)
+) WITHOUT ROWID;
+"""
+
+_TOKEN_PATTERN = re.compile(r'\w+')
+_QUERY_PATTERN = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def tokenize(text: str) -> List[str]:
+    """Case-folded word tokens of text."""
+    return _TOKEN_PATTERN.findall(text.casefold())
+
+
+def parse_query(text: str) -> List[Tuple[str, List[str]]]:
+    """Split a query into (kind, tokens) clauses that must all match.
+
+    "quoted text" is a phrase, a word ending in * is a prefix, and anything
+    else is a plain term. Words that tokenize into several tokens (such as
+    non-small) are treated as phrases.
+    """
+    clauses = []
+    for phrase, word in _QUERY_PATTERN.findall(text or ''):
+        tokens = tokenize(phrase or word)
+        if not tokens:
+            continue
+        if len(tokens) > 1:
+            clauses.append(('phrase', tokens))
+        elif word.endswith('*'):
+            clauses.append(('prefix', tokens))
+        else:
+            clauses.append(('term', tokens))
+    return clauses
+
+
+def _clause_pattern(kind: str, tokens: List[str]) -> str:
+    """Substring of a term column (see _terms) that matches one query clause."""
+    if kind == 'prefix':
+        return f' {tokens[0]}'
+    return f' {" ".join(tokens)} '
+
+
+def _terms(values: List[str]) -> str:
+    """Space-delimited token string, so ' token ' matches whole tokens only.
+
+    Values are separated by ' | ' so a phrase cannot match across two
+    condition or intervention names.
+    """
+    return ' ' + ' | '.join(' '.join(tokenize(value)) for value in values) + ' '
+
+
+def _row_to_trial(row) -> Trial:
+    nct_id, title, phase, status, sponsor, conditions, interventions = row
+    return Trial(
+        nct_id=nct_id,
+        title=title,
+        phase=phase,
+        status=status,
+        sponsor=sponsor,
+        conditions=json.loads(conditions),
+        interventions=json.loads(interventions)
+    )
+
+
+class TrialStore:
+    """Local SQLite store of the trial registry.
+
+    Each study keeps a stable integer id across upserts, which index
+    structures built over the store use as document ids.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection().executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def upsert(self, records: Iterable[Tuple[Trial, Optional[str]]]) -> int:
+        """Insert or update (trial, last_update) records in one transaction."""
+        conn = self._connection()
+        count = 0
+        with conn:
+            for trial, last_update in records:
+                conn.execute(
+                    'INSERT INTO studies (nct_id, title, phase, status, sponsor, conditions, '
+                    'interventions, condition_terms, intervention_terms, title_terms, '
+                    'last_update) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) '
+                    'ON CONFLICT (nct_id) DO UPDATE SET title = excluded.title, '
+                    'phase = excluded.phase, status = excluded.status, '
+                    'sponsor = excluded.sponsor, conditions = excluded.conditions, '
+                    'interventions = excluded.interventions, '
+                    'condition_terms = excluded.condition_terms, '
+                    'intervention_terms = excluded.intervention_terms, '
+                    'title_terms = excluded.title_terms, '
+                    'last_update = excluded.last_update',
+                    (
+                        trial.nct_id, trial.title, trial.phase, trial.status, trial.sponsor,
+                        json.dumps(trial.conditions), json.dumps(trial.interventions),
+                        _terms(trial.conditions), _terms(trial.interventions),
+                        _terms([trial.title]), last_update
+                    )
+                )
+                study_id = conn.execute(
+                    'SELECT id FROM studies WHERE nct_id = ?', (trial.nct_id,)
+                ).fetchone()[0]
+
+                conn.execute('DELETE FROM study_phases WHERE study_id = ?', (study_id,))
+                conn.executemany(
+                    'INSERT INTO study_phases (phase, study_id) VALUES (?, ?)',
+                    [(code, study_id) for code in phase_codes(trial.phase)]
+                )
+                count += 1
+        return count
+
+    def count(self) -> int:
+        return self._connection().execute('SELECT COUNT(*) FROM studies').fetchone()[0]
+
+    def iter_terms(self) -> Iterator[Tuple[int, str, str, str]]:
+        """(id, intervention_terms, condition_terms, title_terms) for every study."""
+        return self._connection().execute(
+            'SELECT id, intervention_terms, condition_terms, title_terms FROM studies'
+        )
+
+    def iter_facets(self) -> Iterator[Tuple[int, str, str]]:
+        """(id, phase, status) for every study."""
+        return self._connection().execute('SELECT id, phase, status FROM studies')
+
+    def filter_phrase(self, ids: Sequence[int], column: str, tokens: List[str]) -> List[int]:
+        """Ids whose term column contains tokens as one contiguous phrase."""
+        if column not in ('intervention_terms', 'condition_terms', 'title_terms'):
+            raise ValueError(f'Unknown term column: {column}')
+        rows = self._connection().execute(
+            f'SELECT id FROM studies WHERE id IN (SELECT value FROM json_each(?)) '
+            f'AND instr({column}, ?) > 0 ORDER BY id',
+            (json.dumps(list(ids)), f' {" ".join(tokens)} ')
+        )
+        return [row[0] for row in rows]
+
+    def version(self) -> str:
+        """Cheap fingerprint that changes whenever studies are added or synced."""
+        # Separate statements so each MAX() is answered from an index
+        conn = self._connection()
+        max_id = conn.execute('SELECT MAX(id) FROM studies').fetchone()[0]
+        return f'{max_id}:{self.max_last_update()}'
+
+    def max_last_update(self) -> Optional[str]:
+        """Most recent last-update date among stored studies."""
+        return self._connection().execute(
+            'SELECT MAX(last_update) FROM studies'
+        ).fetchone()[0]
+
+    def get_state(self, key: str) -> Optional[str]:
+        row = self._connection().execute(
+            'SELECT value FROM sync_state WHERE key = ?', (key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def set_state(self, key: str, value: str):
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)', (key, value)
+            )
+
+    def _where(self, params: SearchParams, ids: Optional[Sequence[int]] = None) -> Tuple[str, list]:
+        """SQL filter for params.
+
+        compound/condition match when every clause of parse_query (term,
+        "phrase" or prefix*) matches an intervention name / a condition name
+        or the title, exactly as TextIndex.match does. Phases are OR-ed and
+        statuses form a set, as with the upstream API. When ids is given
+        (criteria already evaluated by an index), rows are also restricted
+        to those ids.
+        """
+        clauses = []
+        args = []
+
+        if ids is not None:
+            clauses.append('id IN (SELECT value FROM json_each(?))')
+            args.append(json.dumps(list(ids)))
+
+        for kind, tokens in parse_query(params.compound):
+            clauses.append('instr(intervention_terms, ?) > 0')
+            args.append(_clause_pattern(kind, tokens))
+        for kind, tokens in parse_query(params.condition):
+            clauses.append('(instr(condition_terms, ?) > 0 OR instr(title_terms, ?) > 0)')
+            args.extend([_clause_pattern(kind, tokens)] * 2)
+
+        if params.statuses:
+            clauses.append(f'status IN ({",".join("?" * len(params.statuses))})')
+            args.extend(params.statuses)
+
+        if params.phases:
+            clauses.append(
+                'id IN (SELECT study_id FROM study_phases '
+                f'WHERE phase IN ({",".join("?" * len(params.phases))}))'
+            )
+            args.extend(params.phases)
+
+        return ' AND '.join(clauses) or '1', args
+
+    def count_matches(self, params: SearchParams, ids: Optional[Sequence[int]] = None) -> int:
+        where, args = self._where(params, ids)
+        return self._connection().execute(
+            f'SELECT COUNT(*) FROM studies WHERE {where}', args
+        ).fetchone()[0]
+
+    def value_counts(
+        self,
+        column: str,
+        params: SearchParams,
+        ids: Optional[Sequence[int]] = None,
+        limit: Optional[int] = None
+    ) -> List[Tuple[str, int]]:
+        """(value, count) of a phase/status/sponsor column over matches, most common first."""
+        where, args = self._where(params, ids)
+        if column == 'phase':
+            sql = (
+                'SELECT phase, COUNT(*) FROM study_phases WHERE study_id IN '
+                f'(SELECT id FROM studies WHERE {where}) GROUP BY phase'
+            )
+        elif column in ('status', 'sponsor'):
+            sql = f'SELECT {column}, COUNT(*) FROM studies WHERE {where} GROUP BY {column}'
+        else:
+            raise ValueError(f'Unknown facet column: {column}')
+
+        sql += ' ORDER BY 2 DESC, 1'
+        if limit is not None:
+            sql += ' LIMIT ?'
+            args = args + [limit]
+        return self._connection().execute(sql, args).fetchall()
+
+    def search(
+        self,
+        params: SearchParams,
+        limit: int,
+        offset: int = 0,
+        ids: Optional[Sequence[int]] = None
+    ) -> List[Trial]:
+        """Trials matching params, ordered by NCT ID."""
+        where, args = self._where(params, ids)
+        rows = self._connection().execute(
+            'SELECT nct_id, title, phase, status, sponsor, conditions, interventions '
+            f'FROM studies WHERE {where} ORDER BY nct_id LIMIT ? OFFSET ?',
+            args + [limit, offset]
+        ).fetchall()
+        return [_row_to_trial(row) for row in rows]
@@ -0,0 +1,79 @@
+import logging
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional
+
+from app.config import MIRROR_BATCH_SIZE
+from app.mirror.loader import LAST_UPDATE_FIELD, crawl_pages, load_studies
+from app.mirror.store import TrialStore
+from app.services.clinical_trials import extract_field
+
+logger = logging.getLogger(__name__)
+
+HIGH_WATER_MARK = 'sync.high_water_mark'
+
+
+@dataclass
+class SyncReport:
+    studies: int
+    pages: int
+    seconds: float
+    since: Optional[str]
+    high_water_mark: Optional[str]
+    lag_days: Optional[int]  # Days between today and the high-water mark
+
+    @property
+    def studies_per_second(self) -> float:
+        return self.studies / self.seconds if self.seconds else 0.0
+
+
+def _lag_days(high_water_mark: Optional[str], today: date) -> Optional[int]:
+    if not high_water_mark:
+        return None
+    parts = [int(p) for p in high_water_mark.split('-')] + [1, 1]
+    return (today - date(parts[0], parts[1], parts[2])).days
+
+
+def sync(
+    store: TrialStore,
+    service,
+    batch_size: int = MIRROR_BATCH_SIZE,
+    today: Optional[date] = None
+) -> SyncReport:
+    """Pull studies updated since the stored high-water mark and upsert them.
+
+    Studies are requested in ascending last-update order, and the mark is
+    checkpointed after every page. An interrupted sync therefore resumes
+    from the last completed page. The range is inclusive, so studies on
+    the mark's own date are fetched again, and upserts make that harmless.
+    """
+    since = store.get_state(HIGH_WATER_MARK) or store.max_last_update()
+    query_params = {'sort': 'LastUpdatePostDate:asc'}
+    if since:
+        query_params['filter.advanced'] = f'AREA[LastUpdatePostDate]RANGE[{since},MAX]'
+
+    start = time.perf_counter()
+    mark = since
+    studies = 0
+    pages = 0
+
+    for page in crawl_pages(service, query_params):
+        studies += load_studies(store, page, batch_size)
+        pages += 1
+
+        updates = [u for u in (extract_field(s, LAST_UPDATE_FIELD) for s in page) if u]
+        if updates:
+            mark = max([mark] + updates) if mark else max(updates)
+            store.set_state(HIGH_WATER_MARK, mark)
+
+        logger.info('Synced %d studies (%d pages), high-water mark %s', studies, pages, mark)
+
+    return SyncReport(
+        studies=studies,
+        pages=pages,
+        seconds=time.perf_counter() - start,
+        since=since,
+        high_water_mark=mark,
+        lag_days=_lag_days(mark, today or date.today())
+    )
@@ -0,0 +1,200 @@
+import threading
+import zlib
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict, defaultdict
+from itertools import accumulate
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.config import TEXT_INDEX_CACHE_TERMS
+from app.mirror.store import TrialStore, parse_query
+
+# Indexed field -> term column of the studies table it is built from
+FIELDS = {
+    'intervention': 'intervention_terms',
+    'condition': 'condition_terms',
+    'title': 'title_terms',
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS text_postings (
+    field TEXT NOT NULL,
+    term TEXT NOT NULL,
+    doc_count INTEGER NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (field, term)
+) WITHOUT ROWID;
+"""
+
+BUILT_FROM = 'text_index.built_from'
+
+
+def encode_postings(ids: Sequence[int]) -> bytes:
+    """Delta-encode sorted ids as uint32 and compress them."""
+    deltas = array('I', (b - a for a, b in zip([0] + list(ids[:-1]), ids)))
+    return zlib.compress(deltas.tobytes())
+
+
+def decode_postings(data: bytes) -> array:
+    deltas = array('I')
+    deltas.frombytes(zlib.decompress(data))
+    return array('I', accumulate(deltas))
+
+
+def intersect(a: Sequence[int], b: Sequence[int]) -> array:
+    """Intersection of two sorted posting lists."""
+    if len(a) > len(b):
+        a, b = b, a
+    if len(a) * 16 < len(b):
+        # Skewed sizes: binary-search each of the few ids in the long list
+        result = array('I')
+        lo = 0
+        for doc in a:
+            lo = bisect_left(b, doc, lo)
+            if lo == len(b):
+                break
+            if b[lo] == doc:
+                result.append(doc)
+        return result
+    return array('I', sorted(set(a).intersection(b)))
+
+
+def union(lists: List[Sequence[int]]) -> array:
+    """Union of sorted posting lists."""
+    if not lists:
+        return array('I')
+    if len(lists) == 1:
+        return array('I', lists[0])
+    return array('I', sorted(set().union(*lists)))
+
+
+def _field_terms(column_value: str) -> List[List[str]]:
+    """Token lists per value of a ' a b | c d ' term column."""
+    return [value.split() for value in column_value.split('|')]
+
+
+class TextIndex:
+    """Inverted index over intervention names, condition names and titles.
+
+    Each (field, term) posting list holds the sorted study ids containing
+    the term. Adjacent word pairs are indexed as terms too ("lung cancer"),
+    which answers two-word phrases straight from postings. Longer phrases
+    are intersected over their pairs and then checked against the store.
+    Lists are stored delta-encoded and compressed in the mirror database.
+    Decoded lists are uint32 arrays, and an LRU keeps the most used ones.
+    """
+
+    def __init__(self, store: TrialStore, cache_terms: int = TEXT_INDEX_CACHE_TERMS):
+        self.store = store
+        self.cache_terms = cache_terms
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        store._connection().executescript(_SCHEMA)
+
+    def is_current(self) -> bool:
+        """Whether the index was built from the store as it is now."""
+        return self.store.get_state(BUILT_FROM) == self.store.version()
+
+    def rebuild(self) -> int:
+        """Rebuild all posting lists from the store; returns the term count."""
+        version = self.store.version()
+        postings: Dict[Tuple[str, str], List[int]] = defaultdict(list)
+
+        for row in self.store.iter_terms():
+            doc = row[0]
+            for field, column_value in zip(FIELDS, row[1:]):
+                seen = set()
+                for tokens in _field_terms(column_value):
+                    seen.update(tokens)
+                    seen.update(f'{a} {b}' for a, b in zip(tokens, tokens[1:]))
+                for term in seen:
+                    postings[(field, term)].append(doc)
+
+        conn = self.store._connection()
+        with conn:
+            conn.execute('DELETE FROM text_postings')
+            conn.executemany(
+                'INSERT INTO text_postings (field, term, doc_count, data) VALUES (?, ?, ?, ?)',
+                (
+                    (field, term, len(ids), encode_postings(sorted(ids)))
+                    for (field, term), ids in postings.items()
+                )
+            )
+        self.store.set_state(BUILT_FROM, version)
+
+        with self._lock:
+            self._cache.clear()
+        return len(postings)
+
+    def postings(self, field: str, term: str) -> array:
+        """Sorted ids of studies whose field contains term."""
+        key = (field, term)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+
+        row = self.store._connection().execute(
+            'SELECT data FROM text_postings WHERE field = ? AND term = ?', key
+        ).fetchone()
+        ids = decode_postings(row[0]) if row else array('I')
+
+        with self._lock:
+            self._cache[key] = ids
+            while len(self._cache) > self.cache_terms:
+                self._cache.popitem(last=False)
+        return ids
+
+    def prefix_postings(self, field: str, prefix: str) -> array:
+        """Sorted ids of studies with any field term starting with prefix."""
+        terms = [
+            row[0] for row in self.store._connection().execute(
+                'SELECT term FROM text_postings WHERE field = ? AND term >= ? AND term < ?',
+                (field, prefix, prefix + '\U0010ffff')
+            )
+            if ' ' not in row[0]
+        ]
+        return union([self.postings(field, term) for term in terms])
+
+    def phrase_postings(self, field: str, tokens: List[str]) -> array:
+        """Sorted ids of studies where tokens appear contiguously in one value."""
+        pairs = [f'{a} {b}' for a, b in zip(tokens, tokens[1:])]
+        lists = sorted((self.postings(field, pair) for pair in pairs), key=len)
+        ids = lists[0]
+        for other in lists[1:]:
+            if not ids:
+                break
+            ids = intersect(ids, other)
+
+        if len(tokens) > 2 and ids:
+            ids = array('I', self.store.filter_phrase(ids, FIELDS[field], tokens))
+        return ids
+
+    def _clause_postings(self, field: str, kind: str, tokens: List[str]) -> array:
+        if kind == 'phrase':
+            return self.phrase_postings(field, tokens)
+        if kind == 'prefix':
+            return self.prefix_postings(field, tokens[0])
+        return self.postings(field, tokens[0])
+
+    def match(self, fields: Sequence[str], query: str) -> Optional[array]:
+        """Ids matching every clause of query in any of fields.
+
+        Returns None when the query has no searchable tokens.
+        """
+        clauses = parse_query(query)
+        if not clauses:
+            return None
+
+        lists = sorted((
+            union([self._clause_postings(field, kind, tokens) for field in fields])
+            for kind, tokens in clauses
+        ), key=len)
+
+        ids = lists[0]
+        for other in lists[1:]:
+            if not ids:
+                break
+            ids = intersect(ids, other)
+        return ids
@@ -0,0 +1,264 @@
+import sys
+from array import array
+from bisect import bisect_right
+from collections import Counter
+from itertools import accumulate
+from operator import attrgetter
+from typing import Dict, Iterable, Iterator, List, Sequence, Set, Tuple
+
+# Row fields in Trial order; phase, status and sponsor are dictionary-encoded,
+# conditions and interventions are flattened with per-row offsets
+COLUMNS = ('nct_id', 'title', 'phase', 'status', 'sponsor', 'conditions', 'interventions')
+LIST_SEPARATOR = '; '
+
+
+def _dense_ranks(keys: List[str]) -> List[int]:
+    """Rank each row by key; equal keys share a rank so later columns break ties."""
+    ranks = [0] * len(keys)
+    rank = -1
+    previous = None
+    for row in sorted(range(len(keys)), key=keys.__getitem__):
+        if keys[row] != previous:
+            rank += 1
+            previous = keys[row]
+        ranks[row] = rank
+    return ranks
+
+
+class _Text:
+    """Case-folded cells of a column, also joined into one string.
+
+    A rare term is found with str.find over the whole column, jumping to
+    the next row after each hit, so rows without it cost nothing in Python
+    bytecode. A common term (str.count says most rows have it) is tested
+    row by row instead, which is cheaper than a find and bisect per hit.
+    """
+
+    def __init__(self, cells: Iterable[str]):
+        self.cells = [cell.casefold() for cell in cells]
+        self.text = '\n'.join(self.cells)
+        # Start offset of every row, plus one past the end
+        self.starts = list(accumulate([0] + [len(cell) + 1 for cell in self.cells]))
+
+    def rows(self, term: str) -> Set[int]:
+        if self.text.count(term) * 4 > len(self.cells):
+            return {row for row, cell in enumerate(self.cells) if term in cell}
+        rows = set()
+        pos = self.text.find(term)
+        while pos >= 0:
+            row = bisect_right(self.starts, pos) - 1
+            rows.add(row)
+            pos = self.text.find(term, self.starts[row + 1])
+        return rows
+
+
+class DictColumn:
+    """A string column stored as codes into the table of its distinct values."""
+
+    def __init__(self, cells: Iterable[str]):
+        index: Dict[str, int] = {}
+        self.codes = array('I', [index.setdefault(cell, len(index)) for cell in cells])
+        self.values = list(index)
+        self._rows_by_code = None
+
+    def __getitem__(self, row: int) -> str:
+        return self.values[self.codes[row]]
+
+    def cells(self) -> List[str]:
+        return list(map(self.values.__getitem__, self.codes))
+
+    def counts(self) -> Counter:
+        """Rows per distinct value, counted over the codes."""
+        values = self.values
+        return Counter({values[code]: n for code, n in Counter(self.codes).items()})
+
+    def ranks(self) -> List[int]:
+        """Case-insensitive sort rank of every row, ranking only the distinct values."""
+        value_ranks = _dense_ranks([value.casefold() for value in self.values])
+        return list(map(value_ranks.__getitem__, self.codes))
+
+    def rows_for(self, codes: Iterable[int]) -> Set[int]:
+        """Rows holding any of the given codes."""
+        if self._rows_by_code is None:
+            groups = [[] for _ in self.values]
+            for row, code in enumerate(self.codes):
+                groups[code].append(row)
+            self._rows_by_code = groups
+        rows = set()
+        for code in codes:
+            rows.update(self._rows_by_code[code])
+        return rows
+
+    def matching(self, term: str) -> Set[int]:
+        """Rows whose case-folded value contains term."""
+        return self.rows_for(
+            code for code, value in enumerate(self.values) if term in value.casefold()
+        )
+
+    def estimate_size(self) -> int:
+        return (
+            sys.getsizeof(self.codes) + sys.getsizeof(self.values)
+            + sum(map(sys.getsizeof, self.values))
+        )
+
+
+class ListColumn:
+    """A column of string tuples: one flat array of value codes plus row offsets."""
+
+    def __init__(self, cells: Iterable[Sequence[str]]):
+        index: Dict[str, int] = {}
+        codes = array('I')
+        offsets = array('I', [0])
+        for cell in cells:
+            codes.extend([index.setdefault(value, len(index)) for value in cell])
+            offsets.append(len(codes))
+        self.codes = codes
+        self.offsets = offsets
+        self.values = list(index)
+
+    def __getitem__(self, row: int) -> Tuple[str, ...]:
+        values = self.values
+        return tuple(
+            values[code] for code in self.codes[self.offsets[row]:self.offsets[row + 1]]
+        )
+
+    def cells(self) -> List[str]:
+        """Every row joined as it is displayed and exported."""
+        values, codes, offsets = self.values, self.codes, self.offsets
+        return [
+            LIST_SEPARATOR.join([values[code] for code in codes[start:end]])
+            for start, end in zip(offsets, offsets[1:])
+        ]
+
+    def counts(self) -> Counter:
+        """Rows per distinct value (a value is listed once per row)."""
+        values = self.values
+        return Counter({values[code]: n for code, n in Counter(self.codes).items()})
+
+    def estimate_size(self) -> int:
+        return (
+            sys.getsizeof(self.codes) + sys.getsizeof(self.offsets)
+            + sys.getsizeof(self.values) + sum(map(sys.getsizeof, self.values))
+        )
+
+
+class TrialColumns:
+    """Trials of a SearchResult stored column by column.
+
+    Phase, status and sponsor repeat heavily, so they are dictionary-encoded:
+    counting, ranking and matching them works on the few distinct values
+    and maps back to rows through the codes. Sort ranks and case-folded
+    search text are built per column on first use and kept, so repeated
+    DataTables draws over the same result only sort ints and scan strings.
+    """
+
+    def __init__(self, trials: Sequence):
+        self.nct_id = list(map(attrgetter('nct_id'), trials))
+        self.title = list(map(attrgetter('title'), trials))
+        self.phase = DictColumn(map(attrgetter('phase'), trials))
+        self.status = DictColumn(map(attrgetter('status'), trials))
+        self.sponsor = DictColumn(map(attrgetter('sponsor'), trials))
+        self.conditions = ListColumn(map(attrgetter('conditions'), trials))
+        self.interventions = ListColumn(map(attrgetter('interventions'), trials))
+        self._ranks: Dict[str, List[int]] = {}
+        self._text: Dict[str, _Text] = {}
+
+    def __len__(self) -> int:
+        return len(self.nct_id)
+
+    def cell(self, row: int, column: str) -> str:
+        """Display text of one cell; list columns are joined with LIST_SEPARATOR."""
+        value = getattr(self, column)[row]
+        if isinstance(value, str):
+            return value
+        return LIST_SEPARATOR.join(value)
+
+    def cells(self, column: str) -> List[str]:
+        """Display text of a whole column."""
+        values = getattr(self, column)
+        if isinstance(values, list):
+            return values
+        return values.cells()
+
+    def rows(self) -> Iterator[tuple]:
+        """Every row as a tuple of display cells in COLUMNS order."""
+        return zip(*(self.cells(column) for column in COLUMNS))
+
+    def value_counts(self, column: str) -> Counter:
+        """Rows per value of a dictionary-encoded or list column."""
+        return getattr(self, column).counts()
+
+    def ranks(self, column: str) -> List[int]:
+        """Case-insensitive dense sort rank of every row in column."""
+        ranks = self._ranks.get(column)
+        if ranks is None:
+            values = getattr(self, column)
+            if isinstance(values, DictColumn):
+                ranks = values.ranks()
+            else:
+                ranks = _dense_ranks([cell.casefold() for cell in self.cells(column)])
+            self._ranks[column] = ranks
+        return ranks
+
+    def sort(self, rows: Iterable[int], order: List[Tuple[str, bool]]) -> List[int]:
+        """rows sorted by [(column, descending)], stable for ties."""
+        if not order:
+            return list(rows)
+        if len(order) == 1:
+            column, descending = order[0]
+            return sorted(rows, key=self.ranks(column).__getitem__, reverse=descending)
+        keys = [(self.ranks(column), descending) for column, descending in order]
+        return sorted(rows, key=lambda r: tuple(
+            -ranks[r] if descending else ranks[r] for ranks, descending in keys
+        ))
+
+    def matching(self, term: str) -> Set[int]:
+        """Rows where any column contains term (already case-folded)."""
+        rows = set()
+        for column in COLUMNS:
+            values = getattr(self, column)
+            if isinstance(values, DictColumn):
+                rows |= values.matching(term)
+                continue
+            text = self._text.get(column)
+            if text is None:
+                text = self._text[column] = _Text(self.cells(column))
+            rows |= text.rows(term)
+        return rows
+
+    def search(self, query: str) -> List[int]:
+        """Rows, in order, containing every whitespace-separated term of query."""
+        terms = query.casefold().split()
+        if not terms:
+            return list(range(len(self)))
+        rows = self.matching(terms[0])
+        for term in terms[1:]:
+            if not rows:
+                break
+            rows &= self.matching(term)
+        return sorted(rows)
+
+    def isin(self, column: str, values: Iterable[str]) -> List[int]:
+        """Rows, in order, whose dictionary-encoded column is one of values."""
+        encoded = getattr(self, column)
+        wanted = set(values)
+        return sorted(encoded.rows_for(
+            code for code, value in enumerate(encoded.values) if value in wanted
+        ))
+
+    def estimate_size(self) -> int:
+        """Approximate bytes held once sort ranks and search text are built.
+
+        ID and title strings are shared with the trials and not counted;
+        search text holds each text column twice (per row and joined).
+        """
+        rows = len(self)
+        text = sum(map(len, self.nct_id)) + sum(map(len, self.title))
+        for column in (self.conditions, self.interventions):
+            text += sum(map(len, map(column.values.__getitem__, column.codes)))
+        return (
+            sys.getsizeof(self.nct_id) + sys.getsizeof(self.title)
+            + sum(getattr(self, column).estimate_size() for column in COLUMNS[2:])
+            + rows * len(COLUMNS) * 8
+            + 2 * text
+        )
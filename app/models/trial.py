@@ -1,5 +1,6 @@
+import sys
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 VALID_STATUSES = [
     ("RECRUITING", "Recruiting"),
@@ -20,15 +21,40 @@ VALID_PHASES = [
     ("PHASE4", "Phase 4"),
 ]
 
+
+def phase_codes(phase: str) -> List[str]:
+    """Phase codes of a Trial.phase string ('N/A' has none)."""
+    return [] if phase == 'N/A' else [p.strip() for p in phase.split(',') if p.strip()]
+
+
+def _shared(value: str) -> str:
+    """One shared copy of a frequently repeated string."""
+    return sys.intern(value) if type(value) is str else value
+
+
 @dataclass
 class Trial:
+    # Result caches hold many thousands of trials: slots drop the per-instance
+    # __dict__, lists become tuples, and phase/status/sponsor and condition and
+    # intervention names (small vocabularies) are interned so trials share them
+    __slots__ = (
+        'nct_id', 'title', 'phase', 'status', 'sponsor', 'conditions', 'interventions'
+    )
+
     nct_id: str
     title: str
     phase: str
     status: str
     sponsor: str
-    conditions: List[str]
-    interventions: List[str]
+    conditions: Tuple[str, ...]
+    interventions: Tuple[str, ...]
+
+    def __post_init__(self):
+        self.phase = _shared(self.phase)
+        self.status = _shared(self.status)
+        self.sponsor = _shared(self.sponsor)
+        self.conditions = tuple(map(_shared, self.conditions))
+        self.interventions = tuple(map(_shared, self.interventions))
 
 @dataclass
 class SearchParams:
@@ -42,3 +68,4 @@ class SearchResult:
     trials: List[Trial]
     total_count: int
     truncated: bool  # True if results exceeded MAX_RESULTS limit
+    stale: bool = False  # True if served from an expired cache entry during an outage
@@ -1,12 +1,98 @@
-import csv
-import io
-from flask import Blueprint, render_template, request, Response, flash
+import secrets
+from flask import (
+    Blueprint, render_template, request, Response, flash, jsonify, stream_with_context
+)
 
+from app.config import (
+    RESULT_HANDLE_TTL, BULK_EXPORT_MAX_RESULTS, DATATABLES_PAGE_SIZE, TRIALS_BACKEND,
+    MIRROR_DB_PATH, EXPORT_STREAM_PARSE, ASYNC_UPSTREAM
+)
+from app.mirror.backend import LocalTrialsBackend
+from app.mirror.store import TrialStore
 from app.models.trial import SearchParams, VALID_PHASES, VALID_STATUSES
+from app.services.async_clinical_trials import AsyncClinicalTrialsService
+from app.services.cache import ResultCache
 from app.services.clinical_trials import ClinicalTrialsService
+from app.services.datatables import TableView, draw
+from app.services.export import iter_csv, track_progress
+from app.services.facets import facet_counts
 
 search_bp = Blueprint('search', __name__)
-service = ClinicalTrialsService()
+
+
+def _create_service():
+    """Search backend selected by TRIALS_BACKEND."""
+    if TRIALS_BACKEND == 'local':
+        return LocalTrialsBackend(TrialStore(MIRROR_DB_PATH))
+    return ClinicalTrialsService()
+
+
+def _create_async_service(service):
+    """Event-loop fetcher for /search and /export when ASYNC_UPSTREAM is set.
+
+    Only the live API backend has upstream requests to run on a loop.
+    """
+    if ASYNC_UPSTREAM and isinstance(service, ClinicalTrialsService):
+        return AsyncClinicalTrialsService(service)
+    return None
+
+
+service = _create_service()
+async_service = _create_async_service(service)
+result_handles = ResultCache(ttl=RESULT_HANDLE_TTL)
+table_views = ResultCache(ttl=RESULT_HANDLE_TTL, sizeof=TableView.estimate_size)
+
+
+def _search_params(args):
+    """Build SearchParams from request query arguments."""
+    compound = args.get('compound', '').strip()
+    condition = args.get('condition', '').strip()
+    phases = args.getlist('phases')
+    statuses = args.getlist('statuses')
+
+    return SearchParams(
+        compound=compound or None,
+        condition=condition or None,
+        phases=phases or None,
+        statuses=statuses or None
+    )
+
+
+def _store_result(result):
+    """Keep a search result under a short-lived handle for follow-up requests."""
+    handle = secrets.token_urlsafe(12)
+    result_handles.put(handle, result)
+    return handle
+
+
+def _stored_view(handle):
+    """Sortable view of the live result behind handle, or None once it expired."""
+    if not handle:
+        return None
+    view = table_views.get(handle)
+    if view is None:
+        result = result_handles.get(handle)
+        if result is None:
+            return None
+        view = TableView(result)
+        table_views.put(handle, view)
+    return view
+
+
+def _table_view(handle, params):
+    """Sortable view of the result behind handle, refetching if it expired.
+
+    Returns None when the handle is gone and params have no criterion to
+    refetch with, rather than fetching every study.
+    """
+    view = _stored_view(handle)
+    if view is None:
+        if not any([params.compound, params.condition, params.phases, params.statuses]):
+            return None
+        view = TableView(service.fetch_all(params))
+        if handle:
+            table_views.put(handle, view)
+    return view
 
 
 @search_bp.route('/')
@@ -19,45 +105,62 @@ def index():
     )
 
 
-@search_bp.route('/search')
+def _search_form(message, category):
+    """Re-render the search form with a flashed message."""
+    flash(message, category)
+    return render_template(
+        'search.html',
+        phases=VALID_PHASES,
+        statuses=VALID_STATUSES
+    )
+
+
 def search():
     """Execute search and render results table."""
-    compound = request.args.get('compound', '').strip()
-    condition = request.args.get('condition', '').strip()
-    phases = request.args.getlist('phases')
-    statuses = request.args.getlist('statuses')
+    params = _search_params(request.args)
 
     # Require at least one search criterion
-    if not any([compound, condition, phases, statuses]):
-        flash('Please enter at least one search criterion.', 'warning')
-        return render_template(
-            'search.html',
-            phases=VALID_PHASES,
-            statuses=VALID_STATUSES
-        )
-
-    params = SearchParams(
-        compound=compound or None,
-        condition=condition or None,
-        phases=phases or None,
-        statuses=statuses or None
-    )
+    if not any([params.compound, params.condition, params.phases, params.statuses]):
+        return _search_form('Please enter at least one search criterion.', 'warning')
 
     try:
         result = service.fetch_all(params)
     except Exception as e:
-        flash(f'Error fetching results: {str(e)}', 'danger')
-        return render_template(
-            'search.html',
-            phases=VALID_PHASES,
-            statuses=VALID_STATUSES
-        )
+        return _search_form(f'Error fetching results: {str(e)}', 'danger')
+    return _results_page(params, result)
+
+
+async def search_async():
+    """search, awaiting the result on the async service's loop."""
+    params = _search_params(request.args)
+
+    if not any([params.compound, params.condition, params.phases, params.statuses]):
+        return _search_form('Please enter at least one search criterion.', 'warning')
+
+    try:
+        result = await async_service.run(async_service.fetch_all(params))
+    except Exception as e:
+        return _search_form(f'Error fetching results: {str(e)}', 'danger')
+    return _results_page(params, result)
+
+
+def _results_page(params, result):
+    """Render the results table for a completed search."""
+    # Render the first page server-side; DataTables requests the rest from
+    # /api/trials, so the page never carries more than one page of rows
+    handle = _store_result(result)
+    first_page = _table_view(handle, params).page(0, DATATABLES_PAGE_SIZE, [(0, False)])
 
     return render_template(
         'results.html',
+        handle=handle,
+        bulk_max=BULK_EXPORT_MAX_RESULTS,
+        page_size=DATATABLES_PAGE_SIZE,
+        rows=first_page['data'],
         trials=result.trials,
         total_count=result.total_count,
         truncated=result.truncated,
+        stale=result.stale,
         params=params,
         phases=VALID_PHASES,
         statuses=VALID_STATUSES
@@ -67,45 +170,128 @@ def search():
 @search_bp.route('/export')
 def export():
     """Stream CSV download of search results."""
-    compound = request.args.get('compound', '').strip()
-    condition = request.args.get('condition', '').strip()
-    phases = request.args.getlist('phases')
-    statuses = request.args.getlist('statuses')
+    params = _search_params(request.args)
 
-    params = SearchParams(
-        compound=compound or None,
-        condition=condition or None,
-        phases=phases or None,
-        statuses=statuses or None
+    if request.args.get('bulk') == '1':
+        # A bulk pull without criteria would walk the whole registry
+        if not any([params.compound, params.condition, params.phases, params.statuses]):
+            return jsonify({'error': 'Please enter at least one search criterion.'}), 400
+        return _bulk_export(params)
+
+    # Reuse the result set from /search; stream from the API only if the
+    # handle expired
+    view = _stored_view(request.args.get('handle'))
+    if view is not None:
+        pages = [view.columns]
+    elif async_service is not None:
+        pages = async_service.stream_pages_sync(params)
+    else:
+        pages = service.stream_pages(params)
+
+    return Response(
+        stream_with_context(iter_csv(pages)),
+        mimetype='text/csv',
+        headers={'Content-Disposition': 'attachment; filename=clinical_trials.csv'}
     )
 
-    result = service.fetch_all(params)
 
-    # Build CSV in memory
-    output = io.StringIO()
-    writer = csv.writer(output)
+def _register_search_view(state):
+    """Serve /search with an async view only when the async service is enabled.
+
+    Flask runs each async view on an event loop of its own, which a search
+    on the threaded service would set up for nothing.
+    """
+    view = search_async if async_service is not None else search
+    state.add_url_rule('/search', 'search', view)
+
 
-    # Header row
-    writer.writerow([
-        'NCT ID', 'Title', 'Phase', 'Status', 'Sponsor', 'Conditions', 'Interventions'
-    ])
+search_bp.record(_register_search_view)
 
-    # Data rows
-    for trial in result.trials:
-        writer.writerow([
-            trial.nct_id,
-            trial.title,
-            trial.phase,
-            trial.status,
-            trial.sponsor,
-            '; '.join(trial.conditions),
-            '; '.join(trial.interventions)
-        ])
 
-    output.seek(0)
+def _bulk_export(params):
+    """Stream every matching trial up to BULK_EXPORT_MAX_RESULTS.
+
+    Unlike the interactive export this ignores MAX_RESULTS. The first page is
+    fetched up front so the expected row count can be sent as X-Total-Count,
+    which lets clients report download progress.
+    """
+    if async_service is not None:
+        pages = async_service.iter_pages_sync(
+            params, max_results=BULK_EXPORT_MAX_RESULTS, partition=True
+        )
+    else:
+        pages = service.iter_pages(
+            params, max_results=BULK_EXPORT_MAX_RESULTS, stream=EXPORT_STREAM_PARSE,
+            partition=True
+        )
+    first_page, total_count = next(pages, ([], 0))
+    expected = min(total_count, BULK_EXPORT_MAX_RESULTS)
+
+    def trial_pages():
+        yield first_page
+        for trials, _ in pages:
+            yield trials
 
     return Response(
-        output.getvalue(),
+        stream_with_context(iter_csv(track_progress(trial_pages(), expected))),
         mimetype='text/csv',
-        headers={'Content-Disposition': 'attachment; filename=clinical_trials.csv'}
+        headers={
+            'Content-Disposition': 'attachment; filename=clinical_trials.csv',
+            'X-Total-Count': str(expected),
+            'X-Export-Truncated': 'true' if total_count > expected else 'false',
+        }
     )
+
+
+@search_bp.route('/api/trials')
+def trials_data():
+    """DataTables server-side processing endpoint for a stored result."""
+    params = _search_params(request.args)
+    try:
+        view = _table_view(request.args.get('handle'), params)
+    except Exception as e:
+        return jsonify({
+            'draw': request.args.get('draw', 0, type=int),
+            'error': f'Error fetching results: {str(e)}'
+        })
+    if view is None:
+        return jsonify({
+            'draw': request.args.get('draw', 0, type=int),
+            'error': 'Please enter at least one search criterion.'
+        })
+    return jsonify(draw(view, request.args))
+
+
+@search_bp.route('/api/facets')
+def facets():
+    """Counts per phase, status and top sponsors for a search.
+
+    With a live handle the counts come from the stored /search result;
+    otherwise from the backend's cache. Only with fetch=1 (an explicit
+    action, not a keystroke) may the backend run the search; without it an
+    uncached query gets 204 No Content.
+    """
+    params = _search_params(request.args)
+    view = _stored_view(request.args.get('handle'))
+    if view is not None:
+        return jsonify(facet_counts(view.columns, view.result.total_count))
+
+    if not any([params.compound, params.condition, params.phases, params.statuses]):
+        return jsonify({'error': 'Please enter at least one search criterion.'}), 400
+
+    try:
+        counts = service.facets(params, fetch=request.args.get('fetch') == '1')
+    except Exception as e:
+        return jsonify({'error': f'Error fetching results: {str(e)}'}), 502
+    if counts is None:
+        return '', 204
+    return jsonify(counts)
+
+
+@search_bp.route('/stats')
+def stats():
+    """Expose service statistics (connection pool usage) as JSON."""
+    stats = service.stats()
+    if async_service is not None:
+        stats['async'] = async_service.stats()
+    return jsonify(stats)
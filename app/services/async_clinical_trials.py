@@ -0,0 +1,332 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+from typing import AsyncIterator, Awaitable, Iterator, List, Optional, Tuple, TypeVar
+
+from app.config import MAX_RESULTS, PARTITION_WORKERS
+from app.models.trial import Trial, SearchParams, SearchResult
+from app.services.async_transport import AsyncTransport
+from app.services.cache import canonical_key
+from app.services.clinical_trials import ClinicalTrialsService, _PageWalk, _PartitionMerge
+from app.services.page_cache import CachedResponse
+from app.services.retry import RetryBudget
+from app.services.singleflight import AsyncSingleFlight
+
+T = TypeVar('T')
+
+
+class AsyncClinicalTrialsService:
+    """Asyncio variant of ClinicalTrialsService for the live API.
+
+    Upstream pages are fetched by coroutines on one event loop thread over
+    the aiohttp connection pool of an AsyncTransport, so a search waiting on
+    the network holds no thread and hundreds can be in flight at once.
+    Query building, decoding, the result and page caches and statistics are
+    those of the wrapped service, so both variants serve each other's
+    cached results.
+
+    Coroutines must run on the service's loop. From other threads or event
+    loops (Flask runs each async view on a loop of its own) await run(), or
+    use iter_pages_sync() for a blocking iterator.
+    """
+
+    def __init__(
+        self,
+        service: ClinicalTrialsService,
+        transport: Optional[AsyncTransport] = None
+    ):
+        self.service = service
+        self.transport = transport or AsyncTransport()
+        self.flights = AsyncSingleFlight()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The service's event loop, started on a daemon thread on first use."""
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever, name='ct-async', daemon=True
+                ).start()
+                self._loop = loop
+            return self._loop
+
+    def submit(self, coro: Awaitable[T]) -> 'Future[T]':
+        """Schedule coro on the service loop from any thread."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    async def run(self, coro: Awaitable[T]) -> T:
+        """Await coro on the service loop from another event loop."""
+        return await asyncio.wrap_future(self.submit(coro))
+
+    async def fetch_all(self, params: SearchParams) -> SearchResult:
+        """Fetch all results up to MAX_RESULTS, serving repeats from cache.
+
+        Concurrent callers with the same canonical params share one fetch,
+        and outages fall back to stale results as in the threaded service.
+        """
+        cache = self.service.cache
+        key = canonical_key(params)
+        result = cache.get(key)
+        if result is not None:
+            return result
+
+        async def fetch() -> SearchResult:
+            cached = cache.get(key, record=False)
+            if cached is not None:
+                return cached
+            fetched = await self._fetch_all_uncached(params)
+            cache.put(key, fetched)
+            return fetched
+
+        try:
+            return await self.flights.do(key, fetch)
+        except Exception as e:
+            stale = self.service._stale_result(key, e)
+            if stale is None:
+                raise
+            return stale
+
+    async def stream_pages(self, params: SearchParams) -> AsyncIterator[List[Trial]]:
+        """Yield trials page by page, from cache when the query is cached."""
+        result = self.service.cache.get(canonical_key(params))
+        if result is not None:
+            yield result.trials
+            return
+
+        async for trials, _ in self.iter_pages(params):
+            yield trials
+
+    async def iter_pages(
+        self,
+        params: SearchParams,
+        max_results: Optional[int] = None,
+        prefetch: bool = True,
+        partition: bool = False,
+        budget: Optional[RetryBudget] = None
+    ) -> AsyncIterator[Tuple[List[Trial], int]]:
+        """Yield (trials, total_count) for each API page as it is fetched.
+
+        As ClinicalTrialsService.iter_pages: with prefetch the next page is
+        requested as a task as soon as its token is found in the raw body,
+        and with partition a large search is split into sub-queries fetched
+        side by side (at most PARTITION_WORKERS at a time). Transient
+        failures are retried with the wrapped service's RetryPolicy, within
+        budget when one is passed.
+        """
+        if max_results is None:
+            max_results = MAX_RESULTS
+        if partition:
+            async for page in self._iter_partitioned_pages(params, max_results, budget):
+                yield page
+            return
+
+        walk = _PageWalk(self.service, max_results, prefetch)
+        response = await self._request_page(params, budget=budget)
+        pending = None
+
+        try:
+            while True:
+                pending_token = walk.peek(response)
+                if pending_token:
+                    pending = asyncio.ensure_future(
+                        self._request_page(params, pending_token, budget)
+                    )
+
+                trials = walk.take(response)
+                if pending is not None and not walk.keeps(pending_token):
+                    pending.cancel()
+                    pending = None
+                if prefetch and walk.next_token and pending is None:
+                    pending = asyncio.ensure_future(
+                        self._request_page(params, walk.next_token, budget)
+                    )
+
+                yield trials, walk.total_count
+
+                if not walk.next_token:
+                    break
+                if pending is not None:
+                    response, pending = await pending, None
+                else:
+                    response = await self._request_page(params, walk.next_token, budget)
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    def iter_pages_sync(
+        self,
+        params: SearchParams,
+        max_results: Optional[int] = None,
+        partition: bool = False
+    ) -> Iterator[Tuple[List[Trial], int]]:
+        """Blocking iterator over iter_pages for threads outside the loop."""
+        return self._iterate_sync(self.iter_pages(params, max_results, partition=partition))
+
+    def stream_pages_sync(self, params: SearchParams) -> Iterator[List[Trial]]:
+        """Blocking iterator over stream_pages for threads outside the loop."""
+        return self._iterate_sync(self.stream_pages(params))
+
+    def _iterate_sync(self, pages: AsyncIterator[T]) -> Iterator[T]:
+        """Step an async generator on the service loop; only the caller's thread waits."""
+        try:
+            while True:
+                try:
+                    yield self.submit(pages.__anext__()).result()
+                except StopAsyncIteration:
+                    return
+        finally:
+            self.submit(pages.aclose()).result()
+
+    async def _iter_partitioned_pages(
+        self, params: SearchParams, max_results: int, budget: Optional[RetryBudget]
+    ) -> AsyncIterator[Tuple[List[Trial], int]]:
+        """Async ClinicalTrialsService._iter_partitioned_pages."""
+        pages = self.iter_pages(params, max_results, budget=budget)
+        try:
+            first, total_count = await pages.__anext__()
+        except StopAsyncIteration:
+            first, total_count = [], 0
+        subqueries = self.service._partition_plan(params, total_count, max_results)
+        if not subqueries:
+            yield first, total_count
+            async for page in pages:
+                yield page
+            return
+        await pages.aclose()
+        self.service.counters.incr('partitioned_searches')
+
+        merge = _PartitionMerge(params, total_count)
+        yield merge.unseen(first), total_count
+        async for trials in self._fetch_partitions(subqueries, max_results, budget):
+            trials = merge.unseen(trials)
+            if trials:
+                yield trials, total_count
+
+        if merge.needs_gap_fill():
+            async for trials, _ in self.iter_pages(params, max_results, budget=budget):
+                trials = merge.unseen(trials)
+                if trials:
+                    yield trials, total_count
+                if merge.complete:
+                    break
+
+    async def _fetch_partitions(
+        self,
+        subqueries: List[SearchParams],
+        max_results: int,
+        budget: Optional[RetryBudget]
+    ) -> AsyncIterator[List[Trial]]:
+        """Yield pages of every sub-query as they arrive, PARTITION_WORKERS at a time.
+
+        As in the threaded service at most PARTITION_WORKERS * 2 pages wait
+        for the consumer; closing the generator cancels the tasks.
+        """
+        results = asyncio.Queue(maxsize=PARTITION_WORKERS * 2)
+        slots = asyncio.Semaphore(PARTITION_WORKERS)
+        done = object()
+
+        async def fetch(subquery: SearchParams):
+            try:
+                async with slots:
+                    async for trials, _ in self.iter_pages(
+                        subquery, max_results, prefetch=False, budget=budget
+                    ):
+                        await results.put(trials)
+            except Exception as e:
+                await results.put(e)
+            await results.put(done)
+
+        tasks = [asyncio.ensure_future(fetch(subquery)) for subquery in subqueries]
+        try:
+            remaining = len(tasks)
+            while remaining:
+                item = await results.get()
+                if item is done:
+                    remaining -= 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _fetch_all_uncached(self, params: SearchParams) -> SearchResult:
+        """Fetch all results, paginating through API up to MAX_RESULTS."""
+        all_trials = []
+        total_count = 0
+        bytes_before = self.service.counters.get('bytes_received')
+        budget = self.service.retry.budget()
+
+        async for trials, total in self.iter_pages(params, budget=budget):
+            total_count = total
+            all_trials.extend(trials)
+
+        return self.service._search_result(params, all_trials, total_count, bytes_before)
+
+    async def _request_page(
+        self,
+        params: SearchParams,
+        page_token: Optional[str] = None,
+        budget: Optional[RetryBudget] = None
+    ):
+        """Return the raw response for one page, from the page cache if present.
+
+        The page cache is SQLite, so it is read and written on the default
+        executor rather than on the loop.
+        """
+        service = self.service
+        if service.page_cache is None:
+            return await self._request_page_upstream(params, page_token, budget)
+
+        loop = asyncio.get_running_loop()
+        key = service._page_cache_key(params, page_token)
+        body = await loop.run_in_executor(None, service._page_cache_get, key)
+        if body is not None:
+            service.counters.incr('page_cache_hits')
+            return CachedResponse(body)
+
+        response = await self._request_page_upstream(params, page_token, budget)
+        await loop.run_in_executor(None, service._page_cache_put, key, response.content)
+        return response
+
+    async def _request_page_upstream(
+        self,
+        params: SearchParams,
+        page_token: Optional[str] = None,
+        budget: Optional[RetryBudget] = None
+    ):
+        """Request one page, retrying transient failures, and return the buffered response."""
+        return await self.service.retry.call_async(
+            lambda: self._send_page_request(params, page_token), budget
+        )
+
+    async def _send_page_request(self, params: SearchParams, page_token: Optional[str]):
+        """Issue the HTTP request for one page once, within the upstream throttle."""
+        service = self.service
+        query_params = service._page_query(params, page_token)
+
+        probe = service.breaker.check()
+        async with service.throttle.async_slot():
+            with service.breaker.measure(probe):
+                start = time.perf_counter()
+                response = await self.transport.get(service.base_url, params=query_params)
+                service.timings.observe(
+                    'next_page' if page_token else 'first_page', time.perf_counter() - start
+                )
+                response.raise_for_status()
+
+        service.counters.incr('pages')
+        service.counters.incr('bytes_received', len(response.content))
+        return response
+
+    def stats(self) -> dict:
+        """Statistics of the async transport and single-flight."""
+        return {
+            'transport': self.transport.stats(),
+            'single_flight': self.flights.stats(),
+        }
@@ -0,0 +1,90 @@
+import asyncio
+from typing import Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from app.config import ASYNC_POOL_MAXSIZE, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT
+
+try:
+    import aiohttp
+except ImportError:  # optional; only ASYNC_UPSTREAM needs it
+    aiohttp = None
+
+
+class BufferedResponse:
+    """A fully read upstream response with the requests.Response surface the service uses."""
+
+    def __init__(self, url: str, status_code: int, headers: dict, content: bytes):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(
+                f'{self.status_code} Error for url: {self.url}', response=self
+            )
+
+
+class AsyncTransport:
+    """aiohttp counterpart of PooledTransport for coroutines on one event loop.
+
+    A single ClientSession, created on first use inside the running loop,
+    keeps up to pool_maxsize keep-alive connections; requests beyond that
+    wait for a free connection without holding a thread.
+    """
+
+    def __init__(
+        self,
+        pool_maxsize: int = ASYNC_POOL_MAXSIZE,
+        connect_timeout: float = HTTP_CONNECT_TIMEOUT,
+        read_timeout: float = HTTP_READ_TIMEOUT
+    ):
+        if aiohttp is None:
+            raise RuntimeError('The async transport needs aiohttp (pip install aiohttp)')
+        self.pool_maxsize = pool_maxsize
+        # sock_connect, not connect: the latter also counts the wait for a
+        # free pooled connection, failing queued requests under local load
+        self.timeout = aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+        self._session: Optional['aiohttp.ClientSession'] = None
+        self._requests = 0
+        self._in_flight = 0
+
+    def _get_session(self) -> 'aiohttp.ClientSession':
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_maxsize),
+                timeout=self.timeout,
+            )
+        return self._session
+
+    async def get(self, url: str, params: Optional[dict] = None) -> BufferedResponse:
+        """GET url and read the whole body."""
+        query = {name: str(value) for name, value in (params or {}).items()}
+        self._requests += 1
+        self._in_flight += 1
+        try:
+            async with self._get_session().get(url, params=query) as response:
+                content = await response.read()
+                return BufferedResponse(
+                    str(response.url), response.status,
+                    CaseInsensitiveDict(response.headers), content
+                )
+        finally:
+            self._in_flight -= 1
+
+    def stats(self) -> dict:
+        return {
+            'requests': self._requests,
+            'in_flight': self._in_flight,
+            'maxsize': self.pool_maxsize,
+        }
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            # Let the connector finish closing its transports
+            await asyncio.sleep(0)
+            self._session = None
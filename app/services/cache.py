@@ -0,0 +1,170 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+from app.config import RESULT_CACHE_TTL, RESULT_CACHE_MAX_BYTES
+from app.models.trial import SearchParams, SearchResult
+
+
+def _normalize_text(value: Optional[str]) -> Optional[str]:
+    """Collapse whitespace and case-fold free-text criteria."""
+    if not value:
+        return None
+    normalized = ' '.join(value.split()).casefold()
+    return normalized or None
+
+
+def _normalize_codes(values: Optional[list]) -> tuple:
+    """Deduplicate and sort enum-style criteria (phases, statuses)."""
+    if not values:
+        return ()
+    return tuple(sorted({v.strip().upper() for v in values if v and v.strip()}))
+
+
+def canonical_key(params: SearchParams) -> tuple:
+    """Canonical, hashable form of SearchParams.
+
+    Searches that differ only in case, whitespace or the order of selected
+    phases/statuses map to the same key.
+    """
+    return (
+        _normalize_text(params.compound),
+        _normalize_text(params.condition),
+        _normalize_codes(params.phases),
+        _normalize_codes(params.statuses),
+    )
+
+
+def estimate_size(result: SearchResult) -> int:
+    """Approximate in-memory size of a SearchResult in bytes.
+
+    Strings shared between trials (interned phases, statuses, sponsors and
+    names) are counted once.
+    """
+    size = sys.getsizeof(result) + sys.getsizeof(result.trials)
+    seen = set()
+
+    def shared_size(value) -> int:
+        if id(value) in seen:
+            return 0
+        seen.add(id(value))
+        return sys.getsizeof(value)
+
+    for trial in result.trials:
+        size += sys.getsizeof(trial) + sys.getsizeof(trial.nct_id) + sys.getsizeof(trial.title)
+        size += shared_size(trial.phase) + shared_size(trial.status) + shared_size(trial.sponsor)
+        size += sys.getsizeof(trial.conditions) + sum(map(shared_size, trial.conditions))
+        size += sys.getsizeof(trial.interventions) + sum(map(shared_size, trial.interventions))
+    return size
+
+
+class ResultCache:
+    """Thread-safe LRU cache of SearchResults with TTL and a memory budget.
+
+    With stale_ttl, expired entries are kept that many seconds longer (still
+    within the memory budget) for get_stale(), which serves them while the
+    upstream is down. Values other than SearchResult can be stored by
+    passing a matching sizeof.
+    """
+
+    def __init__(
+        self,
+        ttl: float = RESULT_CACHE_TTL,
+        max_bytes: int = RESULT_CACHE_MAX_BYTES,
+        clock: Callable[[], float] = time.monotonic,
+        sizeof: Callable[[object], int] = estimate_size,
+        stale_ttl: float = 0
+    ):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._sizeof = sizeof
+        self._entries = OrderedDict()  # key -> (expires_at, size, result)
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.stale_hits = 0
+
+    def get(self, key: Hashable, record: bool = True) -> Optional[SearchResult]:
+        """Return the cached result for key, or None if missing or expired.
+
+        Pass record=False for internal re-checks that should not count as
+        hits or misses.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if record:
+                    self.misses += 1
+                return None
+
+            expires_at, size, result = entry
+            now = self._clock()
+            if expires_at <= now:
+                if expires_at + self.stale_ttl <= now:
+                    self._remove(key)
+                    self.expirations += 1
+                if record:
+                    self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            if record:
+                self.hits += 1
+            return result
+
+    def get_stale(self, key: Hashable) -> Optional[SearchResult]:
+        """Return the result for key even if expired, within stale_ttl."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] + self.stale_ttl <= self._clock():
+                return None
+            self.stale_hits += 1
+            return entry[2]
+
+    def put(self, key: Hashable, result: SearchResult):
+        """Store result, evicting least recently used entries over budget."""
+        size = self._sizeof(result)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (self._clock() + self.ttl, size, result)
+            self._bytes += size
+
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'stale_hits': self.stale_hits,
+            }
+
+    def _remove(self, key: Hashable):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
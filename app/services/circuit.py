@@ -0,0 +1,165 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable
+
+from app.config import (
+    CIRCUIT_FAILURE_RATE, CIRCUIT_MIN_REQUESTS, CIRCUIT_WINDOW, CIRCUIT_SLOW_CALL,
+    CIRCUIT_OPEN_SECONDS
+)
+from app.services.metrics import Counters
+from app.services.retry import is_transient
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the upstream while the circuit is open."""
+
+    def __init__(self, retry_in: float):
+        super().__init__(
+            f'ClinicalTrials.gov is unavailable; trying again in {max(retry_in, 0):.0f}s'
+        )
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Stops calling the upstream while most recent calls fail or are slow.
+
+    The outcomes of the last window calls are kept. A call fails if it
+    raises an error counted by is_failure (network errors and 429/5xx by
+    default, not client errors) or takes slow_call seconds or more. Once
+    at least min_requests outcomes are known and the failed share reaches
+    failure_rate, the circuit opens: calls raise CircuitOpenError at once
+    instead of tying up a worker on a dead upstream. After open_seconds a
+    single probe call is let through (half open); its success closes the
+    circuit, its failure opens it again. A probe with no outcome after
+    another open_seconds (hung, or cancelled before it was measured) no
+    longer holds back the next one.
+    """
+
+    def __init__(
+        self,
+        failure_rate: float = CIRCUIT_FAILURE_RATE,
+        min_requests: int = CIRCUIT_MIN_REQUESTS,
+        window: int = CIRCUIT_WINDOW,
+        slow_call: float = CIRCUIT_SLOW_CALL,
+        open_seconds: float = CIRCUIT_OPEN_SECONDS,
+        is_failure: Callable[[Exception], bool] = is_transient,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.failure_rate = failure_rate
+        self.min_requests = min_requests
+        self.slow_call = slow_call
+        self.open_seconds = open_seconds
+        self._is_failure = is_failure
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._outcomes = deque(maxlen=window)  # True for a failed call
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        self._probe_started = 0.0
+        self.counters = Counters()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and self._clock() - self._opened_at >= self.open_seconds:
+                return HALF_OPEN
+            return self._state
+
+    def check(self) -> bool:
+        """Raise CircuitOpenError unless a call may go upstream now.
+
+        Returns True if the call is the half-open probe.
+        """
+        with self._lock:
+            if self._state == CLOSED:
+                return False
+            now = self._clock()
+            retry_in = self._opened_at + self.open_seconds - now
+            if retry_in <= 0 and (
+                not self._probing or now - self._probe_started >= self.open_seconds
+            ):
+                self._state = HALF_OPEN
+                self._probing = True
+                self._probe_started = now
+                return True
+        self.counters.incr('rejected')
+        raise CircuitOpenError(retry_in)
+
+    def record(self, seconds: float, failed: bool = False, probe: bool = False):
+        """Record the outcome of a call admitted by check()."""
+        failed = failed or seconds >= self.slow_call
+        with self._lock:
+            if probe:
+                self._probing = False
+                if failed:
+                    self._open()
+                else:
+                    self._state = CLOSED
+                return
+            if self._state != CLOSED:
+                # Admitted before the circuit opened; only the probe decides
+                return
+
+            self._outcomes.append(failed)
+            failures = sum(self._outcomes)
+            if (self.failure_rate and len(self._outcomes) >= self.min_requests
+                    and failures >= self.failure_rate * len(self._outcomes)):
+                self._open()
+
+    def _open(self):
+        # Caller holds self._lock
+        self._state = OPEN
+        self._opened_at = self._clock()
+        self._outcomes.clear()
+        self.counters.incr('trips')
+
+    def _abandon(self):
+        """Let another probe through after this one was cancelled."""
+        with self._lock:
+            self._probing = False
+
+    @contextmanager
+    def guard(self):
+        """check(), then record the outcome and duration of the block."""
+        with self.measure(self.check()):
+            yield
+
+    @contextmanager
+    def measure(self, probe: bool = False):
+        """Record the outcome and duration of a call admitted by check().
+
+        For callers that queue between check() and the call itself, so
+        the wait is neither spent on an open circuit nor counted as slow.
+        """
+        start = time.perf_counter()
+        finished = False
+        try:
+            yield
+            finished = True
+        except Exception as e:
+            finished = True
+            self.record(time.perf_counter() - start, self._is_failure(e), probe)
+            raise
+        finally:
+            if not finished and probe:
+                self._abandon()
+        self.record(time.perf_counter() - start, probe=probe)
+
+    def stats(self) -> dict:
+        counts = self.counters.snapshot()
+        with self._lock:
+            outcomes = list(self._outcomes)
+        return {
+            'state': self.state,
+            'recent_requests': len(outcomes),
+            'recent_failures': sum(outcomes),
+            'trips': counts.get('trips', 0),
+            'rejected': counts.get('rejected', 0),
+        }
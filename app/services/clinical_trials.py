@@ -1,34 +1,569 @@
-import requests
-from typing import Optional, Tuple, List
+import logging
+import queue
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import replace
+from typing import Iterator, Optional, Tuple, List
 
-from app.config import API_BASE_URL, API_PAGE_SIZE, MAX_RESULTS
+from app.config import (
+    API_BASE_URL, API_PAGE_SIZE, MAX_RESULTS, API_PREFETCH_WORKERS, API_FIELD_PROJECTION,
+    PAGE_CACHE_PATH, FACET_TOP_SPONSORS, API_STREAM_CHUNK_SIZE, EXPORT_STREAM_PARSE,
+    PARTITION_WORKERS, PARTITION_MIN_PAGES, STALE_RESULT_TTL
+)
+from app.models.columns import TrialColumns
 from app.models.trial import Trial, SearchParams, SearchResult
+from app.services.cache import ResultCache, canonical_key
+from app.services.circuit import CircuitBreaker, CircuitOpenError
+from app.services.facets import facet_counts
+from app.services.json_decoder import JsonDecoder
+from app.services.metrics import Counters, Timings
+from app.services.page_cache import CachedResponse, PageCache, page_key
+from app.services.partition import plan_partitions
+from app.services.retry import RetryBudget, RetryPolicy, is_transient
+from app.services.singleflight import SingleFlight
+from app.services.study_stream import StudyStream
+from app.services.throttle import UpstreamThrottle
+from app.services.transport import PooledTransport
+
+logger = logging.getLogger(__name__)
+
+# Trial attribute -> API field path read by _parse_study. The same paths are
+# sent as the `fields` projection so the API only returns what is parsed.
+TRIAL_FIELDS = {
+    'nct_id': 'protocolSection.identificationModule.nctId',
+    'title': 'protocolSection.identificationModule.briefTitle',
+    'phase': 'protocolSection.designModule.phases',
+    'status': 'protocolSection.statusModule.overallStatus',
+    'sponsor': 'protocolSection.sponsorCollaboratorsModule.leadSponsor.name',
+    'conditions': 'protocolSection.conditionsModule.conditions',
+    'interventions': 'protocolSection.armsInterventionsModule.interventions.name',
+}
+
+API_FIELDS = ','.join(TRIAL_FIELDS.values())
+
+
+def extract_field(document, path: str):
+    """Follow a dotted field path, mapping over lists along the way.
+
+    Returns None for missing fields; a path through a list of objects
+    returns the list of values found.
+    """
+    value = document
+    for part in path.split('.'):
+        if isinstance(value, list):
+            value = [item.get(part) for item in value if isinstance(item, dict)]
+        elif isinstance(value, dict):
+            value = value.get(part)
+        else:
+            return None
+    return value
+
+
+def parse_study(study: dict) -> Trial:
+    """Parse an API study document into a Trial using TRIAL_FIELDS."""
+    fields = {name: extract_field(study, path) for name, path in TRIAL_FIELDS.items()}
+
+    phases = fields['phase'] or []
+    interventions = fields['interventions'] or []
+
+    return Trial(
+        nct_id=fields['nct_id'] or '',
+        title=fields['title'] or '',
+        phase=', '.join(phases) if phases else 'N/A',
+        status=fields['status'] or '',
+        sponsor=fields['sponsor'] or '',
+        conditions=fields['conditions'] or [],
+        interventions=[name for name in interventions if name]
+    )
+
+
+_NEXT_TOKEN_PATTERN = re.compile(rb'"nextPageToken"\s*:\s*"([^"\\]+)"')
+
+
+def _peek_next_token(response) -> Optional[str]:
+    """Find nextPageToken in a raw page body without decoding the JSON.
+
+    The API emits the token after the studies array, so only the tail of the
+    body is searched. Returns None when it cannot be found cheaply.
+    """
+    body = getattr(response, 'content', None)
+    if not isinstance(body, bytes):
+        return None
+    start = body.rfind(b'"nextPageToken"')
+    if start < 0:
+        return None
+    match = _NEXT_TOKEN_PATTERN.match(body, start)
+    return match.group(1).decode() if match else None
+
+
+class _PageWalk:
+    """Pagination state of one query's token-chained pages.
+
+    Shared by ClinicalTrialsService and AsyncClinicalTrialsService, which
+    only differ in how pages are requested: peek() names the page worth
+    requesting before a response is decoded, take() decodes it, and keeps()
+    says whether a request already made for a token is still wanted.
+    """
+
+    def __init__(self, service: 'ClinicalTrialsService', max_results: int, prefetch: bool):
+        self.service = service
+        self.max_results = max_results
+        self.prefetch = prefetch
+        self.fetched = 0
+        self.total_count = None
+        self.next_token = None
+
+    def peek(self, response) -> Optional[str]:
+        """Token of the page to prefetch before decoding response, or None."""
+        # A page carrying a next token is full, so more pages are wanted
+        # unless this one reaches max_results
+        if self.prefetch and self.fetched + API_PAGE_SIZE < self.max_results:
+            return _peek_next_token(response)
+        return None
+
+    def take(self, response) -> List[Trial]:
+        """Trials of response up to max_results; next_token is set if more are wanted."""
+        studies, next_token, page_total = self.service._decode_page(response)
+        if self.total_count is None:
+            self.total_count = page_total
+        studies = studies[:self.max_results - self.fetched]
+        self.fetched += len(studies)
+        self.next_token = next_token if next_token and self.fetched < self.max_results else None
+        return [self.service._parse_study(s) for s in studies]
+
+    def keeps(self, token: Optional[str]) -> bool:
+        """Whether a request made for token fetches the page wanted next."""
+        return self.next_token is not None and token == self.next_token
+
+
+class _PartitionMerge:
+    """Dedupe and gap-fill bookkeeping of one partitioned search.
+
+    Sub-queries may overlap, so trials are deduped by NCT ID; if they come
+    back with fewer trials than total_count, the full query is walked to
+    fill the gap. Shared by both service variants.
+    """
+
+    def __init__(self, params: SearchParams, total_count: int):
+        self.params = params
+        self.total_count = total_count
+        self.seen = set()
+
+    def unseen(self, trials: List[Trial]) -> List[Trial]:
+        fresh = [t for t in trials if t.nct_id not in self.seen]
+        self.seen.update(t.nct_id for t in fresh)
+        return fresh
+
+    @property
+    def complete(self) -> bool:
+        return len(self.seen) >= self.total_count
+
+    def needs_gap_fill(self) -> bool:
+        """Whether the full query must be walked after the sub-queries."""
+        if self.complete:
+            return False
+        logger.info(
+            'Partitions of %s returned %d of %d trials; fetching the full query',
+            self.params, len(self.seen), self.total_count
+        )
+        return True
 
 
 class ClinicalTrialsService:
-    def __init__(self, base_url: str = API_BASE_URL):
+    def __init__(
+        self,
+        base_url: str = API_BASE_URL,
+        transport: Optional[PooledTransport] = None,
+        cache: Optional[ResultCache] = None,
+        page_cache: Optional[PageCache] = None,
+        decoder: Optional[JsonDecoder] = None,
+        retry: Optional[RetryPolicy] = None,
+        throttle: Optional[UpstreamThrottle] = None,
+        breaker: Optional[CircuitBreaker] = None
+    ):
         self.base_url = base_url
+        self.decoder = decoder or JsonDecoder()
+        self.retry = retry or RetryPolicy()
+        self.throttle = throttle or UpstreamThrottle()
+        self.breaker = breaker or CircuitBreaker()
+        self.transport = transport or PooledTransport()
+        self.cache = cache if cache is not None else ResultCache(stale_ttl=STALE_RESULT_TTL)
+        if page_cache is None and PAGE_CACHE_PATH:
+            page_cache = PageCache(PAGE_CACHE_PATH)
+        self.page_cache = page_cache
+        self.flights = SingleFlight()
+        self.counters = Counters()
+        self.timings = Timings()
+        self._prefetcher = ThreadPoolExecutor(
+            max_workers=API_PREFETCH_WORKERS, thread_name_prefix='ct-prefetch'
+        )
+        self._prefetch_slots = threading.BoundedSemaphore(API_PREFETCH_WORKERS)
+        self._partitioner = ThreadPoolExecutor(
+            max_workers=PARTITION_WORKERS, thread_name_prefix='ct-partition'
+        )
 
     def fetch_all(self, params: SearchParams) -> SearchResult:
+        """Fetch all results up to MAX_RESULTS, serving repeats from cache.
+
+        Concurrent callers with the same canonical params share one upstream
+        fetch. If the API is unavailable, the last result cached for the
+        query is returned flagged stale, when there is one.
+        """
+        key = canonical_key(params)
+        result = self.cache.get(key)
+        if result is not None:
+            return result
+
+        def fetch() -> SearchResult:
+            # Another flight may have filled the cache since the check above
+            cached = self.cache.get(key, record=False)
+            if cached is not None:
+                return cached
+            fetched = self._fetch_all_uncached(params)
+            self.cache.put(key, fetched)
+            return fetched
+
+        try:
+            return self.flights.do(key, fetch)
+        except Exception as e:
+            stale = self._stale_result(key, e)
+            if stale is None:
+                raise
+            return stale
+
+    def _stale_result(self, key: tuple, error: Exception) -> Optional[SearchResult]:
+        """The expired result for key, flagged stale, if error means the API is down."""
+        if not isinstance(error, CircuitOpenError) and not is_transient(error):
+            return None
+        result = self.cache.get_stale(key)
+        if result is None:
+            return None
+        logger.warning('Serving stale results for %s: %s', key, error)
+        self.counters.incr('stale_results')
+        return replace(result, stale=True)
+
+    def facets(
+        self,
+        params: SearchParams,
+        top_sponsors: int = FACET_TOP_SPONSORS,
+        fetch: bool = True
+    ) -> Optional[dict]:
+        """Phase, status and top sponsor counts over the (cached) result.
+
+        Counts cover the first MAX_RESULTS trials; the response says so via
+        counted/truncated when more matched. Without fetch only a cached
+        result is counted, and None is returned if there is none.
+        """
+        if fetch:
+            result = self.fetch_all(params)
+        else:
+            result = self.cache.get(canonical_key(params))
+            if result is None:
+                return None
+        return facet_counts(TrialColumns(result.trials), result.total_count, top_sponsors)
+
+    def stream_pages(self, params: SearchParams) -> Iterator[List[Trial]]:
+        """Yield trials page by page, from cache when the query is cached."""
+        result = self.cache.get(canonical_key(params))
+        if result is not None:
+            yield result.trials
+            return
+
+        for trials, _ in self.iter_pages(params, stream=EXPORT_STREAM_PARSE):
+            yield trials
+
+    def iter_pages(
+        self,
+        params: SearchParams,
+        max_results: Optional[int] = None,
+        prefetch: bool = True,
+        stream: bool = False,
+        partition: bool = False,
+        budget: Optional[RetryBudget] = None
+    ) -> Iterator[Tuple[List[Trial], int]]:
+        """Yield (trials, total_count) for each API page as it is fetched.
+
+        Stops once max_results trials (default MAX_RESULTS) have been yielded.
+        With prefetch, the next page is requested on a worker as soon as its
+        token is found in the raw body, so the network round trip overlaps
+        with decoding and parsing the current page and with whatever the
+        caller does with it.
+
+        With stream, each page body is parsed as it downloads instead (see
+        _iter_streamed_pages) and prefetch does not apply.
+
+        With partition, a search spanning many pages is split into sub-queries
+        fetched concurrently (see _iter_partitioned_pages); pages then arrive
+        in completion order rather than the API's order.
+
+        Transient failures are retried per page (see RetryPolicy). Pass a
+        RetryBudget to stop retrying once a deadline for the whole search
+        passes, as fetch_all does; without one only the attempt limit
+        applies, since exports are read at the client's pace and outlast
+        any deadline.
+        """
+        if max_results is None:
+            max_results = MAX_RESULTS
+        if partition:
+            yield from self._iter_partitioned_pages(params, max_results, stream, budget)
+            return
+        if stream:
+            yield from self._iter_streamed_pages(params, max_results, budget)
+            return
+
+        walk = _PageWalk(self, max_results, prefetch)
+        response = self._request_page(params, budget=budget)
+        pending = None
+
+        try:
+            while True:
+                pending_token = walk.peek(response)
+                if pending_token:
+                    pending = self._prefetch(params, pending_token, budget)
+                    if pending is not None:
+                        # Let the worker reach its socket call before the
+                        # GIL-holding JSON decode below
+                        time.sleep(0)
+
+                trials = walk.take(response)
+                if pending is not None and not walk.keeps(pending_token):
+                    pending.cancel()
+                    pending = None
+                if prefetch and walk.next_token and pending is None:
+                    pending = self._prefetch(params, walk.next_token, budget)
+
+                yield trials, walk.total_count
+
+                if not walk.next_token:
+                    break
+                if pending is not None:
+                    response, pending = pending.result(), None
+                else:
+                    response = self._request_page(params, walk.next_token, budget)
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    def _prefetch(
+        self, params: SearchParams, page_token: str, budget: Optional[RetryBudget]
+    ) -> Optional[Future]:
+        """Request a page on a free prefetch worker, or return None if all are busy.
+
+        With more concurrent searches than API_PREFETCH_WORKERS, queueing
+        behind other searches' prefetches is slower than fetching the page
+        inline on the request thread, which is what iter_pages then does.
+        """
+        if not self._prefetch_slots.acquire(blocking=False):
+            self.counters.incr('prefetch_skipped')
+            return None
+        try:
+            future = self._prefetcher.submit(self._request_page, params, page_token, budget)
+        except BaseException:
+            self._prefetch_slots.release()
+            raise
+        future.add_done_callback(lambda _: self._prefetch_slots.release())
+        return future
+
+    def _iter_streamed_pages(
+        self, params: SearchParams, max_results: int, budget: Optional[RetryBudget]
+    ) -> Iterator[Tuple[List[Trial], int]]:
+        """Yield (trials, total_count) batches while page bodies download.
+
+        Each batch holds the studies completed by one API_STREAM_CHUNK_SIZE
+        read, so a page is never held whole and the caller can start on the
+        first studies before the page finishes. Bypasses the page cache. Only
+        requests are retried; a body cut off mid-download fails the export.
+        """
+        page_token = None
+        fetched = 0
+        total_count = None
+
+        while True:
+            response = self._request_page_upstream(params, page_token, True, budget)
+            studies_stream = StudyStream(self.decoder.loads)
+            held = []
+            try:
+                for chunk in response.iter_content(API_STREAM_CHUNK_SIZE):
+                    self.counters.incr('bytes_received', len(chunk))
+                    studies = studies_stream.feed(chunk)
+                    if total_count is None and studies_stream.header is not None:
+                        total_count = studies_stream.header.get('totalCount')
+                    if not studies:
+                        continue
+
+                    studies = studies[:max_results - fetched]
+                    fetched += len(studies)
+                    trials = [self._parse_study(s) for s in studies]
+                    if total_count is None:
+                        # totalCount follows the studies array: hold the page
+                        # until its envelope says how many studies match
+                        held.extend(trials)
+                        continue
+                    yield trials, total_count
+                    if fetched >= max_results:
+                        return
+                envelope = studies_stream.close()
+            finally:
+                response.close()
+
+            if total_count is None:
+                total_count = envelope.get('totalCount', 0)
+            if held or (page_token is None and not fetched):
+                yield held, total_count
+            if fetched >= max_results:
+                return
+
+            page_token = envelope.get('nextPageToken')
+            if not page_token:
+                return
+
+    def _iter_partitioned_pages(
+        self,
+        params: SearchParams,
+        max_results: int,
+        stream: bool,
+        budget: Optional[RetryBudget]
+    ) -> Iterator[Tuple[List[Trial], int]]:
+        """Yield (trials, total_count) pages of a search split by plan_partitions.
+
+        Upstream pages are token-chained, so one query fetches its pages one
+        after another; disjoint sub-queries have independent chains and run
+        side by side. The first page of the full query is fetched as usual
+        for its totalCount. Only when every match is wanted (total_count <=
+        max_results, so no subset has to be picked) and it spans more than
+        PARTITION_MIN_PAGES pages per worker are the sub-queries fetched, on
+        at most PARTITION_WORKERS threads, and merged by _PartitionMerge.
+        """
+        pages = self.iter_pages(params, max_results, stream=stream, budget=budget)
+        first, total_count = next(pages, ([], 0))
+        subqueries = self._partition_plan(params, total_count, max_results)
+        if not subqueries:
+            yield first, total_count
+            yield from pages
+            return
+        pages.close()
+        self.counters.incr('partitioned_searches')
+
+        merge = _PartitionMerge(params, total_count)
+        yield merge.unseen(first), total_count
+        for trials in self._fetch_partitions(subqueries, max_results, stream, budget):
+            trials = merge.unseen(trials)
+            if trials:
+                yield trials, total_count
+
+        if merge.needs_gap_fill():
+            for trials, _ in self.iter_pages(
+                params, max_results, stream=stream, budget=budget
+            ):
+                trials = merge.unseen(trials)
+                if trials:
+                    yield trials, total_count
+                if merge.complete:
+                    break
+
+    def _partition_plan(
+        self, params: SearchParams, total_count: int, max_results: int
+    ) -> List[SearchParams]:
+        """Sub-queries worth fetching concurrently for this search, or [].
+
+        Most sub-queries cost a round trip whether or not they match much,
+        so the fan-out only pays once the search would keep every worker
+        busy for PARTITION_MIN_PAGES pages of a sequential walk.
+        """
+        if not PARTITION_MIN_PAGES:
+            return []
+        if total_count > max_results:
+            return []
+        if total_count <= PARTITION_WORKERS * API_PAGE_SIZE * PARTITION_MIN_PAGES:
+            return []
+        subqueries = plan_partitions(params)
+        return subqueries if len(subqueries) >= 2 else []
+
+    def _fetch_partitions(
+        self,
+        subqueries: List[SearchParams],
+        max_results: int,
+        stream: bool,
+        budget: Optional[RetryBudget]
+    ) -> Iterator[List[Trial]]:
+        """Yield pages of every sub-query as the partition workers fetch them.
+
+        At most PARTITION_WORKERS * 2 pages wait for the consumer, so a slow
+        reader (a CSV download) holds the workers back instead of buffering
+        the whole search. Closing the generator, or an error from any
+        sub-query, stops the other workers after their current page.
+        """
+        results = queue.Queue(maxsize=PARTITION_WORKERS * 2)
+        stop = threading.Event()
+        done = object()
+
+        def put(item) -> bool:
+            """Queue item for the consumer; False once the generator is closed."""
+            while not stop.is_set():
+                try:
+                    results.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def fetch(subquery: SearchParams):
+            try:
+                for trials, _ in self.iter_pages(
+                    subquery, max_results, prefetch=False, stream=stream, budget=budget
+                ):
+                    if not put(trials):
+                        break
+            except Exception as e:
+                put(e)
+            finally:
+                put(done)
+
+        futures = [self._partitioner.submit(fetch, subquery) for subquery in subqueries]
+        try:
+            remaining = len(futures)
+            while remaining:
+                item = results.get()
+                if item is done:
+                    remaining -= 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    yield item
+        finally:
+            stop.set()
+            for future in futures:
+                future.cancel()
+
+    def _fetch_all_uncached(self, params: SearchParams) -> SearchResult:
         """Fetch all results, paginating through API up to MAX_RESULTS."""
         all_trials = []
-        page_token = None
         total_count = 0
+        bytes_before = self.counters.get('bytes_received')
 
-        while len(all_trials) < MAX_RESULTS:
-            studies, next_token, total = self._fetch_page(params, page_token)
+        for trials, total in self.iter_pages(params, budget=self.retry.budget()):
             total_count = total
-            all_trials.extend([self._parse_study(s) for s in studies])
+            all_trials.extend(trials)
 
-            if not next_token:
-                break
-            page_token = next_token
+        return self._search_result(params, all_trials, total_count, bytes_before)
+
+    def _search_result(
+        self, params: SearchParams, trials: List[Trial], total_count: int, bytes_before: int
+    ) -> SearchResult:
+        """Record a completed search and wrap its trials; shared with the async service."""
+        self.counters.incr('searches')
+        logger.debug(
+            'Fetched %d trials (%d bytes) for %s', len(trials),
+            self.counters.get('bytes_received') - bytes_before, params
+        )
 
-        truncated = len(all_trials) >= MAX_RESULTS or len(all_trials) < total_count
         return SearchResult(
-            trials=all_trials[:MAX_RESULTS],
+            trials=trials,
             total_count=total_count,
-            truncated=truncated and total_count > len(all_trials[:MAX_RESULTS])
+            truncated=total_count > len(trials)
         )
 
     def _fetch_page(
@@ -38,16 +573,118 @@ class ClinicalTrialsService:
 
         Returns: (studies, next_page_token, total_count)
         """
+        return self._decode_page(self._request_page(params, page_token))
+
+    def _request_page(
+        self,
+        params: SearchParams,
+        page_token: Optional[str] = None,
+        budget: Optional[RetryBudget] = None
+    ):
+        """Return the raw response for one page, from the page cache if present."""
+        if self.page_cache is None:
+            return self._request_page_upstream(params, page_token, budget=budget)
+
+        key = self._page_cache_key(params, page_token)
+        body = self._page_cache_get(key)
+        if body is not None:
+            self.counters.incr('page_cache_hits')
+            return CachedResponse(body)
+
+        response = self._request_page_upstream(params, page_token, budget=budget)
+        if isinstance(response.content, bytes):
+            self._page_cache_put(key, response.content)
+        return response
+
+    def _page_cache_key(self, params: SearchParams, page_token: Optional[str]) -> str:
+        # The cache outlives deploys, so the key names the fields requested:
+        # a change to TRIAL_FIELDS must not serve pages lacking a new field
+        fields = API_FIELDS if API_FIELD_PROJECTION else None
+        return page_key([canonical_key(params), API_PAGE_SIZE, fields], page_token)
+
+    def _page_cache_get(self, key: str) -> Optional[bytes]:
+        """page_cache.get, treating SQLite errors (e.g. a locked database) as a miss."""
+        try:
+            return self.page_cache.get(key)
+        except sqlite3.Error as e:
+            self.counters.incr('page_cache_errors')
+            logger.warning('Page cache read failed: %s', e)
+            return None
+
+    def _page_cache_put(self, key: str, body: bytes) -> None:
+        """page_cache.put, skipping the write on SQLite errors."""
+        try:
+            self.page_cache.put(key, body)
+        except sqlite3.Error as e:
+            self.counters.incr('page_cache_errors')
+            logger.warning('Page cache write failed: %s', e)
+
+    def _request_page_upstream(
+        self,
+        params: SearchParams,
+        page_token: Optional[str] = None,
+        stream: bool = False,
+        budget: Optional[RetryBudget] = None
+    ):
+        """Request one page, retrying transient failures, and return the raw response.
+
+        With stream, the body is left unread for the caller to consume.
+        """
+        return self.retry.call(
+            lambda: self._send_page_request(params, page_token, stream), budget
+        )
+
+    def _send_page_request(
+        self, params: SearchParams, page_token: Optional[str], stream: bool
+    ):
+        """Issue the HTTP request for one page once, within the upstream throttle.
+
+        Fails fast with CircuitOpenError while the circuit breaker is open.
+        A streamed request gives its throttle slot back once the headers
+        arrive, while the caller is still reading the body.
+        """
+        query_params = self._page_query(params, page_token)
+
+        probe = self.breaker.check()
+        with self.throttle.slot(), self.breaker.measure(probe):
+            start = time.perf_counter()
+            if stream:
+                response = self.transport.get(self.base_url, params=query_params, stream=True)
+            else:
+                response = self.transport.get(self.base_url, params=query_params)
+            self.timings.observe(
+                'next_page' if page_token else 'first_page', time.perf_counter() - start
+            )
+            response.raise_for_status()
+
+        self.counters.incr('pages')
+        if stream:
+            return response
+        body = getattr(response, 'content', None)
+        if isinstance(body, bytes):
+            self.counters.incr('bytes_received', len(body))
+        return response
+
+    def _page_query(self, params: SearchParams, page_token: Optional[str] = None) -> dict:
+        """Query parameters requesting one page of a search."""
         query_params = self._build_params(params)
         query_params['pageSize'] = API_PAGE_SIZE
-        query_params['countTotal'] = 'true'
+        if API_FIELD_PROJECTION:
+            query_params['fields'] = API_FIELDS
 
+        # Only the first page asks the API to count the full match set;
+        # iter_pages carries that total through the remaining pages
         if page_token:
             query_params['pageToken'] = page_token
+        else:
+            query_params['countTotal'] = 'true'
+        return query_params
 
-        response = requests.get(self.base_url, params=query_params)
-        response.raise_for_status()
-        data = response.json()
+    def _decode_page(self, response) -> Tuple[List[dict], Optional[str], int]:
+        """Decode a page response into (studies, next_page_token, total_count)."""
+        start = time.perf_counter()
+        data = self.decoder.decode_response(response)
+        self.timings.observe('decode', time.perf_counter() - start)
 
         studies = data.get('studies', [])
         next_token = data.get('nextPageToken')
@@ -55,6 +692,37 @@ class ClinicalTrialsService:
 
         return studies, next_token, total_count
 
+    def stats(self) -> dict:
+        """Operational statistics for the service and its transport."""
+        return {
+            'transport': self.transport.stats(),
+            'cache': self.cache.stats(),
+            'single_flight': self.flights.stats(),
+            'upstream': self._upstream_stats(),
+            'timings': self.timings.snapshot(),
+            'page_cache': self.page_cache.stats() if self.page_cache else None,
+            'retry': self.retry.stats(),
+            'throttle': self.throttle.stats(),
+            'circuit': self.breaker.stats(),
+        }
+
+    def _upstream_stats(self) -> dict:
+        counts = self.counters.snapshot()
+        pages = counts.get('pages', 0)
+        searches = counts.get('searches', 0)
+        received = counts.get('bytes_received', 0)
+        return {
+            'pages': pages,
+            'searches': searches,
+            'bytes_received': received,
+            'bytes_per_page': received // pages if pages else 0,
+            'bytes_per_search': received // searches if searches else 0,
+            'stale_results': counts.get('stale_results', 0),
+            'page_cache_errors': counts.get('page_cache_errors', 0),
+            'field_projection': API_FIELD_PROJECTION,
+            'json_decoder': self.decoder.name,
+        }
+
     def _build_params(self, params: SearchParams) -> dict:
         """Build API query parameters from SearchParams."""
         query_params = {}
@@ -81,42 +749,4 @@ class ClinicalTrialsService:
 
     def _parse_study(self, study: dict) -> Trial:
         """Parse API study response into Trial dataclass."""
-        protocol = study.get('protocolSection', {})
-
-        # Identification
-        id_module = protocol.get('identificationModule', {})
-        nct_id = id_module.get('nctId', '')
-        title = id_module.get('briefTitle', '')
-
-        # Design
-        design_module = protocol.get('designModule', {})
-        phases = design_module.get('phases', [])
-        phase = ', '.join(phases) if phases else 'N/A'
-
-        # Status
-        status_module = protocol.get('statusModule', {})
-        status = status_module.get('overallStatus', '')
-
-        # Sponsor
-        sponsor_module = protocol.get('sponsorCollaboratorsModule', {})
-        lead_sponsor = sponsor_module.get('leadSponsor', {})
-        sponsor = lead_sponsor.get('name', '')
-
-        # Conditions
-        conditions_module = protocol.get('conditionsModule', {})
-        conditions = conditions_module.get('conditions', [])
-
-        # Interventions
-        arms_module = protocol.get('armsInterventionsModule', {})
-        interventions_list = arms_module.get('interventions', [])
-        interventions = [i.get('name', '') for i in interventions_list if i.get('name')]
-
-        return Trial(
-            nct_id=nct_id,
-            title=title,
-            phase=phase,
-            status=status,
-            sponsor=sponsor,
-            conditions=conditions,
-            interventions=interventions
-        )
+        return parse_study(study)
@@ -0,0 +1,88 @@
+from typing import List, Optional
+
+from app.config import DATATABLES_PAGE_SIZE, DATATABLES_MAX_PAGE_SIZE
+from app.models.columns import TrialColumns
+from app.models.trial import SearchResult
+from app.services.cache import estimate_size
+
+# Column order must match the <th> order in results.html
+COLUMNS = ('nct_id', 'title', 'phase', 'status', 'sponsor', 'conditions', 'interventions')
+
+
+class TableView:
+    """A SearchResult prepared for DataTables server-side processing.
+
+    Sorting and searching run on the view's columns: sort ranks and
+    search text are built per column on first use and reused by later
+    draws, so each draw only sorts small integers and slices the page.
+    The columns belong to the view, not to the result (which the service
+    cache may share), so estimate_size accounts for them.
+    """
+
+    def __init__(self, result: SearchResult):
+        self.result = result
+        self.columns = TrialColumns(result.trials)
+
+    def estimate_size(self) -> int:
+        """Approximate memory held by the view, including its result."""
+        return estimate_size(self.result) + self.columns.estimate_size()
+
+    def rows(
+        self, order: List[tuple], search: str = ''
+    ) -> List[int]:
+        """Row indices matching search, sorted by [(column_index, descending)]."""
+        columns = self.columns
+        return columns.sort(
+            columns.search(search),
+            [(COLUMNS[column], descending) for column, descending in order],
+        )
+
+    def page(self, start: int, length: int, order: List[tuple], search: str = '') -> dict:
+        """Slice of rows plus the filtered row count."""
+        rows = self.rows(order, search)
+        columns = self.columns
+        return {
+            'records_filtered': len(rows),
+            'data': [
+                {column: columns.cell(r, column) for column in COLUMNS}
+                for r in rows[start:start + length]
+            ],
+        }
+
+
+def _int_arg(args, name: str, default: int) -> int:
+    try:
+        return int(args.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def parse_order(args) -> List[tuple]:
+    """Parse DataTables order[i][column]/order[i][dir] arguments."""
+    order = []
+    i = 0
+    while f'order[{i}][column]' in args:
+        column = _int_arg(args, f'order[{i}][column]', -1)
+        if 0 <= column < len(COLUMNS):
+            order.append((column, args.get(f'order[{i}][dir]') == 'desc'))
+        i += 1
+    return order
+
+
+def draw(view: TableView, args, page_size: Optional[int] = None) -> dict:
+    """Answer one DataTables server-side draw request."""
+    if page_size is None:
+        page_size = DATATABLES_PAGE_SIZE
+
+    length = _int_arg(args, 'length', page_size)
+    if length < 1 or length > DATATABLES_MAX_PAGE_SIZE:
+        length = DATATABLES_MAX_PAGE_SIZE
+    start = max(_int_arg(args, 'start', 0), 0)
+
+    page = view.page(start, length, parse_order(args), args.get('search[value]', ''))
+    return {
+        'draw': _int_arg(args, 'draw', 0),
+        'recordsTotal': len(view.columns),
+        'recordsFiltered': page['records_filtered'],
+        'data': page['data'],
+    }
@@ -0,0 +1,73 @@
+import csv
+import io
+import logging
+from typing import Iterable, Iterator, List, Union
+
+from app.config import CSV_STREAM_CHUNK_SIZE
+from app.models.columns import TrialColumns
+from app.models.trial import Trial
+
+logger = logging.getLogger(__name__)
+
+CSV_HEADER = [
+    'NCT ID', 'Title', 'Phase', 'Status', 'Sponsor', 'Conditions', 'Interventions'
+]
+
+
+def trial_row(trial: Trial) -> list:
+    """Flatten a Trial into a CSV row."""
+    return [
+        trial.nct_id,
+        trial.title,
+        trial.phase,
+        trial.status,
+        trial.sponsor,
+        '; '.join(trial.conditions),
+        '; '.join(trial.interventions)
+    ]
+
+
+def iter_csv(
+    pages: Iterable[Union[List[Trial], TrialColumns]],
+    chunk_size: int = CSV_STREAM_CHUNK_SIZE
+) -> Iterator[str]:
+    """Yield CSV text in bounded chunks as pages of trials arrive.
+
+    A page is a list of trials or, for stored results, their TrialColumns,
+    whose rows are read straight off the columns.
+
+    The header is yielded immediately; rows are flushed whenever the buffer
+    reaches chunk_size and at the end of every page, so at most one chunk is
+    held in memory at a time.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush() -> str:
+        chunk = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return chunk
+
+    writer.writerow(CSV_HEADER)
+    yield flush()
+
+    for page in pages:
+        rows = page.rows() if isinstance(page, TrialColumns) else map(trial_row, page)
+        for row in rows:
+            writer.writerow(row)
+            if buffer.tell() >= chunk_size:
+                yield flush()
+        if buffer.tell():
+            yield flush()
+
+
+def track_progress(
+    pages: Iterable[List[Trial]], expected: int
+) -> Iterator[List[Trial]]:
+    """Pass pages through unchanged, logging export progress after each one."""
+    exported = 0
+    for page in pages:
+        yield page
+        exported += len(page)
+        logger.info('Exported %d of %d trials', exported, expected)
@@ -0,0 +1,52 @@
+from collections import Counter
+from typing import Iterable, Mapping, Tuple
+
+from app.config import FACET_TOP_SPONSORS
+from app.models.columns import TrialColumns
+from app.models.trial import VALID_PHASES, VALID_STATUSES, phase_codes
+
+
+def facets_response(
+    phases: Mapping[str, int],
+    statuses: Mapping[str, int],
+    sponsors: Iterable[Tuple[str, int]],
+    total_count: int,
+    counted: int
+) -> dict:
+    """JSON-ready facet counts.
+
+    Every selectable phase and status is listed (zero when absent) so the
+    search form can label each checkbox. counted is the number of trials the
+    counts cover, which is less than total_count when the result was capped.
+    """
+    return {
+        'total_count': total_count,
+        'counted': counted,
+        'truncated': counted < total_count,
+        'phases': {value: phases.get(value, 0) for value, _ in VALID_PHASES},
+        'statuses': {value: statuses.get(value, 0) for value, _ in VALID_STATUSES},
+        'sponsors': [{'name': name, 'count': count} for name, count in sponsors],
+    }
+
+
+def facet_counts(
+    columns: TrialColumns,
+    total_count: int,
+    top_sponsors: int = FACET_TOP_SPONSORS
+) -> dict:
+    """Facet counts over an in-memory result.
+
+    Counts come from the dictionary-encoded columns, so phase codes are split
+    once per distinct phase value rather than once per trial.
+    """
+    phases = Counter()
+    for phase, count in columns.value_counts('phase').items():
+        for code in phase_codes(phase):
+            phases[code] += count
+    return facets_response(
+        phases,
+        columns.value_counts('status'),
+        columns.value_counts('sponsor').most_common(top_sponsors),
+        total_count,
+        len(columns),
+    )
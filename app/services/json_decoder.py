@@ -0,0 +1,41 @@
+import json
+from typing import Any, Callable, Dict
+
+from app.config import JSON_DECODER
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib decoder is used instead
+    orjson = None
+
+# Decoder name -> function decoding UTF-8 JSON bytes
+DECODERS: Dict[str, Callable[[bytes], Any]] = {'json': json.loads}
+if orjson is not None:
+    DECODERS['orjson'] = orjson.loads
+
+
+class JsonDecoder:
+    """Decodes API pages and dump files with the fastest available library.
+
+    'auto' picks orjson when it is installed and the stdlib json module
+    otherwise; 'json' or 'orjson' force one. Bodies are decoded straight
+    from bytes, skipping the text decoding step of requests' .json().
+    """
+
+    def __init__(self, name: str = JSON_DECODER):
+        if name == 'auto':
+            name = 'orjson' if 'orjson' in DECODERS else 'json'
+        if name not in DECODERS:
+            raise ValueError(f'JSON decoder {name!r} is not available')
+        self.name = name
+        self._loads = DECODERS[name]
+
+    def loads(self, data: bytes) -> Any:
+        return self._loads(data)
+
+    def decode_response(self, response) -> Any:
+        """Decode a response body, deferring to response.json() without raw bytes."""
+        body = getattr(response, 'content', None)
+        if isinstance(body, bytes):
+            return self._loads(body)
+        return response.json()
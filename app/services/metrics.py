@@ -0,0 +1,59 @@
+import threading
+from collections import defaultdict, deque
+
+
+class Counters:
+    """Thread-safe named counters for service statistics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = defaultdict(int)
+
+    def incr(self, name: str, amount: int = 1):
+        with self._lock:
+            self._values[name] += amount
+
+    def get(self, name: str) -> int:
+        with self._lock:
+            return self._values[name]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self._values)
+
+
+class Timings:
+    """Thread-safe latency recorder keeping totals and a recent sample window."""
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self._window = window
+        self._series = {}
+
+    def observe(self, name: str, seconds: float):
+        with self._lock:
+            series = self._series.get(name)
+            if series is None:
+                series = self._series[name] = {
+                    'count': 0, 'total': 0.0, 'max': 0.0,
+                    'recent': deque(maxlen=self._window),
+                }
+            series['count'] += 1
+            series['total'] += seconds
+            series['max'] = max(series['max'], seconds)
+            series['recent'].append(seconds)
+
+    def snapshot(self) -> dict:
+        """Per-series count, mean, p50/p95 over the recent window and max, in ms."""
+        with self._lock:
+            result = {}
+            for name, series in self._series.items():
+                recent = sorted(series['recent'])
+                result[name] = {
+                    'count': series['count'],
+                    'mean_ms': series['total'] / series['count'] * 1000,
+                    'p50_ms': recent[len(recent) // 2] * 1000,
+                    'p95_ms': recent[min(len(recent) - 1, int(len(recent) * 0.95))] * 1000,
+                    'max_ms': series['max'] * 1000,
+                }
+            return result
@@ -0,0 +1,150 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Callable, Optional
+
+from app.config import PAGE_CACHE_TTL, PAGE_CACHE_MAX_BYTES
+from app.services.metrics import Counters
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    key TEXT PRIMARY KEY,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_accessed_at ON pages (accessed_at);
+"""
+
+
+def page_key(query: object, page_token: Optional[str]) -> str:
+    """Stable digest for a (normalized query, page token) pair."""
+    raw = json.dumps([query, page_token], sort_keys=True, default=list)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class CachedResponse:
+    """Minimal stand-in for requests.Response built from cached page bytes."""
+
+    status_code = 200
+
+    def __init__(self, content: bytes):
+        self.content = content
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class PageCache:
+    """On-disk cache of raw API pages, shared by every worker on a host.
+
+    Pages are stored zlib-compressed in SQLite. WAL mode lets many worker
+    processes read while one writes. Entries expire after ttl seconds, and
+    the least recently read pages are evicted once the compressed total
+    exceeds max_bytes. Each thread uses its own connection.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float = PAGE_CACHE_TTL,
+        max_bytes: int = PAGE_CACHE_MAX_BYTES,
+        clock: Callable[[], float] = time.time
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._local = threading.local()
+        self.counters = Counters()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection().executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached page body, or None if missing or expired."""
+        conn = self._connection()
+        now = self._clock()
+        row = conn.execute(
+            'SELECT body, stored_at FROM pages WHERE key = ?', (key,)
+        ).fetchone()
+
+        if row is None or row[1] + self.ttl <= now:
+            if row is not None:
+                conn.execute('DELETE FROM pages WHERE key = ?', (key,))
+            self.counters.incr('misses')
+            return None
+
+        conn.execute('UPDATE pages SET accessed_at = ? WHERE key = ?', (now, key))
+        self.counters.incr('hits')
+        return zlib.decompress(row[0])
+
+    def put(self, key: str, body: bytes):
+        """Store a page body, then evict expired and least recently read pages."""
+        compressed = zlib.compress(body)
+        if len(compressed) > self.max_bytes:
+            return
+
+        now = self._clock()
+        conn = self._connection()
+        conn.execute(
+            'INSERT OR REPLACE INTO pages (key, body, size, stored_at, accessed_at) '
+            'VALUES (?, ?, ?, ?, ?)',
+            (key, compressed, len(compressed), now, now)
+        )
+        self.counters.incr('bytes_written', len(compressed))
+        self._evict(conn, now)
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        conn.execute('DELETE FROM pages WHERE stored_at <= ?', (now - self.ttl,))
+        excess = conn.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM pages'
+        ).fetchone()[0] - self.max_bytes
+        if excess <= 0:
+            return
+
+        victims = []
+        for key, size in conn.execute('SELECT key, size FROM pages ORDER BY accessed_at'):
+            victims.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany('DELETE FROM pages WHERE key = ?', victims)
+        self.counters.incr('evictions', len(victims))
+
+    def clear(self):
+        self._connection().execute('DELETE FROM pages')
+
+    def stats(self) -> dict:
+        entries, size = self._connection().execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pages'
+        ).fetchone()
+        counts = self.counters.snapshot()
+        return {
+            'path': self.path,
+            'entries': entries,
+            'bytes': size,
+            'max_bytes': self.max_bytes,
+            'hits': counts.get('hits', 0),
+            'misses': counts.get('misses', 0),
+            'evictions': counts.get('evictions', 0),
+        }
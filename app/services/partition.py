@@ -0,0 +1,43 @@
+from dataclasses import replace
+from typing import List
+
+from app.models.trial import SearchParams
+
+# Every overallStatus the API reports, including the expanded-access and
+# unknown statuses the search form does not offer. A study has exactly one,
+# so one sub-query per status partitions an unfiltered search.
+API_STATUSES = [
+    "ACTIVE_NOT_RECRUITING",
+    "COMPLETED",
+    "ENROLLING_BY_INVITATION",
+    "NOT_YET_RECRUITING",
+    "RECRUITING",
+    "SUSPENDED",
+    "TERMINATED",
+    "WITHDRAWN",
+    "AVAILABLE",
+    "NO_LONGER_AVAILABLE",
+    "TEMPORARILY_NOT_AVAILABLE",
+    "APPROVED_FOR_MARKETING",
+    "WITHHELD",
+    "UNKNOWN",
+]
+
+
+def plan_partitions(params: SearchParams) -> List[SearchParams]:
+    """Split a search into sub-queries whose union is the same match set.
+
+    - Several statuses: one sub-query per status (disjoint).
+    - Otherwise several phases: one per phase. A study can list two phases
+      (PHASE2/PHASE3), so these overlap and callers dedupe by NCT ID.
+    - Otherwise, with no status filter: one per API status (disjoint).
+
+    Returns [] when the search cannot be split.
+    """
+    if params.statuses and len(params.statuses) > 1:
+        return [replace(params, statuses=[status]) for status in params.statuses]
+    if params.phases and len(params.phases) > 1:
+        return [replace(params, phases=[phase]) for phase in params.phases]
+    if not params.statuses:
+        return [replace(params, statuses=[status]) for status in API_STATUSES]
+    return []
@@ -0,0 +1,163 @@
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Optional, TypeVar
+
+import requests
+
+from app.config import (
+    API_RETRY_ATTEMPTS, API_RETRY_BASE_DELAY, API_RETRY_MAX_DELAY, API_RETRY_DEADLINE
+)
+from app.services.metrics import Counters
+
+try:
+    import aiohttp
+except ImportError:  # optional; only the async service raises its errors
+    aiohttp = None
+
+T = TypeVar('T')
+
+# Statuses worth retrying: rate limiting and gateway/availability failures
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+# Network failures worth retrying, for both transports
+TRANSIENT_ERRORS = (requests.ConnectionError, requests.Timeout, asyncio.TimeoutError)
+if aiohttp is not None:
+    TRANSIENT_ERRORS += (aiohttp.ClientConnectionError,)
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """Seconds the server asked us to wait (Retry-After), if it said."""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+    value = headers.get('Retry-After') if headers is not None else None
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(when.timestamp() - time.time(), 0.0)
+
+
+def is_transient(error: Exception) -> bool:
+    """Whether error is a network failure or a RETRY_STATUSES response."""
+    if isinstance(error, requests.HTTPError):
+        response = error.response
+        return response is not None and response.status_code in RETRY_STATUSES
+    return isinstance(error, TRANSIENT_ERRORS)
+
+
+class RetryBudget:
+    """Time left for one search, shared by all of its page requests and retries."""
+
+    def __init__(self, seconds: float, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self.deadline = clock() + seconds
+
+    def remaining(self) -> float:
+        return self.deadline - self._clock()
+
+
+class RetryPolicy:
+    """Retries transient page request failures with capped exponential backoff.
+
+    Connection errors, timeouts and responses with a RETRY_STATUSES status
+    are retried up to attempts times. The wait before retry n is drawn
+    uniformly from [0, min(max_delay, base_delay * 2**n)] ("full jitter"),
+    so workers hit by the same outage do not retry in lockstep; a
+    Retry-After header replaces the drawn wait. A retry whose wait would
+    overrun the search's RetryBudget is not attempted: the error is raised
+    while the user is still waiting rather than after the deadline.
+    """
+
+    def __init__(
+        self,
+        attempts: int = API_RETRY_ATTEMPTS,
+        base_delay: float = API_RETRY_BASE_DELAY,
+        max_delay: float = API_RETRY_MAX_DELAY,
+        deadline: float = API_RETRY_DEADLINE,
+        jitter: Callable[[], float] = random.random
+    ):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self._jitter = jitter
+        self.counters = Counters()
+
+    def budget(self) -> RetryBudget:
+        """A fresh budget for one search."""
+        return RetryBudget(self.deadline)
+
+    def retryable(self, error: Exception) -> bool:
+        return is_transient(error)
+
+    def next_delay(
+        self, attempt: int, error: Exception, budget: Optional[RetryBudget] = None
+    ) -> Optional[float]:
+        """Seconds to wait before retry number attempt, or None to give up."""
+        if not self.retryable(error):
+            return None
+        delay = retry_after(error)
+        if delay is None:
+            delay = self._jitter() * min(self.max_delay, self.base_delay * 2 ** attempt)
+        if attempt >= self.attempts or (budget is not None and delay >= budget.remaining()):
+            self.counters.incr('exhausted')
+            return None
+        self.counters.incr('retries')
+        return delay
+
+    def call(
+        self,
+        fn: Callable[[], T],
+        budget: Optional[RetryBudget] = None,
+        sleep: Callable[[float], None] = time.sleep
+    ) -> T:
+        """Run fn, retrying transient failures."""
+        attempt = 0
+        while True:
+            try:
+                result = fn()
+            except Exception as e:
+                delay = self.next_delay(attempt, e, budget)
+                if delay is None:
+                    raise
+                sleep(delay)
+                attempt += 1
+                continue
+            if attempt:
+                self.counters.incr('recovered')
+            return result
+
+    async def call_async(
+        self, fn: Callable[[], Awaitable[T]], budget: Optional[RetryBudget] = None
+    ) -> T:
+        """Await fn(), retrying transient failures without blocking the loop."""
+        attempt = 0
+        while True:
+            try:
+                result = await fn()
+            except Exception as e:
+                delay = self.next_delay(attempt, e, budget)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            if attempt:
+                self.counters.incr('recovered')
+            return result
+
+    def stats(self) -> dict:
+        counts = self.counters.snapshot()
+        return {
+            'retries': counts.get('retries', 0),
+            'recovered': counts.get('recovered', 0),
+            'exhausted': counts.get('exhausted', 0),
+        }
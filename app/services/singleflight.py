@@ -0,0 +1,94 @@
+import asyncio
+import threading
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+from app.services.metrics import Counters
+
+T = TypeVar('T')
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it
+    is in flight block and receive the same result (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.counters = Counters()
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            self.counters.incr('coalesced')
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        self.counters.incr('executed')
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def stats(self) -> dict:
+        counts = self.counters.snapshot()
+        with self._lock:
+            in_flight = len(self._calls)
+        return {
+            'executed': counts.get('executed', 0),
+            'coalesced': counts.get('coalesced', 0),
+            'in_flight': in_flight,
+        }
+
+
+class AsyncSingleFlight:
+    """SingleFlight for coroutines on one event loop.
+
+    The first caller for a key starts a task; callers arriving while it runs
+    await the same task. Waiters are shielded from each other, so a
+    cancelled caller does not cancel the shared fetch.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self.counters = Counters()
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._calls.get(key)
+        if task is not None:
+            self.counters.incr('coalesced')
+        else:
+            self.counters.incr('executed')
+            task = self._calls[key] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        counts = self.counters.snapshot()
+        return {
+            'executed': counts.get('executed', 0),
+            'coalesced': counts.get('coalesced', 0),
+            'in_flight': len(self._calls),
+        }
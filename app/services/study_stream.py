@@ -0,0 +1,129 @@
+import json
+import re
+from typing import Any, Callable, List, Optional
+
+# Bytes that can change nesting: brackets, and quotes opening a string
+_STRUCTURAL = re.compile(rb'[\[\]{}"]')
+_ARRAY_START = re.compile(rb'\s*:\s*\[')
+_PARTIAL_ARRAY_START = re.compile(rb'\s*(?::\s*)?\Z')
+
+_OPEN = (ord('{'), ord('['))
+_QUOTE = ord('"')
+_BACKSLASH = ord('\\')
+
+
+def _string_end(buffer: bytes, start: int) -> int:
+    """Index just past the string opened at start, or -1 if it is cut off.
+
+    Uses bytes.find to jump between quotes rather than matching the
+    contents, which dominate page bodies.
+    """
+    pos = start + 1
+    while True:
+        end = buffer.find(b'"', pos)
+        if end < 0:
+            return -1
+        # The quote is escaped if an odd number of backslashes precede it
+        escape = end - 1
+        while buffer[escape] == _BACKSLASH:
+            escape -= 1
+        if (end - escape) % 2:
+            return end + 1
+        pos = end + 1
+
+
+class StudyStream:
+    """Splits an API page body into study documents as its bytes arrive.
+
+    feed() returns the studies completed by each chunk, decoding every
+    element of the top-level studies array on its own, so only the study in
+    progress is buffered. Fields before the array (totalCount) are available
+    as header once the array starts; close() returns the remaining fields
+    (nextPageToken) once the body is complete.
+    """
+
+    def __init__(self, loads: Callable[[bytes], Any] = json.loads):
+        self._loads = loads
+        self._buffer = b''
+        self._pos = 0
+        self._depth = 0
+        self._state = 'envelope'  # then 'studies', then 'after'
+        self._element_start = None
+        self._envelope = b''
+        self.header: Optional[dict] = None
+
+    def feed(self, chunk: bytes) -> List[dict]:
+        """Consume the next chunk of the body; returns the studies it completed."""
+        buffer = self._buffer + chunk
+        pos = self._pos
+        studies = []
+
+        while True:
+            match = _STRUCTURAL.search(buffer, pos)
+            if match is None:
+                pos = len(buffer)
+                break
+            byte = buffer[match.start()]
+
+            if byte == _QUOTE:
+                end = _string_end(buffer, match.start())
+                if end < 0:
+                    pos = match.start()
+                    break
+                if (
+                    self._state == 'envelope' and self._depth == 1
+                    and buffer[match.start():end] == b'"studies"'
+                ):
+                    start = _ARRAY_START.match(buffer, end)
+                    if start is None:
+                        if _PARTIAL_ARRAY_START.match(buffer, end):
+                            pos = match.start()
+                            break
+                        pos = end
+                        continue
+                    # Everything up to the array's '[' is envelope
+                    self._envelope += buffer[:start.end()]
+                    self.header = self._loads(self._envelope + b']}')
+                    buffer, pos = buffer[start.end():], 0
+                    self._depth += 1
+                    self._state = 'studies'
+                    continue
+                pos = end
+                continue
+
+            if byte in _OPEN:
+                if self._state == 'studies' and self._depth == 2:
+                    self._element_start = match.start()
+                self._depth += 1
+                pos = match.end()
+                continue
+
+            self._depth -= 1
+            if self._state == 'studies':
+                if self._depth == 2 and self._element_start is not None:
+                    studies.append(self._loads(buffer[self._element_start:match.end()]))
+                    self._element_start = None
+                    pos = match.end()
+                    continue
+                if self._depth == 1:
+                    buffer, pos = buffer[match.start():], 1
+                    self._state = 'after'
+                    continue
+            pos = match.end()
+
+        # Drop what is no longer needed: separators between studies, and
+        # everything before the study in progress
+        if self._state == 'studies':
+            keep = pos if self._element_start is None else self._element_start
+            buffer, pos = buffer[keep:], pos - keep
+            if self._element_start is not None:
+                self._element_start = 0
+
+        self._buffer, self._pos = buffer, pos
+        return studies
+
+    def close(self) -> dict:
+        """Top-level fields of the page other than studies."""
+        if self._state == 'studies':
+            raise ValueError('Page body ended inside the studies array')
+        return self._loads(self._envelope + self._buffer)
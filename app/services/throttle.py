@@ -0,0 +1,294 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Callable, Optional, Tuple
+
+from app.config import (
+    UPSTREAM_RATE_LIMIT, UPSTREAM_RATE_BURST, UPSTREAM_RATE_LIMIT_PATH, UPSTREAM_MAX_CONCURRENT
+)
+from app.services.metrics import Counters, Timings
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (
+    name TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+def _take(
+    tokens: float, updated_at: float, now: float, rate: float, burst: float
+) -> Tuple[float, float]:
+    """Refill a bucket up to burst and take one token; returns (tokens, wait).
+
+    The balance may go negative: the caller has reserved a future token and
+    must wait until it accrues, and later callers queue behind it.
+    """
+    tokens = min(burst, tokens + max(now - updated_at, 0.0) * rate) - 1
+    return tokens, max(-tokens / rate, 0.0)
+
+
+class TokenBucket:
+    """Token bucket rate limiter for the threads of one process.
+
+    Allows bursts of up to burst requests, then rate requests per second.
+    """
+
+    def __init__(
+        self, rate: float, burst: float, clock: Callable[[], float] = time.monotonic
+    ):
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._updated_at = clock()
+
+    def reserve(self) -> float:
+        """Take a token; returns the seconds to wait before using it."""
+        with self._lock:
+            now = self._clock()
+            self._tokens, wait = _take(
+                self._tokens, self._updated_at, now, self.rate, self.burst
+            )
+            self._updated_at = now
+            return wait
+
+
+class SharedTokenBucket:
+    """Token bucket kept in SQLite, shared by every worker process on a host.
+
+    Each reservation is one short IMMEDIATE transaction, so processes take
+    tokens from the same balance in turn. Times are wall-clock seconds,
+    which unlike time.monotonic() are comparable across processes.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        rate: float,
+        burst: float,
+        name: str = 'upstream',
+        clock: Callable[[], float] = time.time
+    ):
+        self.path = path
+        self.rate = rate
+        self.burst = burst
+        self.name = name
+        self._clock = clock
+        self._local = threading.local()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection().executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def reserve(self) -> float:
+        """Take a token; returns the seconds to wait before using it."""
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            now = self._clock()
+            row = conn.execute(
+                'SELECT tokens, updated_at FROM buckets WHERE name = ?', (self.name,)
+            ).fetchone()
+            tokens, updated_at = row if row is not None else (self.burst, now)
+            tokens, wait = _take(tokens, updated_at, now, self.rate, self.burst)
+            conn.execute(
+                'INSERT OR REPLACE INTO buckets (name, tokens, updated_at) VALUES (?, ?, ?)',
+                (self.name, tokens, now)
+            )
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+        return wait
+
+
+class ConcurrencyGovernor:
+    """Caps requests in flight, across threads and an asyncio event loop.
+
+    Waiters are served first come, first served whichever side they are
+    on: a released slot is handed straight to the oldest waiter, so a
+    steady stream of new requests cannot starve queued ones.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._waiters = deque()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def _try_acquire(self) -> bool:
+        # Caller holds self._lock
+        if self._in_flight < self.limit and not self._waiters:
+            self._in_flight += 1
+            return True
+        return False
+
+    def acquire(self) -> bool:
+        """Block until a slot is free; returns whether the caller had to queue."""
+        with self._lock:
+            if self._try_acquire():
+                return False
+            ready = threading.Event()
+            self._waiters.append(ready.set)
+        ready.wait()
+        return True
+
+    async def acquire_async(self) -> bool:
+        """Await a free slot without blocking the loop; returns whether it queued."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._try_acquire():
+                return False
+            slot = loop.create_future()
+
+            def wake():
+                loop.call_soon_threadsafe(self._hand_over, slot)
+
+            self._waiters.append(wake)
+        try:
+            await slot
+        except asyncio.CancelledError:
+            with self._lock:
+                if wake in self._waiters:
+                    self._waiters.remove(wake)
+                    raise
+            # The slot was handed over as we were cancelled; pass it on.
+            # (A cancelled future is passed on by _hand_over instead.)
+            if slot.done() and not slot.cancelled():
+                self.release()
+            raise
+        return True
+
+    def _hand_over(self, slot: 'asyncio.Future'):
+        if slot.cancelled():
+            self.release()
+        else:
+            slot.set_result(None)
+
+    def release(self):
+        with self._lock:
+            if not self._waiters:
+                self._in_flight -= 1
+                return
+            wake = self._waiters.popleft()
+        wake()
+
+
+class UpstreamThrottle:
+    """Keeps upstream requests under a rate and a concurrency limit.
+
+    Every request to the API takes a slot from the ConcurrencyGovernor
+    (max_concurrent in flight per process) and then a token from the rate
+    limiter (rate per second after a burst), waiting for either as needed.
+    With path, the token bucket lives in SQLite so all workers on the host
+    share one rate. A rate or max_concurrent of 0 disables that limit.
+    Time spent queueing is recorded so /stats shows when the limits bind.
+    """
+
+    def __init__(
+        self,
+        rate: float = UPSTREAM_RATE_LIMIT,
+        burst: float = UPSTREAM_RATE_BURST,
+        max_concurrent: int = UPSTREAM_MAX_CONCURRENT,
+        path: Optional[str] = UPSTREAM_RATE_LIMIT_PATH
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.path = path if rate else None
+        if not rate:
+            self.bucket = None
+        elif path:
+            self.bucket = SharedTokenBucket(path, rate, burst)
+        else:
+            self.bucket = TokenBucket(rate, burst)
+        self.governor = ConcurrencyGovernor(max_concurrent) if max_concurrent else None
+        self.counters = Counters()
+        self.timings = Timings()
+
+    def _reserve(self, queued: bool, queue_wait: float) -> float:
+        """Record a slot taken after queue_wait seconds and reserve a rate token."""
+        self.counters.incr('requests')
+        if queued:
+            self.counters.incr('queued')
+            self.timings.observe('queue_wait', queue_wait)
+        wait = self.bucket.reserve() if self.bucket is not None else 0.0
+        if wait > 0:
+            self.counters.incr('throttled')
+            self.timings.observe('rate_wait', wait)
+        return wait
+
+    @contextmanager
+    def slot(self, sleep: Callable[[float], None] = time.sleep):
+        """Hold a request slot for the duration of the block."""
+        start = time.perf_counter()
+        queued = self.governor.acquire() if self.governor is not None else False
+        try:
+            wait = self._reserve(queued, time.perf_counter() - start)
+            if wait > 0:
+                sleep(wait)
+            yield
+        finally:
+            if self.governor is not None:
+                self.governor.release()
+
+    @asynccontextmanager
+    async def async_slot(self):
+        """slot() for coroutines; waits without blocking the event loop."""
+        start = time.perf_counter()
+        governor = self.governor
+        queued = await governor.acquire_async() if governor is not None else False
+        try:
+            # A shared bucket is a short SQLite transaction; it may block
+            # briefly on another process, so keep it off the loop
+            if isinstance(self.bucket, SharedTokenBucket):
+                wait = await asyncio.get_running_loop().run_in_executor(
+                    None, self._reserve, queued, time.perf_counter() - start
+                )
+            else:
+                wait = self._reserve(queued, time.perf_counter() - start)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            yield
+        finally:
+            if governor is not None:
+                governor.release()
+
+    def stats(self) -> dict:
+        counts = self.counters.snapshot()
+        governor = self.governor
+        return {
+            'rate': self.rate,
+            'burst': self.burst,
+            'shared_path': self.path,
+            'max_concurrent': governor.limit if governor is not None else None,
+            'in_flight': governor.in_flight if governor is not None else None,
+            'waiting': governor.waiting if governor is not None else 0,
+            'requests': counts.get('requests', 0),
+            'queued': counts.get('queued', 0),
+            'throttled': counts.get('throttled', 0),
+            'timings': self.timings.snapshot(),
+        }
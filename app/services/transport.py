@@ -0,0 +1,91 @@
+import threading
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.config import (
+    HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE, HTTP_POOL_BLOCK,
+    HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT
+)
+
+
+class PooledTransport:
+    """Keep-alive HTTP transport backed by a shared connection pool.
+
+    One HTTPAdapter (and therefore one urllib3 pool per host) is shared by all
+    threads. Each thread gets its own Session mounted on that adapter, since
+    Session objects themselves are not safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = HTTP_POOL_CONNECTIONS,
+        pool_maxsize: int = HTTP_POOL_MAXSIZE,
+        pool_block: bool = HTTP_POOL_BLOCK,
+        connect_timeout: float = HTTP_CONNECT_TIMEOUT,
+        read_timeout: float = HTTP_READ_TIMEOUT
+    ):
+        self.timeout = (connect_timeout, read_timeout)
+        self.adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block
+        )
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._sessions = 0
+
+    @property
+    def session(self) -> requests.Session:
+        """Session for the calling thread, created on first use."""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.headers['Connection'] = 'keep-alive'
+            session.mount('https://', self.adapter)
+            session.mount('http://', self.adapter)
+            self._local.session = session
+            with self._lock:
+                self._sessions += 1
+        return session
+
+    def get(
+        self, url: str, params: Optional[dict] = None, stream: bool = False
+    ) -> requests.Response:
+        """Issue a GET over a pooled connection with explicit timeouts.
+
+        With stream, the body is read lazily (iter_content) and the caller
+        must close the response to release the connection.
+        """
+        with self._lock:
+            self._requests += 1
+        return self.session.get(url, params=params, timeout=self.timeout, stream=stream)
+
+    def stats(self) -> dict:
+        """Snapshot of request counts and per-host pool usage."""
+        pools = []
+        container = self.adapter.poolmanager.pools
+        for key in container.keys():
+            pool = container.get(key)
+            if pool is None:
+                continue
+            pools.append({
+                'host': pool.host,
+                'connections_opened': pool.num_connections,
+                'requests': pool.num_requests,
+                'idle_connections': pool.pool.qsize() if pool.pool else 0,
+                'maxsize': pool.pool.maxsize if pool.pool else 0,
+            })
+
+        with self._lock:
+            return {
+                'requests': self._requests,
+                'sessions': self._sessions,
+                'pools': pools,
+            }
+
+    def close(self):
+        """Close all pooled connections."""
+        self.adapter.close()
@@ -0,0 +1,70 @@
+"""Benchmark decode + parse throughput of API pages for each JSON decoder.
+
+Times decoding one page body and parsing its studies into Trials, for a
+full-document page and for a page limited to the projected fields.
+
+Usage: python -m benchmarks.json_decode [--studies 100] [--repeat 20]
+"""
+import argparse
+import json
+import time
+
+from app.services.clinical_trials import TRIAL_FIELDS, extract_field, parse_study
+from app.services.json_decoder import DECODERS, JsonDecoder
+from benchmarks.pipeline import make_study
+
+
+def project(study: dict) -> dict:
+    """Keep only the TRIAL_FIELDS paths, as the API does for `fields`."""
+    projected = {}
+    for path in TRIAL_FIELDS.values():
+        parts = path.split('.')
+        value = extract_field(study, path)
+        if value is None:
+            continue
+        if parts[-2:] == ['interventions', 'name']:
+            parts, value = parts[:-1], [{'name': name} for name in value]
+        target = projected
+        for part in parts[:-1]:
+            target = target.setdefault(part, {})
+        target[parts[-1]] = value
+    return projected
+
+
+def best_of(repeat: int, fn) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--studies', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    studies = [make_study(i) for i in range(args.studies)]
+    bodies = {
+        'full': json.dumps({"totalCount": args.studies, "studies": studies}).encode(),
+        'projected': json.dumps(
+            {"totalCount": args.studies, "studies": [project(s) for s in studies]}
+        ).encode(),
+    }
+
+    for payload, body in bodies.items():
+        print(f"{payload} page: {args.studies} studies, {len(body) / 1e6:.2f} MB")
+        for name in sorted(DECODERS):
+            decoder = JsonDecoder(name)
+            decode = best_of(args.repeat, lambda: decoder.loads(body))
+            page = decoder.loads(body)
+            parse = best_of(args.repeat, lambda: [parse_study(s) for s in page['studies']])
+            total = decode + parse
+            print(f"  {name:7} decode {decode * 1000:7.2f} ms  parse {parse * 1000:6.2f} ms  "
+                  f"total {total * 1000:7.2f} ms/page  ({len(body) / 1e6 / total:6.1f} MB/s)")
+
+
+if __name__ == '__main__':
+    main()
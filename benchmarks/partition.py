@@ -0,0 +1,89 @@
+"""Benchmark a deep fetch with and without query partitioning.
+
+Simulates an upstream with fixed per-request latency holding trials spread
+over several statuses, then times pulling all of them sequentially (one
+token chain) and partitioned by status (one chain per status, fetched on
+PARTITION_WORKERS threads).
+
+Usage: python -m benchmarks.partition [--trials 5000] [--latency 0.1]
+"""
+import argparse
+import json
+import time
+from unittest.mock import patch
+
+from app.config import API_PAGE_SIZE, PARTITION_WORKERS
+from app.models.trial import SearchParams
+from app.services.cache import ResultCache
+from app.services.clinical_trials import ClinicalTrialsService
+from benchmarks.pipeline import SimulatedResponse
+
+STATUSES = ["RECRUITING", "COMPLETED", "ACTIVE_NOT_RECRUITING", "TERMINATED", "UNKNOWN"]
+
+
+class StatusTransport:
+    """Transport that filters by overallStatus and pages by offset after a sleep."""
+
+    def __init__(self, trials: int, latency: float):
+        self.latency = latency
+        self.studies = [
+            {
+                "protocolSection": {
+                    "identificationModule": {"nctId": f"NCT{i:08d}", "briefTitle": f"Trial {i}"},
+                    "statusModule": {"overallStatus": STATUSES[i % len(STATUSES)]},
+                }
+            }
+            for i in range(trials)
+        ]
+
+    def get(self, url, params=None):
+        time.sleep(self.latency)
+        status = params.get('filter.overallStatus')
+        matched = [
+            s for s in self.studies
+            if not status or s["protocolSection"]["statusModule"]["overallStatus"] == status
+        ]
+        offset = int(params.get('pageToken', 0))
+        page = {"totalCount": len(matched), "studies": matched[offset:offset + API_PAGE_SIZE]}
+        if offset + API_PAGE_SIZE < len(matched):
+            page["nextPageToken"] = str(offset + API_PAGE_SIZE)
+        return SimulatedResponse(json.dumps(page).encode())
+
+    def stats(self):
+        return {}
+
+
+def run(transport: StatusTransport, trials: int, partition: bool) -> float:
+    service = ClinicalTrialsService(transport=transport, cache=ResultCache(max_bytes=0))
+    start = time.perf_counter()
+    fetched = sum(
+        len(page) for page, _ in service.iter_pages(
+            SearchParams(condition="cancer"), max_results=trials, partition=partition
+        )
+    )
+    elapsed = time.perf_counter() - start
+    assert fetched == trials, fetched
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--trials', type=int, default=5000)
+    parser.add_argument('--latency', type=float, default=0.1)
+    args = parser.parse_args()
+
+    transport = StatusTransport(args.trials, args.latency)
+    # Only the statuses present are worth a sub-query in this simulation
+    with patch('app.services.partition.API_STATUSES', STATUSES):
+        sequential = run(transport, args.trials, partition=False)
+        partitioned = run(transport, args.trials, partition=True)
+
+    pages = -(-args.trials // API_PAGE_SIZE)
+    print(f"{args.trials} trials, {pages} pages, {args.latency * 1000:.0f} ms per request")
+    print(f"  sequential   {sequential:6.2f} s")
+    print(f"  partitioned  {partitioned:6.2f} s  ({PARTITION_WORKERS} workers, "
+          f"{len(STATUSES)} sub-queries, {sequential / partitioned:.1f}x faster)")
+
+
+if __name__ == '__main__':
+    main()
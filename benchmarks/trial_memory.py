@@ -0,0 +1,95 @@
+"""Benchmark memory held per Trial, list-based dataclass vs the slotted Trial.
+
+Decodes a page of studies with realistic vocabularies (a few phases and
+statuses, a few dozen sponsors, conditions and drugs), parses every study into
+trials of each layout and reports the traced bytes each trial keeps alive once
+the decoded page is dropped.
+
+Usage: python -m benchmarks.trial_memory [--trials 10000]
+"""
+import argparse
+import json
+import tracemalloc
+from dataclasses import dataclass
+from typing import List
+
+from app.services.clinical_trials import TRIAL_FIELDS, extract_field, parse_study
+
+PHASES = [["PHASE1"], ["PHASE2"], ["PHASE2", "PHASE3"], ["PHASE3"], ["PHASE4"]]
+STATUSES = ["RECRUITING", "COMPLETED", "ACTIVE_NOT_RECRUITING", "TERMINATED"]
+
+
+@dataclass
+class ListTrial:
+    """Trial layout before slots, tuples and interning."""
+    nct_id: str
+    title: str
+    phase: str
+    status: str
+    sponsor: str
+    conditions: List[str]
+    interventions: List[str]
+
+
+def make_study(i: int) -> dict:
+    return {
+        "protocolSection": {
+            "identificationModule": {
+                "nctId": f"NCT{i:08d}", "briefTitle": f"Study of Drug {i % 50} in Condition {i % 30}",
+            },
+            "designModule": {"phases": PHASES[i % len(PHASES)]},
+            "statusModule": {"overallStatus": STATUSES[i % len(STATUSES)]},
+            "sponsorCollaboratorsModule": {"leadSponsor": {"name": f"Sponsor {i % 40}"}},
+            "conditionsModule": {"conditions": [f"Condition {i % 30}", f"Condition {i % 7}"]},
+            "armsInterventionsModule": {
+                "interventions": [{"name": f"Drug {i % 50}"}, {"name": "Placebo"}]
+            },
+        }
+    }
+
+
+def measure(body: str, build) -> int:
+    """Bytes still held after decoding the page, building trials, and dropping the page."""
+    tracemalloc.start()
+    studies = json.loads(body)["studies"]
+    trials = [build(study) for study in studies]
+    del studies
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del trials
+    return held
+
+
+def parse_list_trial(study: dict) -> ListTrial:
+    """parse_study as it was before trials were slotted."""
+    fields = {name: extract_field(study, path) for name, path in TRIAL_FIELDS.items()}
+    phases = fields['phase'] or []
+    return ListTrial(
+        nct_id=fields['nct_id'] or '',
+        title=fields['title'] or '',
+        phase=', '.join(phases) if phases else 'N/A',
+        status=fields['status'] or '',
+        sponsor=fields['sponsor'] or '',
+        conditions=fields['conditions'] or [],
+        interventions=[name for name in fields['interventions'] or [] if name],
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--trials', type=int, default=10000)
+    args = parser.parse_args()
+
+    body = json.dumps({"studies": [make_study(i) for i in range(args.trials)]})
+
+    legacy = measure(body, parse_list_trial)
+    slotted = measure(body, parse_study)
+
+    print(f"{args.trials} trials")
+    print(f"  list dataclass  {legacy / args.trials:7.1f} bytes/trial")
+    print(f"  slotted Trial   {slotted / args.trials:7.1f} bytes/trial  "
+          f"({1 - slotted / legacy:.0%} smaller)")
+
+
+if __name__ == '__main__':
+    main()
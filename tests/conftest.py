@@ -1,5 +1,7 @@
 import pytest
 from app import create_app
+from app.mirror.loader import load_studies
+from app.mirror.store import TrialStore
 
 
 @pytest.fixture
@@ -18,6 +20,62 @@ def client(app):
     return app.test_client()
 
 
+class FakeClock:
+    """Stand-in for time.monotonic that only moves when now is changed."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    """Fake clock for TTL, backoff and rate tests; set or advance clock.now."""
+    return FakeClock()
+
+
+def make_study(nct_id, title="Trial", phases=None, status="RECRUITING", sponsor="Sponsor",
+               conditions=None, interventions=None, last_update="2024-01-01"):
+    """Raw API study document with the fields the mirror stores."""
+    return {
+        "protocolSection": {
+            "identificationModule": {"nctId": nct_id, "briefTitle": title},
+            "designModule": {"phases": phases or []},
+            "statusModule": {
+                "overallStatus": status,
+                "lastUpdatePostDateStruct": {"date": last_update}
+            },
+            "sponsorCollaboratorsModule": {"leadSponsor": {"name": sponsor}},
+            "conditionsModule": {"conditions": conditions or []},
+            "armsInterventionsModule": {
+                "interventions": [{"name": n} for n in (interventions or [])]
+            }
+        }
+    }
+
+
+def nct_ids(trials):
+    return [t.nct_id for t in trials]
+
+
+@pytest.fixture
+def mirror_store(tmp_path):
+    """Local mirror of four studies spread over phases, statuses and sponsors."""
+    store = TrialStore(str(tmp_path / 'mirror.db'))
+    load_studies(store, [
+        make_study("NCT00000001", phases=["PHASE2", "PHASE3"], status="RECRUITING",
+                   sponsor="Acme", conditions=["Lung Cancer"]),
+        make_study("NCT00000002", phases=["PHASE1"], status="COMPLETED",
+                   sponsor="Beta", conditions=["Lung Cancer"]),
+        make_study("NCT00000003", phases=["PHASE3"], status="COMPLETED",
+                   sponsor="Acme", conditions=["Breast Cancer"]),
+        make_study("NCT00000004", status="WITHDRAWN", sponsor="Gamma", conditions=["Asthma"]),
+    ])
+    return store
+
+
 @pytest.fixture
 def sample_api_response():
     """Sample API response matching ClinicalTrials.gov v2 format."""
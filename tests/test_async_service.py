@@ -0,0 +1,272 @@
+import asyncio
+import inspect
+import json
+import threading
+from unittest.mock import patch
+
+import pytest
+from aiohttp import web
+
+from app import create_app
+from app.config import PARTITION_WORKERS
+from app.models.trial import SearchParams
+from app.services.async_clinical_trials import AsyncClinicalTrialsService
+from app.services.async_transport import AsyncTransport, BufferedResponse
+from app.services.cache import ResultCache
+from app.services.clinical_trials import ClinicalTrialsService
+from app.services.retry import RetryPolicy
+from tests.test_partition import PAGE_SIZE, FakeUpstream, make_study
+
+
+class FakeAsyncTransport:
+    """Async transport serving pages keyed by pageToken."""
+
+    def __init__(self, pages, delay=0.0, status=200):
+        self.pages = pages
+        self.delay = delay
+        self.status = status
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def get(self, url, params=None):
+        self.requests.append(dict(params))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        page = self.pages[params.get('pageToken')]
+        return BufferedResponse(url, self.status, {}, json.dumps(page).encode())
+
+    def stats(self):
+        return {'requests': len(self.requests)}
+
+
+def make_service(pages, retry=None, **kwargs):
+    sync_service = ClinicalTrialsService(transport=None, cache=ResultCache(), retry=retry)
+    return AsyncClinicalTrialsService(sync_service, FakeAsyncTransport(pages, **kwargs))
+
+
+@pytest.fixture
+def paged(sample_api_response_page1, sample_api_response_page2):
+    return {None: sample_api_response_page1, "token123": sample_api_response_page2}
+
+
+class TestAsyncClinicalTrialsService:
+    """Tests for the asyncio search service."""
+
+    def test_fetch_all_follows_pages(self, paged):
+        """Test that fetch_all walks the token chain and counts upstream work."""
+        service = make_service(paged)
+
+        result = asyncio.run(service.fetch_all(SearchParams(condition="Cancer")))
+
+        assert result.trials[0].nct_id == "NCT00000001"
+        assert len(result.trials) == 150
+        assert result.total_count == 150
+        assert service.transport.requests[0]['countTotal'] == 'true'
+        assert service.transport.requests[1]['pageToken'] == "token123"
+        assert service.service.counters.get('pages') == 2
+
+    def test_results_are_shared_with_sync_service(self, paged):
+        """Test that the async fetch fills the cache the sync service reads."""
+        service = make_service(paged)
+        params = SearchParams(condition="Cancer")
+
+        result = asyncio.run(service.fetch_all(params))
+
+        assert service.service.fetch_all(params) is result
+
+    def test_concurrent_searches_share_one_fetch(self, paged):
+        """Test that many concurrent identical searches need one upstream chain."""
+        service = make_service(paged, delay=0.01)
+
+        async def main():
+            return await asyncio.gather(*(
+                service.fetch_all(SearchParams(condition=" cancer ")) for _ in range(50)
+            ))
+
+        results = asyncio.run(main())
+
+        assert all(r is results[0] for r in results)
+        assert len(service.transport.requests) == 2
+        assert service.stats()['single_flight']['coalesced'] == 49
+
+    def test_distinct_searches_overlap_on_one_thread(self, paged):
+        """Test that different searches wait on the network at the same time."""
+        service = make_service(paged, delay=0.02)
+        threads = set()
+
+        async def search(i):
+            threads.add(threading.get_ident())
+            return await service.fetch_all(SearchParams(condition=f"Cancer {i}"))
+
+        async def main():
+            return await asyncio.gather(*(search(i) for i in range(100)))
+
+        asyncio.run(main())
+
+        assert len(threads) == 1
+        assert service.transport.max_in_flight == 100
+
+    def test_upstream_error_is_raised(self, paged):
+        """Test that an HTTP error status fails the search."""
+        service = make_service(paged, retry=RetryPolicy(attempts=0), status=502)
+
+        with pytest.raises(Exception, match='502'):
+            asyncio.run(service.fetch_all(SearchParams(condition="Cancer")))
+
+    def test_run_from_another_loop(self, paged):
+        """Test that run() awaits the fetch on the service's own loop."""
+        service = make_service(paged)
+
+        async def caller():
+            return await service.run(service.fetch_all(SearchParams(condition="Cancer")))
+
+        result = asyncio.run(caller())
+
+        assert len(result.trials) == 150
+        assert service.loop.is_running()
+
+    def test_iter_pages_sync(self, paged):
+        """Test the blocking page iterator used by CSV exports."""
+        service = make_service(paged)
+
+        pages = list(service.iter_pages_sync(SearchParams(condition="Cancer")))
+
+        assert [len(trials) for trials, _ in pages] == [100, 50]
+        assert all(total == 150 for _, total in pages)
+
+    def test_iter_pages_sync_can_stop_early(self, paged):
+        """Test that closing the iterator closes the async generator."""
+        service = make_service(paged)
+
+        pages = service.iter_pages_sync(SearchParams(condition="Cancer"))
+        first, _ = next(pages)
+        pages.close()
+
+        assert len(first) == 100
+
+    def test_partitioned_search_runs_sub_queries_together(self):
+        """Test that a deep search is split and merged as in the sync service."""
+        studies = [
+            make_study(i, ["RECRUITING", "COMPLETED", "TERMINATED"][i % 3], ["PHASE2"])
+            for i in range(150)
+        ]
+        upstream = FakeUpstream(studies)
+
+        class AsyncUpstream(FakeAsyncTransport):
+            async def get(self, url, params=None):
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+                try:
+                    await asyncio.sleep(0.01)
+                finally:
+                    self.in_flight -= 1
+                response = upstream.get(url, params)
+                return BufferedResponse(url, 200, {}, response.content)
+
+        service = make_service({})
+        service.transport = AsyncUpstream({})
+
+        with patch('app.services.clinical_trials.API_PAGE_SIZE', PAGE_SIZE):
+            pages = list(service.iter_pages_sync(
+                SearchParams(condition="Cancer"), partition=True
+            ))
+
+        trials = [t for page, _ in pages for t in page]
+        assert len({t.nct_id for t in trials}) == len(trials) == 150
+        assert 1 < service.transport.max_in_flight <= PARTITION_WORKERS
+        assert service.service.counters.get('partitioned_searches') == 1
+
+
+class TestAsyncTransport:
+    """Tests for the aiohttp transport against a local server."""
+
+    def test_get_reads_body_and_status(self):
+        """Test a round trip through a real aiohttp session."""
+        async def handler(request):
+            if request.query.get('fail'):
+                return web.Response(status=429, text='slow down')
+            return web.json_response({"pageSize": request.query['pageSize']})
+
+        async def main():
+            app = web.Application()
+            app.router.add_get('/studies', handler)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+            port = runner.addresses[0][1]
+            transport = AsyncTransport(pool_maxsize=2)
+            try:
+                url = f'http://127.0.0.1:{port}/studies'
+                ok = await transport.get(url, params={'pageSize': 100})
+                failed = await transport.get(url, params={'fail': 1})
+            finally:
+                await transport.close()
+                await runner.cleanup()
+            return ok, failed, transport.stats()
+
+        ok, failed, stats = asyncio.run(main())
+
+        assert json.loads(ok.content) == {"pageSize": "100"}
+        ok.raise_for_status()
+        assert failed.status_code == 429
+        with pytest.raises(Exception, match='429'):
+            failed.raise_for_status()
+        assert stats == {'requests': 2, 'in_flight': 0, 'maxsize': 2}
+
+    def test_waiting_for_a_pooled_connection_is_not_a_connect_timeout(self):
+        """Test that requests queued behind a full pool outlast connect_timeout."""
+        async def handler(request):
+            await asyncio.sleep(0.3)
+            return web.Response(text='ok')
+
+        async def main():
+            app = web.Application()
+            app.router.add_get('/studies', handler)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+            port = runner.addresses[0][1]
+            transport = AsyncTransport(pool_maxsize=1, connect_timeout=0.1)
+            try:
+                url = f'http://127.0.0.1:{port}/studies'
+                return await asyncio.gather(transport.get(url), transport.get(url))
+            finally:
+                await transport.close()
+                await runner.cleanup()
+
+        responses = asyncio.run(main())
+
+        assert [response.status_code for response in responses] == [200, 200]
+
+
+class TestAsyncRoutes:
+    """Tests for /search and /export served through the async service."""
+
+    def test_views_are_sync_without_async_service(self, app):
+        """Test that no event loop is set up per request by default."""
+        assert not inspect.iscoroutinefunction(app.view_functions['search.search'])
+        assert not inspect.iscoroutinefunction(app.view_functions['search.export'])
+
+    def test_search_and_export_use_async_service(self, paged):
+        """Test that the views fetch on the async service when it is enabled."""
+        service = make_service(paged)
+
+        with patch('app.routes.search.async_service', service):
+            app = create_app({'TESTING': True, 'SECRET_KEY': 'test-secret-key'})
+            client = app.test_client()
+            assert inspect.iscoroutinefunction(app.view_functions['search.search'])
+            page = client.get('/search?condition=Cancer')
+            export = client.get('/export?condition=Lung')
+
+        assert page.status_code == 200
+        assert b'NCT00000001' in page.data
+        assert export.status_code == 200
+        assert len(export.data.decode().splitlines()) == 151
+        assert len(service.transport.requests) == 4
@@ -0,0 +1,119 @@
+import pytest
+
+from app.mirror.backend import LocalTrialsBackend
+from app.mirror.bitmap_index import (
+    BitmapIndex, decode_bitmap, encode_bitmap, from_bitmap, to_bitmap
+)
+from app.mirror.loader import load_studies
+from app.mirror.text_index import TextIndex
+from app.models.trial import SearchParams
+from tests.conftest import make_study, nct_ids
+
+
+@pytest.fixture
+def bitmaps(mirror_store):
+    bitmaps = BitmapIndex(mirror_store)
+    bitmaps.rebuild()
+    return bitmaps
+
+
+class TestBitmaps:
+    """Tests for bitmap conversion and encoding."""
+
+    def test_ids_round_trip(self):
+        """Test converting ids to a bitmap and back."""
+        ids = [0, 7, 8, 9, 1000, 123456]
+
+        assert list(from_bitmap(to_bitmap(ids))) == ids
+        assert list(from_bitmap(to_bitmap([]))) == []
+
+    def test_encoding_round_trips(self):
+        """Test compressed storage of a bitmap."""
+        bitmap = to_bitmap(range(0, 100000, 3))
+
+        assert decode_bitmap(encode_bitmap(bitmap)) == bitmap
+        assert len(encode_bitmap(bitmap)) < (100000 // 8) // 10
+
+
+class TestBitmapIndex:
+    """Tests for BitmapIndex phase and status matching."""
+
+    def match(self, mirror_store, bitmaps, **criteria):
+        ids = from_bitmap(bitmaps.match(SearchParams(**criteria)))
+        return nct_ids(mirror_store.search(SearchParams(), 10, ids=ids))
+
+    def test_phases_are_ored(self, mirror_store, bitmaps):
+        """Test that any selected phase matches."""
+        assert self.match(mirror_store, bitmaps, phases=["PHASE1", "PHASE2"]) == [
+            "NCT00000001", "NCT00000002"
+        ]
+
+    def test_statuses_and_phases_intersect(self, mirror_store, bitmaps):
+        """Test status set filtering combined with phases."""
+        assert self.match(mirror_store, bitmaps, phases=["PHASE3"], statuses=["COMPLETED"]) == [
+            "NCT00000003"
+        ]
+        assert self.match(mirror_store, bitmaps, statuses=["SUSPENDED"]) == []
+
+    def test_no_facet_filters(self, bitmaps):
+        """Test that params without phases or statuses do not filter."""
+        assert bitmaps.match(SearchParams(condition="cancer")) is None
+
+    def test_rebuild_reloads_bitmaps(self, mirror_store, bitmaps):
+        """Test that updated studies are visible after a rebuild."""
+        bitmaps.match(SearchParams(statuses=["COMPLETED"]))
+        load_studies(mirror_store, [make_study("NCT00000004", status="COMPLETED",
+                                               last_update="2024-06-01")])
+        assert not bitmaps.is_current()
+
+        bitmaps.rebuild()
+
+        assert self.match(mirror_store, bitmaps, statuses=["COMPLETED"]) == [
+            "NCT00000002", "NCT00000003", "NCT00000004"
+        ]
+
+
+class TestIndexedBackend:
+    """Tests for LocalTrialsBackend combining text postings and bitmaps."""
+
+    def test_text_and_facets_combine(self, mirror_store, bitmaps):
+        """Test that the backend intersects both indexes."""
+        index = TextIndex(mirror_store)
+        index.rebuild()
+        backend = LocalTrialsBackend(mirror_store, index, bitmaps)
+
+        result = backend.fetch_all(SearchParams(condition="cancer", statuses=["COMPLETED"]))
+
+        assert nct_ids(result.trials) == ["NCT00000002", "NCT00000003"]
+        assert result.total_count == 2
+        timings = backend.stats()['timings']
+        assert timings['text_index']['count'] == 1
+        assert timings['bitmap_index']['count'] == 1
+
+    def test_text_criteria_use_sql_when_text_index_is_stale(self, mirror_store, bitmaps):
+        """Test that facets from bitmaps still honour SQL text matching."""
+        backend = LocalTrialsBackend(mirror_store, bitmaps=bitmaps)
+
+        result = backend.fetch_all(SearchParams(condition="lung", phases=["PHASE1", "PHASE3"]))
+
+        assert nct_ids(result.trials) == ["NCT00000001", "NCT00000002"]
+        assert result.total_count == 2
+
+    def test_facet_criteria_use_sql_when_bitmap_index_is_stale(self, mirror_store, bitmaps):
+        """Test counts when only the text index is current."""
+        index = TextIndex(mirror_store)
+        index.rebuild()
+        load_studies(mirror_store, [make_study("NCT00000005", phases=["PHASE1"],
+                                               conditions=["Lung Cancer"])])
+        index.rebuild()
+        backend = LocalTrialsBackend(mirror_store, index, bitmaps)
+        params = SearchParams(condition="lung", phases=["PHASE1"])
+
+        result = backend.fetch_all(params)
+        facets = backend.facets(params)
+
+        assert not bitmaps.is_current()
+        assert nct_ids(result.trials) == ["NCT00000002", "NCT00000005"]
+        assert result.total_count == 2
+        assert result.truncated is False
+        assert facets['total_count'] == 2
@@ -0,0 +1,148 @@
+import sys
+from unittest.mock import Mock
+
+from app.services.cache import ResultCache, canonical_key, estimate_size
+from app.services.clinical_trials import ClinicalTrialsService
+from app.models.trial import SearchParams, SearchResult, Trial
+
+
+def make_result(n=1):
+    trials = [
+        Trial(
+            nct_id=f"NCT{i:08d}",
+            title=f"Trial {i}",
+            phase="PHASE2",
+            status="RECRUITING",
+            sponsor="Sponsor",
+            conditions=["Cancer"],
+            interventions=["Drug"]
+        )
+        for i in range(n)
+    ]
+    return SearchResult(trials=trials, total_count=n, truncated=False)
+
+
+class TestCanonicalKey:
+    """Tests for canonical_key."""
+
+    def test_ignores_case_and_whitespace(self):
+        """Test that text criteria are case-folded and whitespace-normalized."""
+        a = SearchParams(compound="  Pembrolizumab ", condition="Lung   Cancer")
+        b = SearchParams(compound="pembrolizumab", condition="lung cancer")
+
+        assert canonical_key(a) == canonical_key(b)
+
+    def test_ignores_order_of_phases_and_statuses(self):
+        """Test that multi-select criteria are order-insensitive."""
+        a = SearchParams(phases=["PHASE3", "PHASE2"], statuses=["COMPLETED", "RECRUITING"])
+        b = SearchParams(phases=["PHASE2", "PHASE3"], statuses=["RECRUITING", "COMPLETED"])
+
+        assert canonical_key(a) == canonical_key(b)
+
+    def test_empty_values_equal_none(self):
+        """Test that empty strings and lists are treated as unset."""
+        assert canonical_key(SearchParams(compound="", phases=[])) == canonical_key(SearchParams())
+
+    def test_distinguishes_different_queries(self):
+        """Test that different criteria produce different keys."""
+        assert canonical_key(SearchParams(compound="a")) != canonical_key(SearchParams(condition="a"))
+
+
+class TestResultCache:
+    """Tests for ResultCache."""
+
+    def test_get_returns_stored_result(self):
+        """Test that a stored result is returned and counted as a hit."""
+        cache = ResultCache()
+        result = make_result()
+        cache.put('k', result)
+
+        assert cache.get('k') is result
+        assert cache.stats()['hits'] == 1
+
+    def test_get_missing_counts_miss(self):
+        """Test that a missing key is counted as a miss."""
+        cache = ResultCache()
+
+        assert cache.get('missing') is None
+        assert cache.stats()['misses'] == 1
+
+    def test_entries_expire_after_ttl(self, clock):
+        """Test that entries are dropped after their TTL."""
+        cache = ResultCache(ttl=10, clock=clock)
+        cache.put('k', make_result())
+
+        clock.now = 9
+        assert cache.get('k') is not None
+        clock.now = 10
+        assert cache.get('k') is None
+        assert cache.stats()['expirations'] == 1
+        assert cache.stats()['entries'] == 0
+
+    def test_expired_entries_kept_for_stale_ttl(self, clock):
+        """Test that expired entries stay available to get_stale only."""
+        cache = ResultCache(ttl=10, clock=clock, stale_ttl=50)
+        result = make_result()
+        cache.put('k', result)
+
+        clock.now = 30
+        assert cache.get('k') is None
+        assert cache.get_stale('k') is result
+        clock.now = 60
+        assert cache.get('k') is None
+        assert cache.get_stale('k') is None
+        assert cache.stats()['expirations'] == 1
+        assert cache.stats()['stale_hits'] == 1
+
+    def test_evicts_least_recently_used_over_budget(self):
+        """Test that LRU entries are evicted when the memory budget is exceeded."""
+        size = estimate_size(make_result(10))
+        cache = ResultCache(max_bytes=size * 2)
+        cache.put('a', make_result(10))
+        cache.put('b', make_result(10))
+        cache.get('a')
+        cache.put('c', make_result(10))
+
+        assert cache.get('b') is None
+        assert cache.get('a') is not None
+        assert cache.get('c') is not None
+        assert cache.stats()['evictions'] == 1
+        assert cache.stats()['bytes'] <= size * 2
+
+    def test_size_counts_shared_strings_once(self):
+        """Test that a sponsor shared by several trials is counted once."""
+        shared = make_result(10)
+        distinct = make_result(10)
+        for i, trial in enumerate(distinct.trials):
+            trial.sponsor = f"Sponsor{i}"
+        for trial in shared.trials:
+            trial.sponsor = "Sponsor0"
+
+        extra = estimate_size(distinct) - estimate_size(shared)
+
+        assert extra == 9 * sys.getsizeof("Sponsor0")
+
+    def test_skips_results_larger_than_budget(self):
+        """Test that a single oversized result is not cached."""
+        cache = ResultCache(max_bytes=10)
+        cache.put('k', make_result())
+
+        assert cache.get('k') is None
+        assert cache.stats()['entries'] == 0
+
+
+class TestServiceCaching:
+    """Tests for result caching in ClinicalTrialsService."""
+
+    def test_equivalent_searches_hit_cache(self):
+        """Test that normalized-equal searches only fetch upstream once."""
+        transport = Mock()
+        transport.get.return_value.json.return_value = {"totalCount": 0, "studies": []}
+        service = ClinicalTrialsService(transport=transport)
+
+        first = service.fetch_all(SearchParams(condition="Lung Cancer", phases=["PHASE2", "PHASE3"]))
+        second = service.fetch_all(SearchParams(condition="lung  cancer", phases=["PHASE3", "PHASE2"]))
+
+        assert transport.get.call_count == 1
+        assert second is first
+        assert service.stats()['cache']['hits'] == 1
@@ -0,0 +1,198 @@
+import asyncio
+from unittest.mock import Mock
+
+import pytest
+import requests
+
+from app.models.trial import SearchParams
+from app.services.cache import ResultCache
+from app.services.circuit import CircuitBreaker, CircuitOpenError
+from app.services.clinical_trials import ClinicalTrialsService
+from app.services.retry import RetryPolicy
+from tests.test_async_service import make_service
+
+
+def make_breaker(clock, **kwargs):
+    options = dict(failure_rate=0.5, min_requests=4, window=10, slow_call=5,
+                   open_seconds=30, clock=clock)
+    options.update(kwargs)
+    return CircuitBreaker(**options)
+
+
+def fail(breaker, error=None):
+    with pytest.raises(Exception):
+        with breaker.guard():
+            raise error or requests.ConnectionError('down')
+
+
+def succeed(breaker):
+    with breaker.guard():
+        pass
+
+
+class TestCircuitBreaker:
+    """Tests for the circuit breaker state machine."""
+
+    def test_opens_at_failure_rate(self, clock):
+        """Test that the circuit opens once enough recent calls failed."""
+        breaker = make_breaker(clock)
+        succeed(breaker)
+        succeed(breaker)
+        fail(breaker)
+        assert breaker.state == 'closed'
+
+        fail(breaker)
+
+        assert breaker.state == 'open'
+        with pytest.raises(CircuitOpenError, match='unavailable'):
+            breaker.check()
+        assert breaker.stats()['trips'] == 1
+        assert breaker.stats()['rejected'] == 1
+
+    def test_client_errors_do_not_count(self, clock):
+        """Test that a 404 is the upstream answering, not failing."""
+        breaker = make_breaker(clock)
+        response = Mock(status_code=404)
+
+        for _ in range(10):
+            fail(breaker, requests.HTTPError('404', response=response))
+
+        assert breaker.state == 'closed'
+        assert breaker.stats()['recent_failures'] == 0
+
+    def test_slow_calls_count_as_failures(self, clock):
+        """Test that calls at or past slow_call trip the circuit."""
+        breaker = make_breaker(clock)
+
+        for _ in range(4):
+            breaker.record(6.0)
+
+        assert breaker.state == 'open'
+
+    def test_half_open_probe_closes_or_reopens(self, clock):
+        """Test that one probe is let through after open_seconds."""
+        breaker = make_breaker(clock)
+        for _ in range(4):
+            fail(breaker)
+
+        clock.now = 30
+        assert breaker.state == 'half_open'
+        assert breaker.check() is True
+        with pytest.raises(CircuitOpenError):
+            breaker.check()
+        breaker.record(0.1, failed=True, probe=True)
+        assert breaker.state == 'open'
+
+        clock.now = 60
+        succeed(breaker)
+        assert breaker.state == 'closed'
+        succeed(breaker)
+
+    def test_calls_from_before_the_trip_are_ignored(self, clock):
+        """Test that only the probe decides whether an open circuit closes."""
+        breaker = make_breaker(clock)
+        for _ in range(4):
+            fail(breaker)
+
+        breaker.record(0.1)
+
+        assert breaker.state == 'open'
+
+    def test_lost_probe_is_replaced(self, clock):
+        """Test that a probe without an outcome stops blocking after open_seconds."""
+        breaker = make_breaker(clock)
+        for _ in range(4):
+            fail(breaker)
+        clock.now = 30
+        assert breaker.check() is True
+
+        clock.now = 45
+        with pytest.raises(CircuitOpenError):
+            breaker.check()
+        clock.now = 60
+        assert breaker.check() is True
+
+
+class TestStaleFallback:
+    """Tests for serving expired results while the API is down."""
+
+    def make_service(self, clock, get):
+        transport = Mock()
+        transport.get.side_effect = get
+        return ClinicalTrialsService(
+            transport=transport,
+            cache=ResultCache(ttl=10, stale_ttl=100, clock=clock),
+            retry=RetryPolicy(attempts=0),
+            breaker=make_breaker(clock),
+        )
+
+    def test_outage_serves_stale_result(self, sample_api_response, clock):
+        """Test that an expired result is served, flagged, when the API fails."""
+        responses = [Mock(json=Mock(return_value=sample_api_response))]
+
+        def get(url, params=None):
+            if responses:
+                return responses.pop()
+            raise requests.ConnectionError('down')
+
+        service = self.make_service(clock, get)
+        params = SearchParams(condition="Cancer")
+        fresh = service.fetch_all(params)
+
+        clock.now = 20
+        stale = service.fetch_all(params)
+
+        assert stale.stale is True
+        assert fresh.stale is False
+        assert [t.nct_id for t in stale.trials] == [t.nct_id for t in fresh.trials]
+        assert service.stats()['upstream']['stale_results'] == 1
+
+        clock.now = 200
+        with pytest.raises(requests.ConnectionError):
+            service.fetch_all(params)
+
+    def test_open_circuit_fails_fast(self, clock):
+        """Test that an open circuit stops requests reaching the transport."""
+        service = self.make_service(clock, Mock(side_effect=requests.Timeout('slow')))
+
+        for i in range(4):
+            with pytest.raises(requests.Timeout):
+                service.fetch_all(SearchParams(condition=f"Cancer {i}"))
+        with pytest.raises(CircuitOpenError):
+            service.fetch_all(SearchParams(condition="Asthma"))
+
+        assert service.transport.get.call_count == 4
+        assert service.stats()['circuit']['state'] == 'open'
+
+    def test_bad_requests_are_not_masked(self, sample_api_response, clock):
+        """Test that a client error is raised even with a stale result at hand."""
+        responses = [Mock(json=Mock(return_value=sample_api_response))]
+
+        def get(url, params=None):
+            if responses:
+                return responses.pop()
+            raise requests.HTTPError('400', response=Mock(status_code=400))
+
+        service = self.make_service(clock, get)
+        params = SearchParams(condition="Cancer")
+        service.fetch_all(params)
+        clock.now = 20
+
+        with pytest.raises(requests.HTTPError):
+            service.fetch_all(params)
+
+    def test_async_service_serves_stale_result(self, sample_api_response_page1,
+                                               sample_api_response_page2, clock):
+        """Test the same fallback on the asyncio path."""
+        pages = {None: sample_api_response_page1, "token123": sample_api_response_page2}
+        service = make_service(pages, retry=RetryPolicy(attempts=0))
+        service.service.cache = ResultCache(ttl=10, stale_ttl=100, clock=clock)
+        params = SearchParams(condition="Cancer")
+        asyncio.run(service.fetch_all(params))
+
+        clock.now = 20
+        service.transport.status = 503
+        result = asyncio.run(service.fetch_all(params))
+
+        assert result.stale is True
+        assert len(result.trials) == 150
@@ -1,3 +1,5 @@
+import json
+import threading
 import pytest
 from unittest.mock import patch, Mock
 import requests
@@ -14,7 +16,7 @@ class TestClinicalTrialsService:
         service = ClinicalTrialsService()
         params = SearchParams(compound="pembrolizumab")
 
-        with patch('app.services.clinical_trials.requests.get') as mock_get:
+        with patch('app.services.transport.requests.Session.get') as mock_get:
             mock_get.return_value.json.return_value = {"totalCount": 0, "studies": []}
             mock_get.return_value.raise_for_status = Mock()
 
@@ -29,7 +31,7 @@ class TestClinicalTrialsService:
         service = ClinicalTrialsService()
         params = SearchParams(condition="Lung Cancer")
 
-        with patch('app.services.clinical_trials.requests.get') as mock_get:
+        with patch('app.services.transport.requests.Session.get') as mock_get:
             mock_get.return_value.json.return_value = {"totalCount": 0, "studies": []}
             mock_get.return_value.raise_for_status = Mock()
 
@@ -44,7 +46,7 @@ class TestClinicalTrialsService:
         service = ClinicalTrialsService()
         params = SearchParams(phases=["PHASE3"])
 
-        with patch('app.services.clinical_trials.requests.get') as mock_get:
+        with patch('app.services.transport.requests.Session.get') as mock_get:
             mock_get.return_value.json.return_value = {"totalCount": 0, "studies": []}
             mock_get.return_value.raise_for_status = Mock()
 
@@ -59,7 +61,7 @@ class TestClinicalTrialsService:
         service = ClinicalTrialsService()
         params = SearchParams(phases=["PHASE2", "PHASE3"])
 
-        with patch('app.services.clinical_trials.requests.get') as mock_get:
+        with patch('app.services.transport.requests.Session.get') as mock_get:
             mock_get.return_value.json.return_value = {"totalCount": 0, "studies": []}
             mock_get.return_value.raise_for_status = Mock()
 
@@ -74,7 +76,7 @@ class TestClinicalTrialsService:
         service = ClinicalTrialsService()
         params = SearchParams(statuses=["RECRUITING"])
 
-        with patch('app.services.clinical_trials.requests.get') as mock_get:
+        with patch('app.services.transport.requests.Session.get') as mock_get:
             mock_get.return_value.json.return_value = {"totalCount": 0, "studies": []}
             mock_get.return_value.raise_for_status = Mock()
 
@@ -89,7 +91,7 @@ class TestClinicalTrialsService:
         service = ClinicalTrialsService()
         params = SearchParams(statuses=["RECRUITING", "COMPLETED"])
 
-        with patch('app.services.clinical_trials.requests.get') as mock_get:
+        with patch('app.services.transport.requests.Session.get') as mock_get:
             mock_get.return_value.json.return_value = {"totalCount": 0, "studies": []}
             mock_get.return_value.raise_for_status = Mock()
 
@@ -109,7 +111,7 @@ class TestClinicalTrialsService:
             statuses=["RECRUITING", "ACTIVE_NOT_RECRUITING"]
         )
 
-        with patch('app.services.clinical_trials.requests.get') as mock_get:
+        with patch('app.services.transport.requests.Session.get') as mock_get:
             mock_get.return_value.json.return_value = {"totalCount": 0, "studies": []}
             mock_get.return_value.raise_for_status = Mock()
 
@@ -127,7 +129,7 @@ class TestClinicalTrialsService:
         service = ClinicalTrialsService()
         params = SearchParams(compound="nonexistent")
 
-        with patch('app.services.clinical_trials.requests.get') as mock_get:
+        with patch('app.services.transport.requests.Session.get') as mock_get:
             mock_get.return_value.json.return_value = empty_api_response
             mock_get.return_value.raise_for_status = Mock()
 
@@ -144,7 +146,7 @@ class TestClinicalTrialsService:
         service = ClinicalTrialsService()
         params = SearchParams(condition="Cancer")
 
-        with patch('app.services.clinical_trials.requests.get') as mock_get:
+        with patch('app.services.transport.requests.Session.get') as mock_get:
             mock_get.return_value.raise_for_status = Mock()
             mock_get.return_value.json.side_effect = [
                 sample_api_response_page1,
@@ -181,7 +183,7 @@ class TestClinicalTrialsService:
             ]
         }
 
-        with patch('app.services.clinical_trials.requests.get') as mock_get:
+        with patch('app.services.transport.requests.Session.get') as mock_get:
             with patch('app.services.clinical_trials.MAX_RESULTS', 250):
                 mock_get.return_value.raise_for_status = Mock()
                 mock_get.return_value.json.return_value = large_response
@@ -214,7 +216,7 @@ class TestClinicalTrialsService:
             ]
         }
 
-        with patch('app.services.clinical_trials.requests.get') as mock_get:
+        with patch('app.services.transport.requests.Session.get') as mock_get:
             mock_get.return_value.raise_for_status = Mock()
             mock_get.return_value.json.return_value = response
 
@@ -237,8 +239,8 @@ class TestClinicalTrialsService:
         assert trial.phase == "PHASE2, PHASE3"
         assert trial.status == "RECRUITING"
         assert trial.sponsor == "Test Sponsor Inc"
-        assert trial.conditions == ["Lung Cancer", "NSCLC"]
-        assert trial.interventions == ["Pembrolizumab", "Placebo"]
+        assert trial.conditions == ("Lung Cancer", "NSCLC")
+        assert trial.interventions == ("Pembrolizumab", "Placebo")
 
     def test_parse_study_handles_missing_fields(self):
         """Test parsing handles missing optional fields gracefully."""
@@ -258,15 +260,15 @@ class TestClinicalTrialsService:
         assert trial.phase == "N/A"
         assert trial.status == ""
         assert trial.sponsor == ""
-        assert trial.conditions == []
-        assert trial.interventions == []
+        assert trial.conditions == ()
+        assert trial.interventions == ()
 
     def test_fetch_all_propagates_api_errors(self):
         """Test that API errors are properly propagated."""
         service = ClinicalTrialsService()
         params = SearchParams(compound="test")
 
-        with patch('app.services.clinical_trials.requests.get') as mock_get:
+        with patch('app.services.transport.requests.Session.get') as mock_get:
             mock_get.return_value.raise_for_status.side_effect = requests.HTTPError("API Error")
 
             with pytest.raises(requests.HTTPError):
@@ -277,7 +279,7 @@ class TestClinicalTrialsService:
         service = ClinicalTrialsService()
         params = SearchParams(compound="test")
 
-        with patch('app.services.clinical_trials.requests.get') as mock_get:
+        with patch('app.services.transport.requests.Session.get') as mock_get:
             mock_get.return_value.json.return_value = {"totalCount": 0, "studies": []}
             mock_get.return_value.raise_for_status = Mock()
 
@@ -295,7 +297,7 @@ class TestClinicalTrialsService:
         service = ClinicalTrialsService()
         params = SearchParams(condition="Cancer")
 
-        with patch('app.services.clinical_trials.requests.get') as mock_get:
+        with patch('app.services.transport.requests.Session.get') as mock_get:
             mock_get.return_value.raise_for_status = Mock()
             mock_get.return_value.json.side_effect = [
                 sample_api_response_page1,
@@ -311,3 +313,257 @@ class TestClinicalTrialsService:
             # Second call should have pageToken
             second_call_params = mock_get.call_args_list[1].kwargs['params']
             assert second_call_params['pageToken'] == 'token123'
+
+    def test_iter_pages_max_results_overrides_interactive_cap(self):
+        """Test that iter_pages can paginate beyond MAX_RESULTS when asked."""
+        service = ClinicalTrialsService()
+        params = SearchParams(condition="Cancer")
+
+        response = {
+            "totalCount": 1000,
+            "nextPageToken": "next",
+            "studies": [
+                {"protocolSection": {"identificationModule": {"nctId": f"NCT{i:08d}"}}}
+                for i in range(100)
+            ]
+        }
+
+        with patch('app.services.transport.requests.Session.get') as mock_get:
+            with patch('app.services.clinical_trials.MAX_RESULTS', 100):
+                mock_get.return_value.raise_for_status = Mock()
+                mock_get.return_value.json.return_value = response
+
+                pages = list(service.iter_pages(params, max_results=250))
+
+                assert [len(trials) for trials, _ in pages] == [100, 100, 50]
+                assert mock_get.call_count == 3
+
+    def test_iter_pages_prefetches_next_page(
+        self, sample_api_response_page1, sample_api_response_page2
+    ):
+        """Test that the next page is requested before the caller asks for it."""
+        second_requested = threading.Event()
+        responses = iter([sample_api_response_page1, sample_api_response_page2])
+
+        def get(url, params=None):
+            if 'pageToken' in params:
+                second_requested.set()
+            response = Mock()
+            response.json.return_value = next(responses)
+            return response
+
+        transport = Mock()
+        transport.get.side_effect = get
+        service = ClinicalTrialsService(transport=transport)
+
+        pages = service.iter_pages(SearchParams(condition="Cancer"))
+        first, _ = next(pages)
+
+        assert len(first) == 100
+        assert second_requested.wait(timeout=5)
+        assert len(next(pages)[0]) == 50
+
+    def test_iter_pages_fetches_inline_when_prefetch_workers_are_busy(
+        self, sample_api_response_page1, sample_api_response_page2
+    ):
+        """Test that a search does not queue behind other searches' prefetches."""
+        threads = []
+        responses = iter([sample_api_response_page1, sample_api_response_page2])
+
+        def get(url, params=None):
+            threads.append(threading.current_thread())
+            response = Mock()
+            response.json.return_value = next(responses)
+            return response
+
+        transport = Mock()
+        transport.get.side_effect = get
+        service = ClinicalTrialsService(transport=transport)
+        service._prefetch_slots = threading.BoundedSemaphore(1)
+        service._prefetch_slots.acquire()
+
+        pages = list(service.iter_pages(SearchParams(condition="Cancer")))
+
+        assert [len(trials) for trials, _ in pages] == [100, 50]
+        assert threads == [threading.current_thread()] * 2
+        assert service.counters.get('prefetch_skipped') == 1
+
+    def test_iter_pages_without_prefetch_is_serial(
+        self, sample_api_response_page1, sample_api_response_page2
+    ):
+        """Test that prefetch=False only requests a page when it is needed."""
+        transport = Mock()
+        transport.get.return_value.json.side_effect = [
+            sample_api_response_page1,
+            sample_api_response_page2
+        ]
+        service = ClinicalTrialsService(transport=transport)
+
+        pages = service.iter_pages(SearchParams(condition="Cancer"), prefetch=False)
+        next(pages)
+
+        assert transport.get.call_count == 1
+        next(pages)
+        assert transport.get.call_count == 2
+
+    def test_peek_next_token_reads_raw_body(self):
+        """Test that the next page token is found without decoding the page."""
+        from app.services.clinical_trials import _peek_next_token
+
+        response = Mock()
+        response.content = b'{"totalCount": 2, "studies": [{}], "nextPageToken": "abc123"}'
+        assert _peek_next_token(response) == 'abc123'
+
+        response.content = b'{"totalCount": 2, "studies": []}'
+        assert _peek_next_token(response) is None
+
+    def test_iter_pages_discards_mismatched_prefetch(
+        self, sample_api_response_page1, sample_api_response_page2
+    ):
+        """Test that a wrongly peeked token is replaced by the decoded one."""
+        requested = []
+        responses = {None: sample_api_response_page1, 'token123': sample_api_response_page2}
+
+        def get(url, params=None):
+            token = params.get('pageToken')
+            requested.append(token)
+            page = responses.get(token, {"studies": []})
+            # The real token comes first; the last study carries a nested
+            # key of the same name, which is what the tail scan finds
+            body = {"nextPageToken": page.get("nextPageToken"), **page}
+            body["studies"] = [dict(study) for study in page["studies"]]
+            if body["studies"]:
+                body["studies"][-1]["extra"] = {"nextPageToken": "bogus"}
+            response = Mock()
+            response.content = json.dumps(body).encode()
+            return response
+
+        transport = Mock()
+        transport.get.side_effect = get
+        service = ClinicalTrialsService(transport=transport)
+
+        pages = list(service.iter_pages(SearchParams(condition="Cancer")))
+
+        assert [len(trials) for trials, _ in pages] == [100, 50]
+        assert 'token123' in requested
+
+    def test_fetch_all_requests_only_parsed_fields(self):
+        """Test that the fields projection covers every field the parser reads."""
+        from app.services.clinical_trials import TRIAL_FIELDS
+
+        service = ClinicalTrialsService()
+        params = SearchParams(compound="test")
+
+        with patch('app.services.transport.requests.Session.get') as mock_get:
+            mock_get.return_value.json.return_value = {"totalCount": 0, "studies": []}
+            mock_get.return_value.raise_for_status = Mock()
+
+            service.fetch_all(params)
+
+            fields = mock_get.call_args.kwargs['params']['fields'].split(',')
+            assert sorted(fields) == sorted(TRIAL_FIELDS.values())
+
+    def test_fetch_all_omits_fields_when_projection_disabled(self):
+        """Test that projection can be turned off to fetch full documents."""
+        service = ClinicalTrialsService()
+
+        with patch('app.services.transport.requests.Session.get') as mock_get:
+            with patch('app.services.clinical_trials.API_FIELD_PROJECTION', False):
+                mock_get.return_value.json.return_value = {"totalCount": 0, "studies": []}
+
+                service.fetch_all(SearchParams(compound="test"))
+
+                assert 'fields' not in mock_get.call_args.kwargs['params']
+
+    def test_stats_report_bytes_received(self, sample_api_response):
+        """Test that response body sizes are counted per page and per search."""
+        body = json.dumps(sample_api_response).encode()
+        transport = Mock()
+        transport.get.return_value.content = body
+        transport.get.return_value.json.return_value = sample_api_response
+        service = ClinicalTrialsService(transport=transport)
+
+        service.fetch_all(SearchParams(compound="test"))
+
+        upstream = service.stats()['upstream']
+        assert upstream['pages'] == 1
+        assert upstream['searches'] == 1
+        assert upstream['bytes_received'] == len(body)
+        assert upstream['bytes_per_search'] == len(body)
+
+    def test_extract_maps_over_lists(self):
+        """Test that field paths through lists collect each item's value."""
+        from app.services.clinical_trials import extract_field
+
+        doc = {"a": {"items": [{"name": "x"}, {"name": "y"}, {}]}}
+
+        assert extract_field(doc, "a.items.name") == ["x", "y", None]
+        assert extract_field(doc, "a.missing.name") is None
+
+    def test_count_total_requested_on_first_page_only(
+        self, sample_api_response_page1, sample_api_response_page2
+    ):
+        """Test that follow-up pages do not ask the API to recount matches."""
+        service = ClinicalTrialsService()
+        params = SearchParams(condition="Cancer")
+        page2 = dict(sample_api_response_page2)
+        del page2['totalCount']
+
+        with patch('app.services.transport.requests.Session.get') as mock_get:
+            mock_get.return_value.raise_for_status = Mock()
+            mock_get.return_value.json.side_effect = [sample_api_response_page1, page2]
+
+            result = service.fetch_all(params)
+
+            first_call_params = mock_get.call_args_list[0].kwargs['params']
+            second_call_params = mock_get.call_args_list[1].kwargs['params']
+            assert first_call_params['countTotal'] == 'true'
+            assert 'countTotal' not in second_call_params
+            assert result.total_count == 150
+            assert result.truncated is False
+
+    def test_stats_report_per_page_timings(
+        self, sample_api_response_page1, sample_api_response_page2
+    ):
+        """Test that first and follow-up page latencies are recorded separately."""
+        transport = Mock()
+        transport.get.return_value.json.side_effect = [
+            sample_api_response_page1,
+            sample_api_response_page2
+        ]
+        service = ClinicalTrialsService(transport=transport)
+
+        service.fetch_all(SearchParams(condition="Cancer"))
+
+        timings = service.stats()['timings']
+        assert timings['first_page']['count'] == 1
+        assert timings['next_page']['count'] == 1
+        assert timings['next_page']['max_ms'] >= 0
+
+    def test_facets_count_cached_result(self, sample_api_response):
+        """Test that facets reuse the cached search instead of refetching."""
+        transport = Mock()
+        transport.get.return_value.json.return_value = sample_api_response
+        service = ClinicalTrialsService(transport=transport)
+        params = SearchParams(condition="Cancer")
+
+        result = service.fetch_all(params)
+        facets = service.facets(params)
+
+        assert transport.get.call_count == 1
+        assert facets['counted'] == len(result.trials)
+        assert sum(facets['statuses'].values()) <= len(result.trials)
+
+    def test_facets_without_fetch_only_count_cached_results(self, sample_api_response):
+        """Test that fetch=False never searches upstream."""
+        transport = Mock()
+        transport.get.return_value.json.return_value = sample_api_response
+        service = ClinicalTrialsService(transport=transport)
+        params = SearchParams(condition="Cancer")
+
+        assert service.facets(params, fetch=False) is None
+        assert transport.get.call_count == 0
+
+        service.fetch_all(params)
+
+        assert service.facets(params, fetch=False)['counted'] == 2
@@ -0,0 +1,84 @@
+from app.models.columns import TrialColumns
+from app.models.trial import Trial
+
+
+def make_trials():
+    return [
+        Trial(nct_id="NCT00000003", title="beta study", phase="PHASE2", status="COMPLETED",
+              sponsor="Acme", conditions=["Asthma"], interventions=["Drug C"]),
+        Trial(nct_id="NCT00000001", title="Alpha study", phase="PHASE3", status="RECRUITING",
+              sponsor="Zeta", conditions=["Lung Cancer"], interventions=["Drug A"]),
+        Trial(nct_id="NCT00000002", title="Gamma study", phase="PHASE2", status="RECRUITING",
+              sponsor="acme", conditions=["Lung Cancer", "NSCLC"], interventions=[]),
+    ]
+
+
+class TestTrialColumns:
+    """Tests for the columnar result representation."""
+
+    def test_dictionary_encodes_repeated_values(self):
+        """Test that phase and status store each distinct value once."""
+        columns = TrialColumns(make_trials())
+
+        assert columns.phase.values == ["PHASE2", "PHASE3"]
+        assert list(columns.phase.codes) == [0, 1, 0]
+        assert columns.status.values == ["COMPLETED", "RECRUITING"]
+
+    def test_list_columns_use_offsets(self):
+        """Test that conditions flatten into codes with per-row offsets."""
+        columns = TrialColumns(make_trials())
+
+        assert list(columns.conditions.offsets) == [0, 1, 2, 4]
+        assert columns.conditions[2] == ("Lung Cancer", "NSCLC")
+        assert columns.interventions[2] == ()
+
+    def test_cells_and_rows_match_trials(self):
+        """Test that rows read back the display text of every trial."""
+        columns = TrialColumns(make_trials())
+
+        assert columns.cell(2, 'conditions') == "Lung Cancer; NSCLC"
+        assert list(columns.rows())[0] == (
+            "NCT00000003", "beta study", "PHASE2", "COMPLETED", "Acme", "Asthma", "Drug C"
+        )
+        assert len(columns) == 3
+
+    def test_value_counts(self):
+        """Test counts per value of encoded and list columns."""
+        columns = TrialColumns(make_trials())
+
+        assert columns.value_counts('status') == {"COMPLETED": 1, "RECRUITING": 2}
+        assert columns.value_counts('conditions') == {
+            "Asthma": 1, "Lung Cancer": 2, "NSCLC": 1
+        }
+
+    def test_sort_by_encoded_column_is_case_insensitive(self):
+        """Test that equal case-folded sponsors tie and later keys break the tie."""
+        columns = TrialColumns(make_trials())
+
+        assert columns.sort(range(3), [('sponsor', False), ('nct_id', True)]) == [0, 2, 1]
+        assert columns.sort(range(3), [('title', True)]) == [2, 0, 1]
+
+    def test_search_requires_every_term(self):
+        """Test that each term may match a different column."""
+        columns = TrialColumns(make_trials())
+
+        assert columns.search('LUNG recruiting') == [1, 2]
+        assert columns.search('lung acme') == [2]
+        assert columns.search('cancer; nsclc') == [2]
+        assert columns.search('missing') == []
+        assert columns.search('  ') == [0, 1, 2]
+
+    def test_search_common_and_rare_terms_agree(self):
+        """Test the per-row and whole-column scans find the same rows."""
+        trials = make_trials() * 20
+        columns = TrialColumns(trials)
+
+        assert columns.search('study') == list(range(60))
+        assert columns.search('nct00000001') == list(range(1, 60, 3))
+
+    def test_isin_filters_encoded_column(self):
+        """Test filtering rows by a set of values."""
+        columns = TrialColumns(make_trials())
+
+        assert columns.isin('phase', ["PHASE2"]) == [0, 2]
+        assert columns.isin('status', ["WITHDRAWN"]) == []
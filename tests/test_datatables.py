@@ -0,0 +1,103 @@
+from werkzeug.datastructures import MultiDict
+
+from app.services.cache import estimate_size
+from app.services.datatables import COLUMNS, TableView, draw, parse_order
+from app.models.trial import SearchResult, Trial
+
+
+def make_view():
+    trials = [
+        Trial(nct_id="NCT00000003", title="beta study", phase="PHASE2", status="COMPLETED",
+              sponsor="Acme", conditions=["Asthma"], interventions=["Drug C"]),
+        Trial(nct_id="NCT00000001", title="Alpha study", phase="PHASE3", status="RECRUITING",
+              sponsor="Zeta", conditions=["Lung Cancer"], interventions=["Drug A"]),
+        Trial(nct_id="NCT00000002", title="Gamma study", phase="PHASE2", status="RECRUITING",
+              sponsor="Acme", conditions=["Lung Cancer", "NSCLC"], interventions=["Drug B"]),
+    ]
+    return TableView(SearchResult(trials=trials, total_count=3, truncated=False))
+
+
+class TestTableView:
+    """Tests for TableView."""
+
+    def test_columns_are_counted_by_the_view(self):
+        """Test that sort and search state lives on the view, not the cached result."""
+        view = make_view()
+        result_size = estimate_size(view.result)
+
+        view.rows([(0, False)], 'lung')
+
+        assert estimate_size(view.result) == result_size
+        assert view.estimate_size() == result_size + view.columns.estimate_size()
+        assert view.columns.estimate_size() > 0
+
+    def test_rows_sorted_by_column(self):
+        """Test ascending and descending single-column sorts."""
+        view = make_view()
+
+        assert view.rows([(0, False)]) == [1, 2, 0]
+        assert view.rows([(0, True)]) == [0, 2, 1]
+
+    def test_sort_is_case_insensitive(self):
+        """Test that sort keys are case-folded."""
+        view = make_view()
+
+        assert view.rows([(COLUMNS.index('title'), False)]) == [1, 0, 2]
+
+    def test_ties_broken_by_secondary_column(self):
+        """Test multi-column ordering."""
+        view = make_view()
+        order = [(COLUMNS.index('sponsor'), False), (COLUMNS.index('nct_id'), True)]
+
+        assert view.rows(order) == [0, 2, 1]
+
+    def test_search_matches_all_terms(self):
+        """Test that every search term must appear in the row."""
+        view = make_view()
+
+        assert view.rows([(0, False)], 'lung recruiting') == [1, 2]
+        assert view.rows([(0, False)], 'lung acme') == [2]
+
+    def test_page_slices_rows(self):
+        """Test that a page returns only the requested slice."""
+        view = make_view()
+
+        page = view.page(1, 1, [(0, False)])
+
+        assert page['records_filtered'] == 3
+        assert [row['nct_id'] for row in page['data']] == ["NCT00000002"]
+        assert page['data'][0]['conditions'] == "Lung Cancer; NSCLC"
+
+
+class TestDraw:
+    """Tests for the DataTables request/response protocol."""
+
+    def test_parse_order_ignores_invalid_columns(self):
+        """Test that out-of-range order columns are dropped."""
+        args = MultiDict({
+            'order[0][column]': '99',
+            'order[1][column]': '1', 'order[1][dir]': 'desc',
+        })
+
+        assert parse_order(args) == [(1, True)]
+
+    def test_draw_returns_protocol_fields(self):
+        """Test that draw echoes the counter and reports totals."""
+        args = MultiDict({
+            'draw': '4', 'start': '0', 'length': '2',
+            'order[0][column]': '0', 'order[0][dir]': 'asc',
+            'search[value]': 'recruiting',
+        })
+
+        response = draw(make_view(), args)
+
+        assert response['draw'] == 4
+        assert response['recordsTotal'] == 3
+        assert response['recordsFiltered'] == 2
+        assert [row['nct_id'] for row in response['data']] == ["NCT00000001", "NCT00000002"]
+
+    def test_draw_caps_page_length(self):
+        """Test that 'show all' (-1) is capped to the maximum page size."""
+        response = draw(make_view(), MultiDict({'length': '-1'}))
+
+        assert len(response['data']) == 3
@@ -0,0 +1,108 @@
+import csv
+import io
+from unittest.mock import Mock, patch
+
+from app.models.columns import TrialColumns
+from app.services.export import CSV_HEADER, iter_csv
+from app.services.clinical_trials import ClinicalTrialsService
+from app.models.trial import SearchParams, Trial
+
+
+def make_trial(i):
+    return Trial(
+        nct_id=f"NCT{i:08d}",
+        title=f"Trial {i}",
+        phase="PHASE2",
+        status="RECRUITING",
+        sponsor="Sponsor",
+        conditions=["Cancer", "Tumor"],
+        interventions=["Drug"]
+    )
+
+
+class TestIterCsv:
+    """Tests for streaming CSV generation."""
+
+    def test_header_is_first_chunk(self):
+        """Test that the header is emitted before any page is consumed."""
+        def pages():
+            raise AssertionError("pages consumed before header was sent")
+            yield []
+
+        chunks = iter_csv(pages())
+
+        assert next(chunks) == ','.join(CSV_HEADER) + '\r\n'
+
+    def test_flushes_each_page(self):
+        """Test that rows are emitted as each page arrives."""
+        consumed = []
+
+        def pages():
+            for p in range(3):
+                consumed.append(p)
+                yield [make_trial(p * 10 + i) for i in range(2)]
+
+        chunks = iter_csv(pages())
+        next(chunks)
+
+        first = next(chunks)
+        assert consumed == [0]
+        assert 'NCT00000000' in first and 'NCT00000001' in first
+
+    def test_chunks_are_bounded(self):
+        """Test that no chunk grows far beyond chunk_size."""
+        chunks = list(iter_csv([[make_trial(i) for i in range(500)]], chunk_size=1024))
+
+        assert len(chunks) > 2
+        assert max(len(c) for c in chunks) < 1024 + 200
+
+    def test_output_round_trips(self):
+        """Test that concatenated chunks form the full CSV document."""
+        chunks = iter_csv([[make_trial(1)], [make_trial(2)]], chunk_size=1)
+        rows = list(csv.reader(io.StringIO(''.join(chunks))))
+
+        assert rows[0] == CSV_HEADER
+        assert [r[0] for r in rows[1:]] == ['NCT00000001', 'NCT00000002']
+        assert rows[1][5] == 'Cancer; Tumor'
+
+    def test_columns_page_matches_trial_rows(self):
+        """Test that a TrialColumns page exports the same CSV as its trials."""
+        trials = [make_trial(i) for i in range(3)]
+
+        from_columns = ''.join(iter_csv([TrialColumns(trials)]))
+
+        assert from_columns == ''.join(iter_csv([trials]))
+
+
+class TestStreamPages:
+    """Tests for ClinicalTrialsService.stream_pages."""
+
+    def test_yields_each_api_page(self, sample_api_response_page1, sample_api_response_page2):
+        """Test that each API page is yielded as its own chunk of trials."""
+        transport = Mock()
+        transport.get.return_value.json.side_effect = [
+            sample_api_response_page1,
+            sample_api_response_page2
+        ]
+        service = ClinicalTrialsService(transport=transport)
+
+        with patch('app.services.clinical_trials.EXPORT_STREAM_PARSE', False):
+            pages = service.stream_pages(SearchParams(condition="Cancer"))
+
+            assert len(next(pages)) == 100
+            assert len(next(pages)) == 50
+            assert next(pages, None) is None
+        assert transport.get.call_count == 2
+
+    def test_serves_cached_result(self, sample_api_response):
+        """Test that a cached query is streamed without upstream calls."""
+        transport = Mock()
+        transport.get.return_value.json.return_value = sample_api_response
+        service = ClinicalTrialsService(transport=transport)
+        params = SearchParams(compound="test")
+        service.fetch_all(params)
+
+        pages = list(service.stream_pages(params))
+
+        assert transport.get.call_count == 1
+        assert [t.nct_id for t in pages[0]] == ["NCT00000001", "NCT00000002"]
@@ -0,0 +1,73 @@
+import pytest
+
+from app.mirror.backend import LocalTrialsBackend
+from app.mirror.bitmap_index import BitmapIndex
+from app.mirror.text_index import TextIndex
+from app.models.columns import TrialColumns
+from app.models.trial import Trial, SearchParams
+from app.services.facets import facet_counts
+
+
+def make_trial(phase, status, sponsor):
+    return Trial(nct_id="NCT00000001", title="Trial", phase=phase, status=status,
+                 sponsor=sponsor, conditions=[], interventions=[])
+
+
+@pytest.fixture
+def indexed_backend(mirror_store):
+    TextIndex(mirror_store).rebuild()
+    BitmapIndex(mirror_store).rebuild()
+    return LocalTrialsBackend(mirror_store)
+
+
+class TestFacetCounts:
+    """Tests for counting facets over an in-memory result."""
+
+    def test_counts_phases_statuses_and_sponsors(self):
+        """Test facet counts over trials."""
+        trials = [
+            make_trial("PHASE1, PHASE2", "RECRUITING", "Acme"),
+            make_trial("PHASE2", "RECRUITING", "Beta"),
+            make_trial("N/A", "UNKNOWN", "Acme"),
+        ]
+
+        facets = facet_counts(TrialColumns(trials), total_count=3, top_sponsors=1)
+
+        assert facets['phases'] == {
+            'EARLY_PHASE1': 0, 'PHASE1': 1, 'PHASE2': 2, 'PHASE3': 0, 'PHASE4': 0
+        }
+        assert facets['statuses']['RECRUITING'] == 2
+        assert 'UNKNOWN' not in facets['statuses']
+        assert facets['sponsors'] == [{'name': 'Acme', 'count': 2}]
+        assert facets['truncated'] is False
+
+
+class TestLocalFacets:
+    """Tests for facet counts from the local mirror."""
+
+    def test_counts_within_matches(self, indexed_backend):
+        """Test bitmap facet counts restricted to the text and status matches."""
+        facets = indexed_backend.facets(SearchParams(condition="cancer", statuses=["COMPLETED"]))
+
+        assert facets['total_count'] == 2
+        assert facets['phases']['PHASE1'] == 1
+        assert facets['phases']['PHASE3'] == 1
+        assert facets['phases']['PHASE2'] == 0
+        assert facets['statuses']['COMPLETED'] == 2
+        assert facets['statuses']['RECRUITING'] == 0
+        assert facets['sponsors'] == [{'name': 'Acme', 'count': 1}, {'name': 'Beta', 'count': 1}]
+
+    def test_sql_fallback_matches_bitmaps(self, mirror_store, indexed_backend):
+        """Test that unindexed facet counts agree with the bitmap path."""
+        params = SearchParams(condition="lung", phases=["PHASE1", "PHASE3"])
+
+        assert LocalTrialsBackend(mirror_store).facets(params) == indexed_backend.facets(params)
+
+    def test_counts_whole_mirror_without_text_criteria(self, indexed_backend):
+        """Test facets over every study."""
+        facets = indexed_backend.facets(SearchParams(statuses=["RECRUITING", "WITHDRAWN"]))
+
+        assert facets['total_count'] == 2
+        assert facets['counted'] == 2
+        assert facets['phases']['PHASE3'] == 1
+        assert facets['sponsors'][0] == {'name': 'Acme', 'count': 1}
@@ -0,0 +1,74 @@
+import json
+from unittest.mock import Mock, patch
+
+import pytest
+
+from app.models.trial import SearchParams
+from app.services.clinical_trials import ClinicalTrialsService
+from app.services.json_decoder import DECODERS, JsonDecoder
+
+
+class TestJsonDecoder:
+    """Tests for JsonDecoder selection and decoding."""
+
+    def test_auto_prefers_orjson(self):
+        """Test that auto uses orjson when it is installed."""
+        fast = Mock(return_value={"fast": True})
+
+        with patch.dict(DECODERS, {'orjson': fast}):
+            decoder = JsonDecoder('auto')
+
+            assert decoder.name == 'orjson'
+            assert decoder.loads(b'{}') == {"fast": True}
+
+    def test_auto_falls_back_to_stdlib(self):
+        """Test the stdlib fallback when orjson is missing."""
+        with patch.dict(DECODERS, clear=True, values={'json': json.loads}):
+            decoder = JsonDecoder('auto')
+
+        assert decoder.name == 'json'
+        assert decoder.loads(b'{"a": [1, "\\u00e9"]}') == {"a": [1, "é"]}
+
+    def test_unavailable_decoder_is_rejected(self):
+        """Test that forcing a missing library fails loudly."""
+        with patch.dict(DECODERS, clear=True, values={'json': json.loads}):
+            with pytest.raises(ValueError, match='orjson'):
+                JsonDecoder('orjson')
+
+    @pytest.mark.parametrize('name', sorted(DECODERS))
+    def test_decoders_agree(self, name, sample_api_response):
+        """Test that every available decoder yields the same documents."""
+        body = json.dumps(sample_api_response).encode()
+
+        assert JsonDecoder(name).loads(body) == sample_api_response
+
+    def test_decode_response_reads_raw_bytes(self):
+        """Test that bodies are decoded from bytes rather than response.json()."""
+        response = Mock()
+        response.content = b'{"totalCount": 3}'
+
+        assert JsonDecoder('json').decode_response(response) == {"totalCount": 3}
+        response.json.assert_not_called()
+
+    def test_decode_response_without_bytes_uses_json(self):
+        """Test the fallback for responses without a raw body."""
+        response = Mock()
+        response.json.return_value = {"totalCount": 1}
+
+        assert JsonDecoder('json').decode_response(response) == {"totalCount": 1}
+
+    def test_service_decodes_pages_with_its_decoder(self, sample_api_response):
+        """Test that the service decodes through its decoder and reports it."""
+        transport = Mock()
+        transport.get.return_value.content = json.dumps(sample_api_response).encode()
+        decoder = JsonDecoder('json')
+        service = ClinicalTrialsService(transport=transport, decoder=decoder)
+
+        with patch.object(decoder, '_loads', wraps=json.loads) as loads:
+            result = service.fetch_all(SearchParams(condition="Cancer"))
+
+        loads.assert_called_once()
+        assert len(result.trials) == len(sample_api_response["studies"])
+        stats = service.stats()
+        assert stats['upstream']['json_decoder'] == 'json'
+        assert stats['timings']['decode']['count'] == 1
@@ -0,0 +1,43 @@
+from app.services.metrics import Counters, Timings
+
+
+class TestCounters:
+    """Tests for Counters."""
+
+    def test_incr_and_snapshot(self):
+        """Test that counters accumulate and snapshot as a dict."""
+        counters = Counters()
+        counters.incr('pages')
+        counters.incr('bytes', 10)
+        counters.incr('bytes', 5)
+
+        assert counters.get('bytes') == 15
+        assert counters.get('missing') == 0
+        assert counters.snapshot() == {'pages': 1, 'bytes': 15, 'missing': 0}
+
+
+class TestTimings:
+    """Tests for Timings."""
+
+    def test_snapshot_summarizes_series(self):
+        """Test count, mean, percentiles and max per series."""
+        timings = Timings()
+        for ms in (10, 20, 30, 40):
+            timings.observe('page', ms / 1000)
+
+        page = timings.snapshot()['page']
+        assert page['count'] == 4
+        assert round(page['mean_ms']) == 25
+        assert round(page['p50_ms']) == 30
+        assert round(page['max_ms']) == 40
+
+    def test_recent_window_is_bounded(self):
+        """Test that percentiles only consider the recent window."""
+        timings = Timings(window=2)
+        for ms in (100, 1, 1):
+            timings.observe('page', ms / 1000)
+
+        page = timings.snapshot()['page']
+        assert page['count'] == 3
+        assert round(page['p95_ms']) == 1
+        assert round(page['max_ms']) == 100
@@ -0,0 +1,277 @@
+import json
+import zipfile
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from app.mirror.backend import LocalTrialsBackend
+from app.mirror.loader import MIRROR_FIELDS, crawl, iter_dump, load_studies, study_record
+from app.mirror.store import TrialStore, tokenize
+from app.mirror.sync import HIGH_WATER_MARK, SyncReport, sync
+from app.models.trial import SearchParams
+from app.services.retry import RetryPolicy
+from tests.conftest import make_study, nct_ids
+
+
+@pytest.fixture
+def corpus():
+    return [
+        make_study("NCT00000001", phases=["PHASE2", "PHASE3"], status="RECRUITING",
+                   conditions=["Non-Small Cell Lung Cancer"], interventions=["Pembrolizumab"]),
+        make_study("NCT00000002", phases=["PHASE1"], status="COMPLETED",
+                   conditions=["Lung Cancer"], interventions=["Nivolumab", "Placebo"]),
+        make_study("NCT00000003", phases=["PHASE3"], status="COMPLETED",
+                   conditions=["Breast Cancer"], interventions=["Pembrolizumab"]),
+        make_study("NCT00000004", status="WITHDRAWN",
+                   conditions=["Asthma"], interventions=["Drug X"]),
+    ]
+
+
+@pytest.fixture
+def store(tmp_path, corpus):
+    store = TrialStore(str(tmp_path / 'mirror.db'))
+    load_studies(store, corpus)
+    return store
+
+
+class TestTrialStore:
+    """Tests for TrialStore search semantics."""
+
+    def test_tokenize_case_folds_words(self):
+        """Test tokenization of free text."""
+        assert tokenize("Non-Small Cell LUNG cancer") == ['non', 'small', 'cell', 'lung', 'cancer']
+
+    def test_condition_requires_all_tokens(self, store):
+        """Test that every condition token must match a whole token."""
+        assert nct_ids(store.search(SearchParams(condition="lung cancer"), 10)) == [
+            "NCT00000001", "NCT00000002"
+        ]
+        assert nct_ids(store.search(SearchParams(condition="lun"), 10)) == []
+
+    def test_compound_matches_intervention_names(self, store):
+        """Test that compound matches intervention names case-insensitively."""
+        assert nct_ids(store.search(SearchParams(compound="PEMBROLIZUMAB"), 10)) == [
+            "NCT00000001", "NCT00000003"
+        ]
+
+    def test_phases_are_ored(self, store):
+        """Test that any selected phase matches."""
+        params = SearchParams(phases=["PHASE1", "PHASE2"])
+
+        assert nct_ids(store.search(params, 10)) == ["NCT00000001", "NCT00000002"]
+
+    def test_statuses_form_a_set(self, store):
+        """Test status set filtering combined with other criteria."""
+        params = SearchParams(compound="pembrolizumab", statuses=["COMPLETED", "WITHDRAWN"])
+
+        assert nct_ids(store.search(params, 10)) == ["NCT00000003"]
+        assert store.count_matches(params) == 1
+
+    def test_upsert_updates_existing_study(self, store):
+        """Test that reloading a study replaces its fields and phases."""
+        load_studies(store, [make_study("NCT00000002", phases=["PHASE4"], status="TERMINATED")])
+
+        assert store.count() == 4
+        assert nct_ids(store.search(SearchParams(phases=["PHASE1"]), 10)) == []
+        trial = store.search(SearchParams(phases=["PHASE4"]), 10)[0]
+        assert trial.status == "TERMINATED"
+
+    def test_search_pages_with_offset(self, store):
+        """Test limit/offset paging in NCT ID order."""
+        assert nct_ids(store.search(SearchParams(), 2, offset=1)) == ["NCT00000002", "NCT00000003"]
+
+
+class TestLoader:
+    """Tests for loading the mirror."""
+
+    def test_study_record_includes_last_update(self, corpus):
+        """Test that records carry the last update date for syncing."""
+        trial, last_update = study_record(corpus[0])
+
+        assert trial.nct_id == "NCT00000001"
+        assert trial.phase == "PHASE2, PHASE3"
+        assert last_update == "2024-01-01"
+
+    def test_iter_dump_reads_zip_of_study_files(self, tmp_path, corpus):
+        """Test the bulk download format (one JSON file per study)."""
+        path = tmp_path / 'ctg-studies.json.zip'
+        with zipfile.ZipFile(path, 'w') as archive:
+            for study in corpus:
+                nct_id = study['protocolSection']['identificationModule']['nctId']
+                archive.writestr(f'{nct_id}.json', json.dumps(study))
+
+        assert len(list(iter_dump(str(path)))) == 4
+
+    def test_iter_dump_reads_directory_and_json_lines(self, tmp_path, corpus):
+        """Test directory and JSON-lines inputs."""
+        (tmp_path / 'dump').mkdir()
+        (tmp_path / 'dump' / 'a.json').write_text(json.dumps(corpus[0]))
+        (tmp_path / 'dump' / 'b.json').write_text(json.dumps({"studies": corpus[1:3]}))
+        lines = tmp_path / 'studies.jsonl'
+        lines.write_text('\n'.join(json.dumps(s) for s in corpus) + '\n')
+
+        assert len(list(iter_dump(str(tmp_path / 'dump')))) == 3
+        assert len(list(iter_dump(str(lines)))) == 4
+
+    def test_load_studies_batches_and_skips_empty_ids(self, tmp_path, corpus):
+        """Test batched upserts and skipping of studies without an NCT ID."""
+        store = TrialStore(str(tmp_path / 'mirror.db'))
+        with patch.object(store, 'upsert', wraps=store.upsert) as upsert:
+            loaded = load_studies(store, corpus + [{}], batch_size=3)
+
+        assert loaded == 4
+        assert upsert.call_count == 2
+
+    def test_crawl_paginates_with_mirror_fields(self, corpus):
+        """Test that crawling follows page tokens and requests mirror fields."""
+        service = MagicMock(retry=RetryPolicy())
+        service.transport.get.return_value.json.side_effect = [
+            {"studies": corpus[:2], "nextPageToken": "t2"},
+            {"studies": corpus[2:]},
+        ]
+
+        studies = list(crawl(service))
+
+        assert len(studies) == 4
+        calls = service.transport.get.call_args_list
+        assert calls[0].kwargs['params']['fields'] == MIRROR_FIELDS
+        assert calls[1].kwargs['params']['pageToken'] == "t2"
+
+    def test_crawl_retries_transient_failures(self, corpus):
+        """Test that a 503 mid-crawl is retried instead of ending the crawl."""
+        service = MagicMock(retry=RetryPolicy(base_delay=0))
+        unavailable = MagicMock(status_code=503, headers={})
+        unavailable.raise_for_status.side_effect = requests.HTTPError(
+            '503', response=unavailable
+        )
+        page = MagicMock()
+        page.json.return_value = {"studies": corpus}
+        service.transport.get.side_effect = [unavailable, page]
+
+        assert len(list(crawl(service))) == 4
+        assert service.retry.stats()['recovered'] == 1
+
+
+class TestLocalTrialsBackend:
+    """Tests for LocalTrialsBackend."""
+
+    def test_fetch_all_matches_service_semantics(self, store):
+        """Test SearchResult counts and truncation against MAX_RESULTS."""
+        backend = LocalTrialsBackend(store)
+
+        with patch('app.mirror.backend.MAX_RESULTS', 1):
+            result = backend.fetch_all(SearchParams(condition="cancer"))
+
+        assert nct_ids(result.trials) == ["NCT00000001"]
+        assert result.total_count == 3
+        assert result.truncated is True
+
+    def test_iter_pages_respects_max_results(self, store):
+        """Test paging through local results in API-sized pages."""
+        backend = LocalTrialsBackend(store)
+
+        with patch('app.mirror.backend.API_PAGE_SIZE', 2):
+            pages = list(backend.iter_pages(SearchParams(), max_results=3))
+
+        assert [len(trials) for trials, _ in pages] == [2, 1]
+        assert all(total == 4 for _, total in pages)
+
+    def test_stats_report_store_size(self, store):
+        """Test backend statistics."""
+        backend = LocalTrialsBackend(store)
+        backend.fetch_all(SearchParams(compound="placebo"))
+
+        stats = backend.stats()
+        assert stats['studies'] == 4
+        assert stats['timings']['search']['count'] == 1
+
+
+class TestMirrorCli:
+    """Tests for the flask mirror commands."""
+
+    def test_load_command(self, app, tmp_path, corpus):
+        """Test loading a dump from the command line."""
+        dump = tmp_path / 'studies.json'
+        dump.write_text(json.dumps(corpus))
+        db = tmp_path / 'mirror.db'
+
+        result = app.test_cli_runner().invoke(args=['mirror', 'load', str(dump), '--db', str(db)])
+
+        assert result.exit_code == 0
+        assert 'Loaded 4 studies' in result.output
+        assert 'Indexed' in result.output
+        assert TrialStore(str(db)).count() == 4
+
+
+class TestSync:
+    """Tests for incremental mirror sync."""
+
+    def make_service(self, pages):
+        service = MagicMock(retry=RetryPolicy())
+        service.transport.get.return_value.json.side_effect = pages
+        return service
+
+    def test_sync_pulls_updates_since_high_water_mark(self, store):
+        """Test that only studies updated since the mark are requested."""
+        store.set_state(HIGH_WATER_MARK, "2024-03-01")
+        service = self.make_service([
+            {"studies": [make_study("NCT00000005", last_update="2024-03-02")]}
+        ])
+
+        report = sync(store, service, today=date(2024, 3, 12))
+
+        request_params = service.transport.get.call_args.kwargs['params']
+        assert request_params['filter.advanced'] == 'AREA[LastUpdatePostDate]RANGE[2024-03-01,MAX]'
+        assert request_params['sort'] == 'LastUpdatePostDate:asc'
+        assert report.studies == 1
+        assert report.high_water_mark == "2024-03-02"
+        assert report.lag_days == 10
+        assert store.count() == 5
+
+    def test_first_sync_starts_from_latest_stored_update(self, store):
+        """Test that a mirror loaded from a dump syncs from its newest study."""
+        service = self.make_service([{"studies": []}])
+
+        report = sync(store, service)
+
+        assert report.since == "2024-01-01"
+        assert report.studies == 0
+
+    def test_sync_upserts_changed_studies(self, store):
+        """Test that updated studies replace their stored versions."""
+        service = self.make_service([
+            {"studies": [make_study("NCT00000002", status="TERMINATED", last_update="2024-02-01")]}
+        ])
+
+        sync(store, service)
+
+        assert store.count() == 4
+        assert store.search(SearchParams(statuses=["TERMINATED"]), 10)[0].nct_id == "NCT00000002"
+
+    def test_interrupted_sync_resumes_from_checkpoint(self, store):
+        """Test that completed pages advance the mark before a failure."""
+        service = MagicMock(retry=RetryPolicy())
+        service.transport.get.return_value.json.side_effect = [
+            {"studies": [make_study("NCT00000005", last_update="2024-02-01")],
+             "nextPageToken": "t2"},
+            ConnectionError("network down"),
+        ]
+
+        with pytest.raises(ConnectionError):
+            sync(store, service)
+
+        assert store.get_state(HIGH_WATER_MARK) == "2024-02-01"
+        assert store.count() == 5
+
+        resumed = self.make_service([{"studies": []}])
+        report = sync(store, resumed)
+        assert report.since == "2024-02-01"
+
+    def test_report_throughput(self):
+        """Test studies/sec in the sync report."""
+        report = SyncReport(studies=500, pages=1, seconds=2.0, since=None,
+                            high_water_mark=None, lag_days=None)
+
+        assert report.studies_per_second == 250
@@ -0,0 +1,61 @@
+import dataclasses
+
+import pytest
+
+from app.models.trial import Trial
+
+
+def make_trial(**overrides):
+    fields = dict(
+        nct_id="NCT00000001",
+        title="Study of Drug A",
+        phase="PHASE2",
+        status="RECRUITING",
+        sponsor="Sponsor Inc",
+        conditions=["Lung Cancer", "NSCLC"],
+        interventions=["Drug A"],
+    )
+    fields.update(overrides)
+    return Trial(**fields)
+
+
+class TestTrial:
+    """Tests for the compact Trial representation."""
+
+    def test_has_no_instance_dict(self):
+        """Test that trials are slotted and reject unknown attributes."""
+        trial = make_trial()
+
+        assert not hasattr(trial, '__dict__')
+        with pytest.raises(AttributeError):
+            trial.extra = 1
+
+    def test_lists_become_tuples(self):
+        """Test that conditions and interventions are stored as tuples."""
+        trial = make_trial()
+
+        assert trial.conditions == ("Lung Cancer", "NSCLC")
+        assert trial.interventions == ("Drug A",)
+
+    def test_repeated_strings_are_shared(self):
+        """Test that equal vocabulary strings from separate trials are one object."""
+        # Built at runtime so they are distinct objects before interning
+        sponsor = "".join(["Sponsor", " Inc"])
+        first = make_trial()
+        second = make_trial(
+            phase="".join(["PHASE", "2"]), status="".join(["RECRUIT", "ING"]),
+            sponsor=sponsor, conditions=["".join(["Lung", " Cancer"])],
+        )
+
+        assert second.phase is first.phase
+        assert second.status is first.status
+        assert second.sponsor is first.sponsor
+        assert second.conditions[0] is first.conditions[0]
+
+    def test_dataclass_behaviour_is_kept(self):
+        """Test that equality, replace and asdict still work."""
+        trial = make_trial()
+
+        assert trial == make_trial()
+        assert dataclasses.replace(trial, status="COMPLETED").status == "COMPLETED"
+        assert dataclasses.asdict(trial)["conditions"] == ("Lung Cancer", "NSCLC")
@@ -0,0 +1,146 @@
+import json
+import os
+import sqlite3
+import threading
+from unittest.mock import Mock, patch
+
+from app.services.page_cache import CachedResponse, PageCache, page_key
+from app.services.clinical_trials import ClinicalTrialsService
+from app.models.trial import SearchParams
+
+
+class TestPageCache:
+    """Tests for PageCache."""
+
+    def test_round_trips_compressed_pages(self, tmp_path):
+        """Test that bodies are stored compressed and returned intact."""
+        cache = PageCache(str(tmp_path / 'pages.db'))
+        body = b'{"studies": []}' * 1000
+        cache.put('k', body)
+
+        assert cache.get('k') == body
+        assert cache.stats()['bytes'] < len(body)
+        assert cache.stats()['hits'] == 1
+
+    def test_uses_wal_mode(self, tmp_path):
+        """Test that the database is switched to write-ahead logging."""
+        path = str(tmp_path / 'pages.db')
+        PageCache(path)
+
+        mode = sqlite3.connect(path).execute('PRAGMA journal_mode').fetchone()[0]
+        assert mode == 'wal'
+
+    def test_entries_expire_after_ttl(self, tmp_path, clock):
+        """Test that expired pages are treated as misses."""
+        cache = PageCache(str(tmp_path / 'pages.db'), ttl=60, clock=clock)
+        cache.put('k', b'body')
+
+        clock.now += 61
+        assert cache.get('k') is None
+        assert cache.stats()['entries'] == 0
+
+    def test_evicts_least_recently_read_over_budget(self, tmp_path, clock):
+        """Test size-bounded eviction by last access time."""
+        cache = PageCache(str(tmp_path / 'pages.db'), max_bytes=100, clock=clock)
+        cache.put('a', os.urandom(30))
+        clock.now += 1
+        cache.put('b', os.urandom(30))
+        clock.now += 1
+        cache.get('a')
+        clock.now += 1
+        cache.put('c', os.urandom(30))
+
+        assert cache.stats()['bytes'] <= 100
+        assert cache.get('b') is None
+        assert cache.get('a') is not None
+        assert cache.get('c') is not None
+
+    def test_shared_between_instances(self, tmp_path):
+        """Test that a second instance (another worker) sees stored pages."""
+        path = str(tmp_path / 'pages.db')
+        PageCache(path).put('k', b'body')
+
+        assert PageCache(path).get('k') == b'body'
+
+    def test_usable_from_multiple_threads(self, tmp_path):
+        """Test that each thread gets a working connection."""
+        cache = PageCache(str(tmp_path / 'pages.db'))
+        errors = []
+
+        def worker(i):
+            try:
+                cache.put(str(i), b'x' * i)
+                assert cache.get(str(i)) == b'x' * i
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(1, 5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert errors == []
+
+    def test_page_key_distinguishes_tokens(self):
+        """Test that page keys differ per page token."""
+        assert page_key(['q'], None) != page_key(['q'], 'token')
+        assert page_key(['q'], 'token') == page_key(['q'], 'token')
+
+    def test_cached_response_decodes_json(self):
+        """Test the response stand-in used for cache hits."""
+        response = CachedResponse(b'{"totalCount": 3}')
+
+        response.raise_for_status()
+        assert response.json() == {"totalCount": 3}
+
+
+class TestServicePageCache:
+    """Tests for the page cache in ClinicalTrialsService."""
+
+    def test_cold_service_served_from_page_cache(self, tmp_path, sample_api_response):
+        """Test that a new service (e.g. after restart) reuses cached pages."""
+        path = str(tmp_path / 'pages.db')
+        transport = Mock()
+        transport.get.return_value.content = json.dumps(sample_api_response).encode()
+        transport.get.return_value.json.return_value = sample_api_response
+
+        ClinicalTrialsService(transport=transport, page_cache=PageCache(path)).fetch_all(
+            SearchParams(compound="Pembrolizumab")
+        )
+        restarted = ClinicalTrialsService(transport=transport, page_cache=PageCache(path))
+        result = restarted.fetch_all(SearchParams(compound="pembrolizumab"))
+
+        assert transport.get.call_count == 1
+        assert [t.nct_id for t in result.trials] == ["NCT00000001", "NCT00000002"]
+        assert restarted.stats()['page_cache']['hits'] == 1
+
+    def test_field_changes_miss_cached_pages(self, tmp_path, sample_api_response):
+        """Test that pages cached before a TRIAL_FIELDS change are not served."""
+        path = str(tmp_path / 'pages.db')
+        transport = Mock()
+        transport.get.return_value.content = json.dumps(sample_api_response).encode()
+
+        ClinicalTrialsService(transport=transport, page_cache=PageCache(path)).fetch_all(
+            SearchParams(compound="Pembrolizumab")
+        )
+        with patch('app.services.clinical_trials.API_FIELDS', 'protocolSection'):
+            ClinicalTrialsService(transport=transport, page_cache=PageCache(path)).fetch_all(
+                SearchParams(compound="Pembrolizumab")
+            )
+
+        assert transport.get.call_count == 2
+
+    def test_sqlite_errors_fall_through_to_upstream(self, tmp_path, sample_api_response):
+        """Test that a locked or broken page cache does not fail the search."""
+        transport = Mock()
+        transport.get.return_value.content = json.dumps(sample_api_response).encode()
+        page_cache = Mock()
+        page_cache.get.side_effect = sqlite3.OperationalError('database is locked')
+        page_cache.put.side_effect = sqlite3.OperationalError('database is locked')
+        service = ClinicalTrialsService(transport=transport, page_cache=page_cache)
+
+        result = service.fetch_all(SearchParams(compound="Pembrolizumab"))
+
+        assert len(result.trials) == 2
+        assert service.stats()['upstream']['page_cache_errors'] == 2
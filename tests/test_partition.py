@@ -0,0 +1,235 @@
+import json
+import re
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from app.config import PARTITION_WORKERS
+from app.models.trial import SearchParams
+from app.services.cache import ResultCache
+from app.services.clinical_trials import ClinicalTrialsService
+from app.services.partition import API_STATUSES, plan_partitions
+
+PAGE_SIZE = 10
+
+
+def make_study(i, status, phases):
+    return {
+        "protocolSection": {
+            "identificationModule": {"nctId": f"NCT{i:08d}", "briefTitle": f"Trial {i}"},
+            "designModule": {"phases": phases},
+            "statusModule": {"overallStatus": status},
+        }
+    }
+
+
+class FakeUpstream:
+    """Filters a fixed study list like the API and pages it by offset tokens."""
+
+    def __init__(self, studies, latency=0.0):
+        self.studies = studies
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests = []
+
+    def matches(self, study, params):
+        section = study["protocolSection"]
+        statuses = params.get('filter.overallStatus')
+        if statuses and section["statusModule"]["overallStatus"] not in statuses.split(','):
+            return False
+        term = params.get('query.term')
+        if term:
+            wanted = re.findall(r'[A-Z_0-9]+', term.replace('AREA[Phase]', ''))
+            if not set(wanted) & set(section["designModule"]["phases"]):
+                return False
+        return True
+
+    def get(self, url, params=None):
+        with self.lock:
+            self.requests.append(dict(params))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.latency)
+            matched = [s for s in self.studies if self.matches(s, params)]
+            offset = int(params.get('pageToken', 0))
+            page = {"totalCount": len(matched), "studies": matched[offset:offset + PAGE_SIZE]}
+            if offset + PAGE_SIZE < len(matched):
+                page["nextPageToken"] = str(offset + PAGE_SIZE)
+            response = Mock()
+            response.content = json.dumps(page).encode()
+            return response
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+    def stats(self):
+        return {}
+
+
+def make_service(upstream):
+    return ClinicalTrialsService(transport=upstream, cache=ResultCache(max_bytes=0))
+
+
+def fetch_partitioned(service, params):
+    """All trials of a search pulled as the bulk export does, and its total."""
+    trials, total_count = [], 0
+    for page, total_count in service.iter_pages(params, partition=True):
+        trials.extend(page)
+    return trials, total_count
+
+
+@pytest.fixture(autouse=True)
+def small_pages():
+    with patch('app.services.clinical_trials.API_PAGE_SIZE', PAGE_SIZE):
+        yield
+
+
+class TestPlanPartitions:
+    """Tests for splitting a search into sub-queries."""
+
+    def test_splits_selected_statuses(self):
+        """Test one disjoint sub-query per selected status."""
+        params = SearchParams(condition="Cancer", phases=["PHASE2"],
+                              statuses=["RECRUITING", "COMPLETED"])
+
+        plan = plan_partitions(params)
+
+        assert [p.statuses for p in plan] == [["RECRUITING"], ["COMPLETED"]]
+        assert all(p.phases == ["PHASE2"] and p.condition == "Cancer" for p in plan)
+
+    def test_splits_selected_phases(self):
+        """Test one sub-query per phase when a single status is selected."""
+        params = SearchParams(phases=["PHASE1", "PHASE2"], statuses=["RECRUITING"])
+
+        assert [p.phases for p in plan_partitions(params)] == [["PHASE1"], ["PHASE2"]]
+
+    def test_unfiltered_status_splits_by_every_api_status(self):
+        """Test that a search without a status filter covers all API statuses."""
+        plan = plan_partitions(SearchParams(condition="Cancer"))
+
+        assert [p.statuses for p in plan] == [[status] for status in API_STATUSES]
+
+    def test_single_status_and_phase_is_not_split(self):
+        """Test that a search with nothing to split returns no plan."""
+        assert plan_partitions(SearchParams(phases=["PHASE2"], statuses=["RECRUITING"])) == []
+
+
+class TestPartitionedFetch:
+    """Tests for concurrent fetching of partitioned searches."""
+
+    def test_fetches_partitions_concurrently(self):
+        """Test that sub-queries overlap and the merged result is complete."""
+        studies = [
+            make_study(i, ["RECRUITING", "COMPLETED", "TERMINATED"][i % 3], ["PHASE2"])
+            for i in range(150)
+        ]
+        upstream = FakeUpstream(studies, latency=0.02)
+        service = make_service(upstream)
+
+        trials, total_count = fetch_partitioned(service, SearchParams(condition="Cancer"))
+
+        assert sorted(t.nct_id for t in trials) == [s["protocolSection"][
+            "identificationModule"]["nctId"] for s in studies]
+        assert total_count == 150
+        assert upstream.max_in_flight > 1
+        assert service.counters.get('partitioned_searches') == 1
+
+    def test_overlapping_phase_partitions_are_deduped(self):
+        """Test that a study listed under two phases appears once."""
+        studies = [make_study(i, "RECRUITING", ["PHASE2", "PHASE3"]) for i in range(130)]
+        service = make_service(FakeUpstream(studies))
+
+        trials, _ = fetch_partitioned(service, SearchParams(
+            phases=["PHASE2", "PHASE3"], statuses=["RECRUITING"]
+        ))
+
+        assert len(trials) == 130
+        assert len({t.nct_id for t in trials}) == 130
+        assert service.counters.get('partitioned_searches') == 1
+
+    def test_gap_is_filled_from_full_query(self):
+        """Test that studies missed by the plan are fetched from the full query."""
+        studies = [make_study(i, "RECRUITING", ["PHASE1"]) for i in range(130)]
+        studies += [make_study(1000 + i, "SOME_NEW_STATUS", ["PHASE1"]) for i in range(5)]
+        service = make_service(FakeUpstream(studies))
+
+        trials, _ = fetch_partitioned(service, SearchParams(condition="Cancer"))
+
+        assert len(trials) == 135
+        assert len({t.nct_id for t in trials}) == 135
+
+    def test_small_or_capped_searches_are_not_partitioned(self):
+        """Test that searches not filling every worker, or over max_results, page sequentially."""
+        studies = [make_study(i, "RECRUITING", ["PHASE1"]) for i in range(120)]
+        upstream = FakeUpstream(studies)
+        service = make_service(upstream)
+
+        pages = list(service.iter_pages(
+            SearchParams(condition="Cancer"), max_results=20, partition=True
+        ))
+        small = list(service.iter_pages(
+            SearchParams(condition="Cancer", statuses=["RECRUITING", "COMPLETED"]),
+            max_results=500, partition=True
+        ))
+
+        assert sum(len(trials) for trials, _ in pages) == 20
+        assert sum(len(trials) for trials, _ in small) == 120
+        assert all('filter.overallStatus' not in r or ',' in r['filter.overallStatus']
+                   for r in upstream.requests)
+        assert service.counters.get('partitioned_searches') == 0
+
+    def test_partition_error_is_raised(self):
+        """Test that a failing sub-query fails the whole fetch."""
+        studies = [make_study(i, "RECRUITING", ["PHASE1"]) for i in range(130)]
+        upstream = FakeUpstream(studies)
+        get = upstream.get
+
+        def failing_get(url, params=None):
+            if params.get('filter.overallStatus') == "COMPLETED":
+                raise ConnectionError("upstream down")
+            return get(url, params)
+
+        upstream.get = failing_get
+        service = make_service(upstream)
+
+        with pytest.raises(ConnectionError):
+            fetch_partitioned(service, SearchParams(condition="Cancer"))
+
+    def test_slow_consumer_holds_workers_back(self):
+        """Test that unread pages are bounded and closing stops the workers."""
+        studies = [
+            make_study(i, ["RECRUITING", "COMPLETED", "TERMINATED"][i % 3], ["PHASE2"])
+            for i in range(600)
+        ]
+        upstream = FakeUpstream(studies)
+        service = make_service(upstream)
+
+        pages = service.iter_pages(
+            SearchParams(condition="Cancer"), max_results=1000, partition=True
+        )
+        next(pages)
+        next(pages)
+        time.sleep(0.3)
+        requested = len(upstream.requests)
+        pages.close()
+        time.sleep(0.3)
+
+        assert requested < 30
+        assert len(upstream.requests) - requested <= PARTITION_WORKERS
+
+    def test_interactive_search_is_not_partitioned(self):
+        """Test that fetch_all walks one token chain instead of fanning out."""
+        studies = [make_study(i, "RECRUITING", ["PHASE1"]) for i in range(150)]
+        upstream = FakeUpstream(studies)
+        service = make_service(upstream)
+
+        result = service.fetch_all(SearchParams(condition="Cancer"))
+
+        assert len(result.trials) == 150
+        assert len(upstream.requests) == 15
+        assert service.counters.get('partitioned_searches') == 0
@@ -0,0 +1,178 @@
+import asyncio
+import json
+from email.utils import formatdate
+from unittest.mock import Mock
+
+import pytest
+import requests
+
+from app.models.trial import SearchParams
+from app.services.clinical_trials import ClinicalTrialsService
+from app.services.retry import RetryBudget, RetryPolicy, retry_after
+
+
+def http_error(status, headers=None):
+    response = Mock()
+    response.status_code = status
+    response.headers = headers or {}
+    return requests.HTTPError(f'{status} Error', response=response)
+
+
+class TestRetryPolicy:
+    """Tests for RetryPolicy backoff decisions."""
+
+    def test_backoff_doubles_up_to_cap(self):
+        """Test the exponential ceiling with the largest jitter draw."""
+        policy = RetryPolicy(attempts=10, base_delay=0.5, max_delay=3, jitter=lambda: 1.0)
+        error = http_error(503)
+
+        delays = [policy.next_delay(n, error) for n in range(4)]
+
+        assert delays == [0.5, 1.0, 2.0, 3]
+
+    def test_jitter_scales_backoff(self):
+        """Test that the wait is a random fraction of the backoff ceiling."""
+        policy = RetryPolicy(base_delay=1, max_delay=10, jitter=lambda: 0.25)
+
+        assert policy.next_delay(2, requests.ConnectionError()) == 1.0
+
+    def test_retry_after_seconds_and_date(self):
+        """Test both Retry-After forms."""
+        assert retry_after(http_error(429, {'Retry-After': '7'})) == 7.0
+        dated = retry_after(http_error(503, {'Retry-After': formatdate(usegmt=True)}))
+        assert 0 <= dated <= 1
+        assert retry_after(http_error(503, {'Retry-After': 'soon'})) is None
+        assert retry_after(ValueError()) is None
+
+    def test_retry_after_replaces_backoff(self):
+        """Test that the server's requested wait is used instead of jitter."""
+        policy = RetryPolicy(jitter=lambda: 0.0)
+
+        assert policy.next_delay(0, http_error(429, {'Retry-After': '4'})) == 4.0
+
+    @pytest.mark.parametrize('error', [http_error(404), http_error(400), ValueError('bad json'),
+                                       requests.HTTPError('no response')])
+    def test_permanent_errors_are_not_retried(self, error):
+        """Test that client errors and bugs fail immediately."""
+        assert RetryPolicy().next_delay(0, error) is None
+
+    def test_gives_up_after_attempts(self):
+        """Test the per-page retry limit."""
+        policy = RetryPolicy(attempts=2, jitter=lambda: 0.0)
+
+        assert policy.next_delay(1, http_error(502)) == 0.0
+        assert policy.next_delay(2, http_error(502)) is None
+        assert policy.stats()['exhausted'] == 1
+
+    def test_gives_up_when_wait_overruns_budget(self, clock):
+        """Test that a retry is skipped when its wait would pass the deadline."""
+        budget = RetryBudget(5, clock=clock)
+        policy = RetryPolicy(attempts=5)
+
+        clock.now = 2
+        assert policy.next_delay(0, http_error(429, {'Retry-After': '2'}), budget) == 2.0
+        assert policy.next_delay(0, http_error(429, {'Retry-After': '3'}), budget) is None
+
+    def test_call_retries_until_success(self):
+        """Test that call sleeps between attempts and counts the recovery."""
+        policy = RetryPolicy(attempts=3, base_delay=1, jitter=lambda: 1.0)
+        outcomes = iter([requests.Timeout(), http_error(503), 'page'])
+        slept = []
+
+        def fetch():
+            outcome = next(outcomes)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        assert policy.call(fetch, sleep=slept.append) == 'page'
+        assert slept == [1, 2]
+        assert policy.stats() == {'retries': 2, 'recovered': 1, 'exhausted': 0}
+
+    def test_call_async_retries(self):
+        """Test the coroutine variant."""
+        policy = RetryPolicy(attempts=1, base_delay=0)
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            if len(calls) == 1:
+                raise http_error(502)
+            return 'page'
+
+        assert asyncio.run(policy.call_async(fetch)) == 'page'
+        assert len(calls) == 2
+
+
+class TestServiceRetries:
+    """Tests for retries of page requests in ClinicalTrialsService."""
+
+    def test_transient_failure_retries_only_that_page(
+        self, sample_api_response_page1, sample_api_response_page2
+    ):
+        """Test that a 502 on page 2 costs one page retry, not the search."""
+        requested = []
+        failures = {'token123': [http_error(502)]}
+
+        def get(url, params=None):
+            token = params.get('pageToken')
+            requested.append(token)
+            if failures.get(token):
+                raise failures[token].pop()
+            response = Mock()
+            page = sample_api_response_page2 if token else sample_api_response_page1
+            response.content = json.dumps(page).encode()
+            return response
+
+        transport = Mock()
+        transport.get.side_effect = get
+        service = ClinicalTrialsService(transport=transport, retry=RetryPolicy(base_delay=0))
+
+        result = service.fetch_all(SearchParams(condition="Cancer"))
+
+        assert len(result.trials) == 150
+        assert requested.count(None) == 1
+        assert requested.count('token123') == 2
+        assert service.stats()['retry'] == {'retries': 1, 'recovered': 1, 'exhausted': 0}
+
+    def test_persistent_failure_fails_search(self):
+        """Test that the error surfaces once retries are used up."""
+        transport = Mock()
+        transport.get.side_effect = requests.ConnectionError('down')
+        service = ClinicalTrialsService(
+            transport=transport, retry=RetryPolicy(attempts=2, base_delay=0)
+        )
+
+        with pytest.raises(requests.ConnectionError):
+            service.fetch_all(SearchParams(condition="Cancer"))
+
+        assert transport.get.call_count == 3
+
+    def test_deadline_applies_to_searches_not_exports(
+        self, sample_api_response_page1, sample_api_response_page2
+    ):
+        """Test that a passed deadline stops fetch_all retrying but not iter_pages."""
+        failures = []
+
+        def get(url, params=None):
+            token = params.get('pageToken')
+            if token and failures:
+                raise failures.pop()
+            response = Mock()
+            page = sample_api_response_page2 if token else sample_api_response_page1
+            response.content = json.dumps(page).encode()
+            return response
+
+        transport = Mock()
+        transport.get.side_effect = get
+        service = ClinicalTrialsService(
+            transport=transport, retry=RetryPolicy(base_delay=0, deadline=0)
+        )
+
+        failures.append(http_error(502))
+        with pytest.raises(requests.HTTPError):
+            service.fetch_all(SearchParams(condition="Cancer"))
+
+        failures.append(http_error(502))
+        pages = list(service.iter_pages(SearchParams(condition="Cancer"), prefetch=False))
+        assert sum(len(trials) for trials, _ in pages) == 150
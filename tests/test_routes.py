@@ -132,6 +132,23 @@ class TestSearchRoutes:
             assert response.status_code == 200
             assert b'Error fetching results' in response.data
 
+    def test_search_flags_stale_results(self, client):
+        """Test that results served during an outage carry a notice."""
+        trial = Trial(nct_id="NCT00000001", title="Trial", phase="PHASE2",
+                      status="RECRUITING", sponsor="Sponsor", conditions=[], interventions=[])
+
+        with patch('app.routes.search.service.fetch_all') as mock_fetch:
+            mock_fetch.return_value = SearchResult(
+                trials=[trial], total_count=1, truncated=False, stale=True
+            )
+            stale = client.get('/search?condition=cancer')
+            mock_fetch.return_value = SearchResult(trials=[trial], total_count=1, truncated=False)
+            fresh = client.get('/search?condition=cancer')
+
+        assert b'NCT00000001' in stale.data
+        assert b'currently unavailable' in stale.data
+        assert b'currently unavailable' not in fresh.data
+
     def test_search_links_nct_ids(self, client):
         """Test that NCT IDs are linked to ClinicalTrials.gov."""
         mock_result = SearchResult(
@@ -217,8 +234,8 @@ class TestSearchRoutes:
             truncated=False
         )
 
-        with patch('app.routes.search.service.fetch_all') as mock_fetch:
-            mock_fetch.return_value = mock_result
+        with patch('app.routes.search.service.stream_pages') as mock_stream:
+            mock_stream.return_value = [mock_result.trials]
 
             response = client.get('/export?compound=test')
 
@@ -231,8 +248,8 @@ class TestSearchRoutes:
         """Test that CSV contains proper headers."""
         mock_result = SearchResult(trials=[], total_count=0, truncated=False)
 
-        with patch('app.routes.search.service.fetch_all') as mock_fetch:
-            mock_fetch.return_value = mock_result
+        with patch('app.routes.search.service.stream_pages') as mock_stream:
+            mock_stream.return_value = [mock_result.trials]
 
             response = client.get('/export?compound=test')
 
@@ -263,8 +280,8 @@ class TestSearchRoutes:
             truncated=False
         )
 
-        with patch('app.routes.search.service.fetch_all') as mock_fetch:
-            mock_fetch.return_value = mock_result
+        with patch('app.routes.search.service.stream_pages') as mock_stream:
+            mock_stream.return_value = [mock_result.trials]
 
             response = client.get('/export?compound=test')
 
@@ -312,3 +329,279 @@ class TestSearchRoutes:
 
             assert b'Export CSV' in response.data
             assert b'/export' in response.data
+
+    def test_stats_returns_transport_stats(self, client):
+        """Test that stats endpoint exposes connection pool statistics."""
+        response = client.get('/stats')
+
+        assert response.status_code == 200
+        assert 'transport' in response.get_json()
+        assert 'pools' in response.get_json()['transport']
+
+    def test_search_export_link_includes_result_handle(self, client):
+        """Test that the export link carries a handle to the stored result."""
+        mock_result = SearchResult(trials=[], total_count=0, truncated=False)
+
+        with patch('app.routes.search.service.fetch_all') as mock_fetch:
+            mock_fetch.return_value = mock_result
+
+            response = client.get('/search?compound=test')
+
+            assert b'/export?handle=' in response.data
+
+    def test_export_reuses_search_result_by_handle(self, client):
+        """Test that export serves the stored result without refetching."""
+        from app.routes.search import _store_result
+
+        result = SearchResult(
+            trials=[
+                Trial(
+                    nct_id="NCT00000042",
+                    title="Stored Trial",
+                    phase="PHASE3",
+                    status="COMPLETED",
+                    sponsor="Sponsor",
+                    conditions=[],
+                    interventions=[]
+                )
+            ],
+            total_count=1,
+            truncated=False
+        )
+        handle = _store_result(result)
+
+        with patch('app.routes.search.service.stream_pages') as mock_stream:
+            response = client.get(f'/export?handle={handle}&compound=test')
+
+            mock_stream.assert_not_called()
+            assert 'NCT00000042' in response.data.decode('utf-8')
+
+    def test_export_refetches_when_handle_expired(self, client):
+        """Test that an unknown or expired handle falls back to the API."""
+        mock_result = SearchResult(trials=[], total_count=0, truncated=False)
+
+        with patch('app.routes.search.service.stream_pages') as mock_stream:
+            mock_stream.return_value = [mock_result.trials]
+
+            response = client.get('/export?handle=expired&compound=test')
+
+            assert response.status_code == 200
+            mock_stream.assert_called_once()
+            assert mock_stream.call_args[0][0].compound == 'test'
+
+    def test_bulk_export_ignores_interactive_cap(self, client):
+        """Test that bulk export paginates with the bulk ceiling, not MAX_RESULTS."""
+        pages = iter([
+            ([Trial(
+                nct_id=f"NCT{i:08d}",
+                title=f"Trial {i}",
+                phase="PHASE2",
+                status="RECRUITING",
+                sponsor="Sponsor",
+                conditions=[],
+                interventions=[]
+            ) for i in range(start, start + 2)], 4)
+            for start in (0, 2)
+        ])
+
+        with patch('app.routes.search.service.iter_pages') as mock_pages, \
+                patch('app.routes.search.BULK_EXPORT_MAX_RESULTS', 10000):
+            mock_pages.return_value = pages
+
+            response = client.get('/export?bulk=1&condition=cancer')
+
+            assert mock_pages.call_args.kwargs['max_results'] == 10000
+            assert response.headers['X-Total-Count'] == '4'
+            assert response.headers['X-Export-Truncated'] == 'false'
+            csv_content = response.data.decode('utf-8')
+            assert 'NCT00000000' in csv_content
+            assert 'NCT00000003' in csv_content
+
+    def test_bulk_export_reports_ceiling(self, client):
+        """Test that bulk export flags results beyond the hard ceiling."""
+        with patch('app.routes.search.service.iter_pages') as mock_pages, \
+                patch('app.routes.search.BULK_EXPORT_MAX_RESULTS', 100):
+            mock_pages.return_value = iter([([], 5000)])
+
+            response = client.get('/export?bulk=1&condition=cancer')
+
+            assert response.headers['X-Total-Count'] == '100'
+            assert response.headers['X-Export-Truncated'] == 'true'
+
+    def test_bulk_export_requires_criteria(self, client):
+        """Test that a bulk export without criteria does not walk the registry."""
+        with patch('app.routes.search.service.iter_pages') as mock_pages:
+            response = client.get('/export?bulk=1')
+
+            mock_pages.assert_not_called()
+            assert response.status_code == 400
+            assert 'at least one search criterion' in response.get_json()['error']
+
+    def test_search_shows_bulk_export_link_when_truncated(self, client):
+        """Test that truncated results offer a bulk export link."""
+        mock_result = SearchResult(trials=[], total_count=1000, truncated=True)
+
+        with patch('app.routes.search.service.fetch_all') as mock_fetch:
+            mock_fetch.return_value = mock_result
+
+            response = client.get('/search?condition=cancer')
+
+            assert b'/export?bulk=1&amp;condition=cancer' in response.data
+
+    def test_search_renders_only_first_page(self, client):
+        """Test that results HTML carries one page of rows, sorted by NCT ID."""
+        mock_result = SearchResult(
+            trials=[
+                Trial(
+                    nct_id=f"NCT{i:08d}",
+                    title=f"Trial {i}",
+                    phase="PHASE2",
+                    status="RECRUITING",
+                    sponsor="Sponsor",
+                    conditions=[],
+                    interventions=[]
+                )
+                for i in reversed(range(100))
+            ],
+            total_count=100,
+            truncated=False
+        )
+
+        with patch('app.routes.search.service.fetch_all') as mock_fetch:
+            mock_fetch.return_value = mock_result
+
+            response = client.get('/search?condition=cancer')
+
+            assert b'Showing 100 of 100 trials' in response.data
+            assert b'NCT00000000' in response.data
+            assert b'NCT00000024' in response.data
+            assert b'NCT00000025' not in response.data
+            assert b'deferLoading: 100' in response.data
+
+    def test_trials_api_serves_stored_result(self, client):
+        """Test that the DataTables endpoint pages through a stored result."""
+        from app.routes.search import _store_result
+
+        result = SearchResult(
+            trials=[
+                Trial(
+                    nct_id=f"NCT{i:08d}",
+                    title=f"Trial {i}",
+                    phase="PHASE2",
+                    status="RECRUITING",
+                    sponsor="Sponsor",
+                    conditions=[],
+                    interventions=[]
+                )
+                for i in range(60)
+            ],
+            total_count=60,
+            truncated=False
+        )
+        handle = _store_result(result)
+
+        with patch('app.routes.search.service.fetch_all') as mock_fetch:
+            response = client.get(
+                f'/api/trials?handle={handle}&draw=2&start=25&length=25'
+                '&order[0][column]=0&order[0][dir]=desc'
+            )
+
+            mock_fetch.assert_not_called()
+            data = response.get_json()
+            assert data['draw'] == 2
+            assert data['recordsTotal'] == 60
+            assert len(data['data']) == 25
+            assert data['data'][0]['nct_id'] == 'NCT00000034'
+
+    def test_trials_api_refetches_expired_handle(self, client):
+        """Test that an expired handle falls back to the (cached) search."""
+        mock_result = SearchResult(trials=[], total_count=0, truncated=False)
+
+        with patch('app.routes.search.service.fetch_all') as mock_fetch:
+            mock_fetch.return_value = mock_result
+
+            response = client.get('/api/trials?handle=expired&draw=1&condition=cancer')
+
+            assert mock_fetch.call_args[0][0].condition == 'cancer'
+            assert response.get_json()['recordsTotal'] == 0
+
+    def test_trials_api_expired_handle_requires_criteria(self, client):
+        """Test that an expired handle without criteria does not fetch everything."""
+        with patch('app.routes.search.service.fetch_all') as mock_fetch:
+            response = client.get('/api/trials?handle=unknown&draw=3')
+
+            mock_fetch.assert_not_called()
+            data = response.get_json()
+            assert data['draw'] == 3
+            assert 'at least one search criterion' in data['error']
+
+    def test_facets_api_counts_stored_result(self, client):
+        """Test facet counts for a /search handle without another search."""
+        from app.routes.search import _store_result
+
+        trials = [
+            Trial(nct_id=f"NCT{i:08d}", title="Trial", phase=phase, status=status,
+                  sponsor=sponsor, conditions=[], interventions=[])
+            for i, (phase, status, sponsor) in enumerate([
+                ("PHASE1, PHASE2", "RECRUITING", "Acme"),
+                ("PHASE2", "COMPLETED", "Acme"),
+                ("N/A", "COMPLETED", "Beta"),
+            ])
+        ]
+        handle = _store_result(SearchResult(trials=trials, total_count=700, truncated=True))
+
+        with patch('app.routes.search.service.facets') as mock_facets:
+            response = client.get(f'/api/facets?handle={handle}')
+
+            mock_facets.assert_not_called()
+            data = response.get_json()
+            assert data['phases']['PHASE2'] == 2
+            assert data['phases']['PHASE3'] == 0
+            assert data['statuses']['COMPLETED'] == 2
+            assert data['sponsors'][0] == {'name': 'Acme', 'count': 2}
+            assert data['counted'] == 3
+            assert data['truncated'] is True
+
+    def test_facets_api_queries_service(self, client):
+        """Test that facets without a handle come from the backend."""
+        with patch('app.routes.search.service.facets') as mock_facets:
+            mock_facets.return_value = {'total_count': 0}
+
+            response = client.get('/api/facets?condition=cancer&phases=PHASE2&fetch=1')
+
+            params = mock_facets.call_args[0][0]
+            assert params.condition == 'cancer'
+            assert params.phases == ['PHASE2']
+            assert mock_facets.call_args.kwargs['fetch'] is True
+            assert response.get_json() == {'total_count': 0}
+
+    def test_facets_api_does_not_search_while_typing(self, client):
+        """Test that an uncached query without fetch=1 runs no search."""
+        with patch('app.routes.search.service.fetch_all') as mock_fetch:
+            response = client.get('/api/facets?compound=pembro')
+
+            mock_fetch.assert_not_called()
+            assert response.status_code == 204
+
+    def test_facets_api_requires_criteria(self, client):
+        """Test that facets are not computed for an empty query."""
+        response = client.get('/api/facets')
+
+        assert response.status_code == 400
+
+    def test_facets_api_reports_errors(self, client):
+        """Test that backend failures return a JSON error."""
+        with patch('app.routes.search.service.facets') as mock_facets:
+            mock_facets.side_effect = Exception("API Error")
+
+            response = client.get('/api/facets?condition=cancer')
+
+            assert response.status_code == 502
+            assert 'API Error' in response.get_json()['error']
+
+    def test_index_includes_facet_counts(self, client):
+        """Test that the search form has clickable facet count badges."""
+        response = client.get('/')
+
+        assert b'data-facet="phase" data-value="PHASE2"' in response.data
+        assert b'/api/facets' in response.data
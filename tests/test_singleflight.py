@@ -0,0 +1,187 @@
+import asyncio
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from app.services.singleflight import AsyncSingleFlight, SingleFlight
+from app.services.clinical_trials import ClinicalTrialsService
+from app.models.trial import SearchParams
+
+
+def run_concurrently(n, target):
+    results = [None] * n
+    errors = [None] * n
+
+    def worker(i):
+        try:
+            results[i] = target()
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    return threads, results, errors
+
+
+def wait_until(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, 'condition not reached'
+        time.sleep(0.001)
+
+
+class TestSingleFlight:
+    """Tests for SingleFlight."""
+
+    def test_concurrent_callers_share_one_execution(self):
+        """Test that callers for an in-flight key wait for the same result."""
+        flights = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def slow():
+            calls.append(1)
+            release.wait(5)
+            return 'result'
+
+        threads, results, _ = run_concurrently(5, lambda: flights.do('k', slow))
+        wait_until(lambda: flights.stats()['coalesced'] == 4)
+        release.set()
+        for t in threads:
+            t.join()
+
+        assert calls == [1]
+        assert results == ['result'] * 5
+        assert flights.stats() == {'executed': 1, 'coalesced': 4, 'in_flight': 0}
+
+    def test_errors_propagate_to_waiters(self):
+        """Test that a failed flight raises in every waiting caller."""
+        flights = SingleFlight()
+        release = threading.Event()
+
+        def failing():
+            release.wait(5)
+            raise ValueError('upstream down')
+
+        threads, _, errors = run_concurrently(3, lambda: flights.do('k', failing))
+        wait_until(lambda: flights.stats()['coalesced'] == 2)
+        release.set()
+        for t in threads:
+            t.join()
+
+        assert all(isinstance(e, ValueError) for e in errors)
+
+    def test_sequential_calls_execute_again(self):
+        """Test that completed flights are not reused."""
+        flights = SingleFlight()
+
+        assert flights.do('k', lambda: 1) == 1
+        assert flights.do('k', lambda: 2) == 2
+        assert flights.stats()['executed'] == 2
+
+    def test_leader_error_is_raised(self):
+        """Test that the executing caller sees its own exception."""
+        flights = SingleFlight()
+
+        def failing():
+            raise ValueError('boom')
+
+        with pytest.raises(ValueError):
+            flights.do('k', failing)
+        assert flights.stats()['in_flight'] == 0
+
+
+class TestAsyncSingleFlight:
+    """Tests for AsyncSingleFlight."""
+
+    def test_concurrent_coroutines_share_one_task(self):
+        """Test that coroutines awaiting an in-flight key get the same result."""
+        flights = AsyncSingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return object()
+
+        async def main():
+            return await asyncio.gather(*(flights.do('k', fetch) for _ in range(5)))
+
+        results = asyncio.run(main())
+
+        assert len(calls) == 1
+        assert all(r is results[0] for r in results)
+        assert flights.stats() == {'executed': 1, 'coalesced': 4, 'in_flight': 0}
+
+    def test_errors_reach_every_waiter(self):
+        """Test that a failing task raises in every coroutine awaiting it."""
+        flights = AsyncSingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError('boom')
+
+        async def main():
+            return await asyncio.gather(
+                *(flights.do('k', fail) for _ in range(3)), return_exceptions=True
+            )
+
+        results = asyncio.run(main())
+
+        assert all(isinstance(r, ValueError) for r in results)
+
+    def test_cancelled_waiter_does_not_cancel_shared_task(self):
+        """Test that other waiters still get the result when one is cancelled."""
+        flights = AsyncSingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.02)
+            return 'done'
+
+        async def main():
+            first = asyncio.ensure_future(flights.do('k', fetch))
+            second = asyncio.ensure_future(flights.do('k', fetch))
+            await asyncio.sleep(0)
+            first.cancel()
+            return await second
+
+        assert asyncio.run(main()) == 'done'
+
+
+class TestServiceSingleFlight:
+    """Tests for request coalescing in ClinicalTrialsService."""
+
+    def test_concurrent_identical_searches_fetch_once(self, sample_api_response):
+        """Test that equivalent concurrent searches share one upstream fetch."""
+        release = threading.Event()
+
+        def get(url, params=None):
+            release.wait(5)
+            response = Mock()
+            response.json.return_value = sample_api_response
+            return response
+
+        transport = Mock()
+        transport.get.side_effect = get
+        service = ClinicalTrialsService(transport=transport)
+
+        queries = iter([SearchParams(compound="Drug")] + [SearchParams(compound=" drug ")] * 7)
+        lock = threading.Lock()
+
+        def search():
+            with lock:
+                params = next(queries)
+            return service.fetch_all(params)
+
+        threads, results, _ = run_concurrently(8, search)
+        wait_until(lambda: service.flights.stats()['coalesced'] == 7)
+        release.set()
+        for t in threads:
+            t.join()
+
+        assert transport.get.call_count == 1
+        assert all(r is results[0] for r in results)
+        assert service.stats()['single_flight']['executed'] == 1
@@ -0,0 +1,137 @@
+import json
+from unittest.mock import Mock
+
+import pytest
+
+from app.models.trial import SearchParams
+from app.services.clinical_trials import ClinicalTrialsService
+from app.services.study_stream import StudyStream
+
+
+def split(body, size):
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+
+def feed_all(stream, chunks):
+    studies = []
+    for chunk in chunks:
+        studies.extend(stream.feed(chunk))
+    return studies
+
+
+class TestStudyStream:
+    """Tests for incremental splitting of page bodies."""
+
+    @pytest.mark.parametrize('size', [1, 2, 7, 64, 100000])
+    def test_studies_match_full_decode(self, sample_api_response, size):
+        """Test that any chunking yields the same studies and envelope."""
+        page = dict(sample_api_response, nextPageToken="abc")
+        body = json.dumps(page, indent=1).encode()
+        stream = StudyStream()
+
+        studies = feed_all(stream, split(body, size))
+
+        assert studies == page["studies"]
+        assert stream.header == {"totalCount": page["totalCount"], "studies": []}
+        assert stream.close()["nextPageToken"] == "abc"
+
+    def test_brackets_and_keys_inside_strings_are_ignored(self):
+        """Test that string contents never affect nesting."""
+        study = {"title": 'a "studies": [ {x} ] \\ ]}', "nested": [[1, {"b": "}"}], []]}
+        body = json.dumps({"studies": [study, study]}).encode()
+
+        assert feed_all(StudyStream(), split(body, 3)) == [study, study]
+
+    def test_studies_are_released_as_they_complete(self):
+        """Test that a study is returned as soon as its closing brace arrives."""
+        stream = StudyStream()
+
+        assert stream.feed(b'{"totalCount": 2, "studies": [{"a": 1}, {"b"') == [{"a": 1}]
+        assert stream.header == {"totalCount": 2, "studies": []}
+        assert stream.feed(b': 2}]}') == [{"b": 2}]
+        assert stream.close() == {"totalCount": 2, "studies": []}
+
+    def test_only_the_study_in_progress_is_buffered(self):
+        """Test that completed studies are dropped from the buffer."""
+        stream = StudyStream()
+        stream.feed(b'{"studies": [' + (b'{"x": "' + b'y' * 1000 + b'"}, ') * 50)
+
+        assert len(stream._buffer) < 100
+
+    def test_page_without_studies(self):
+        """Test an envelope-only body."""
+        stream = StudyStream()
+
+        assert stream.feed(b'{"totalCount": 0}') == []
+        assert stream.close() == {"totalCount": 0}
+
+    def test_truncated_body_is_an_error(self):
+        """Test that a body cut off inside the studies array is rejected."""
+        stream = StudyStream()
+        stream.feed(b'{"studies": [{"a": 1}, {"b"')
+
+        with pytest.raises(ValueError):
+            stream.close()
+
+
+class TestStreamedPages:
+    """Tests for ClinicalTrialsService.iter_pages(stream=True)."""
+
+    def make_service(self, pages, chunk_size=50):
+        transport = Mock()
+        responses = []
+        for page in pages:
+            response = Mock()
+            body = json.dumps(page).encode()
+            response.iter_content.return_value = split(body, chunk_size)
+            responses.append(response)
+        transport.get.side_effect = responses
+        return ClinicalTrialsService(transport=transport), responses
+
+    def test_yields_trials_while_pages_download(
+        self, sample_api_response_page1, sample_api_response_page2
+    ):
+        """Test batches across pages, totals and page token handling."""
+        service, responses = self.make_service(
+            [sample_api_response_page1, sample_api_response_page2]
+        )
+
+        batches = list(service.iter_pages(SearchParams(condition="Cancer"), stream=True))
+
+        assert len(batches) > 2
+        assert sum(len(trials) for trials, _ in batches) == 150
+        assert all(total == 150 for _, total in batches)
+        calls = service.transport.get.call_args_list
+        assert all(call.kwargs['stream'] is True for call in calls)
+        assert calls[1].kwargs['params']['pageToken'] == "token123"
+        assert all(response.close.called for response in responses)
+
+    def test_stops_at_max_results(self, sample_api_response_page1):
+        """Test that streaming stops mid-page once max_results is reached."""
+        service, responses = self.make_service([sample_api_response_page1])
+
+        batches = list(service.iter_pages(SearchParams(), max_results=10, stream=True))
+
+        assert sum(len(trials) for trials, _ in batches) == 10
+        assert service.transport.get.call_count == 1
+        responses[0].close.assert_called_once()
+
+    def test_empty_result_yields_one_empty_page(self, empty_api_response):
+        """Test that callers reading the first page still get the total."""
+        service, _ = self.make_service([empty_api_response])
+
+        assert list(service.iter_pages(SearchParams(), stream=True)) == [([], 0)]
+
+    def test_total_count_after_studies(self, sample_api_response_page1,
+                                       sample_api_response_page2):
+        """Test that a totalCount sent after the studies array is still reported."""
+        reordered = [
+            {key: page[key] for key in sorted(page, key=lambda key: key == 'totalCount')}
+            for page in (sample_api_response_page1, sample_api_response_page2)
+        ]
+        service, _ = self.make_service(reordered)
+
+        batches = list(service.iter_pages(SearchParams(condition="Cancer"), stream=True))
+
+        assert sum(len(trials) for trials, _ in batches) == 150
+        assert all(total == 150 for _, total in batches)
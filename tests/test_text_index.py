@@ -0,0 +1,172 @@
+import pytest
+
+from app.mirror.backend import LocalTrialsBackend
+from app.mirror.loader import load_studies
+from app.mirror.store import TrialStore
+from app.mirror.text_index import (
+    BUILT_FROM, TextIndex, decode_postings, encode_postings, intersect, parse_query, union
+)
+from app.models.trial import SearchParams
+from tests.conftest import make_study, nct_ids
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = TrialStore(str(tmp_path / 'mirror.db'))
+    load_studies(store, [
+        make_study("NCT00000001", title="Pembrolizumab After Surgery",
+                   conditions=["Non-Small Cell Lung Cancer"], interventions=["Pembrolizumab"]),
+        make_study("NCT00000002", title="Checkpoint Inhibitors in Lung Cancer",
+                   conditions=["Lung Cancer", "Cell Damage"],
+                   interventions=["Nivolumab", "Placebo"]),
+        make_study("NCT00000003", title="Adjuvant Therapy",
+                   conditions=["Breast Cancer"], interventions=["Pembrolizumab", "Paclitaxel"]),
+        make_study("NCT00000004", title="Inhaler Study",
+                   conditions=["Asthma"], interventions=["Drug X"]),
+    ])
+    return store
+
+
+@pytest.fixture
+def index(store):
+    index = TextIndex(store)
+    index.rebuild()
+    return index
+
+
+def studies(store, ids):
+    return nct_ids(store.search(SearchParams(), 100, ids=ids))
+
+
+class TestPostings:
+    """Tests for posting list encoding and merging."""
+
+    def test_encoding_round_trips(self):
+        """Test delta encoding of sorted ids."""
+        ids = [3, 4, 90, 70000, 4000000]
+
+        assert list(decode_postings(encode_postings(ids))) == ids
+        assert list(decode_postings(encode_postings([]))) == []
+
+    def test_intersect_balanced_and_skewed_lists(self):
+        """Test both intersection strategies."""
+        assert list(intersect([1, 3, 5, 7], [3, 4, 5, 6])) == [3, 5]
+        assert list(intersect([5, 999], list(range(0, 1000, 5)))) == [5]
+
+    def test_union_merges_sorted_lists(self):
+        """Test union of posting lists."""
+        assert list(union([[1, 5], [2, 5, 9]])) == [1, 2, 5, 9]
+        assert list(union([])) == []
+
+    def test_parse_query(self):
+        """Test phrase, prefix and term clauses."""
+        assert parse_query('"lung cancer" pembro* Non-Small x') == [
+            ('phrase', ['lung', 'cancer']),
+            ('prefix', ['pembro']),
+            ('phrase', ['non', 'small']),
+            ('term', ['x']),
+        ]
+        assert parse_query('  "" * ') == []
+
+
+class TestTextIndex:
+    """Tests for TextIndex queries."""
+
+    def test_terms_must_all_match(self, store, index):
+        """Test that every term is required, in any order."""
+        assert studies(store, index.match(('condition',), 'cancer LUNG')) == [
+            "NCT00000001", "NCT00000002"
+        ]
+        assert studies(store, index.match(('condition',), 'lun')) == []
+
+    def test_prefix_query(self, store, index):
+        """Test that word* matches any term with that prefix."""
+        assert studies(store, index.match(('intervention',), 'p*')) == [
+            "NCT00000001", "NCT00000002", "NCT00000003"
+        ]
+
+    def test_phrase_queries(self, store, index):
+        """Test that phrases match contiguous words within one name."""
+        assert studies(store, index.match(('condition',), '"cell lung cancer"')) == [
+            "NCT00000001"
+        ]
+        # "Lung Cancer" and "Cell Damage" are separate conditions
+        assert studies(store, index.match(('condition',), '"cancer cell"')) == []
+        assert studies(store, index.match(('condition',), '"small cell lung cancer"')) == [
+            "NCT00000001"
+        ]
+
+    def test_fields_are_ored(self, store, index):
+        """Test that a term may match any of the given fields."""
+        assert studies(store, index.match(('condition', 'title'), 'pembrolizumab')) == [
+            "NCT00000001"
+        ]
+
+    def test_query_without_tokens(self, index):
+        """Test that empty queries do not filter."""
+        assert index.match(('condition',), '') is None
+
+    def test_index_goes_stale_after_updates(self, store, index):
+        """Test that new or synced studies invalidate the index."""
+        assert index.is_current()
+
+        load_studies(store, [make_study("NCT00000005", last_update="2024-05-01")])
+
+        assert not index.is_current()
+        index.rebuild()
+        assert index.is_current()
+
+    def test_posting_cache_is_bounded(self, store):
+        """Test LRU eviction of decoded posting lists."""
+        index = TextIndex(store, cache_terms=2)
+        index.rebuild()
+
+        for term in ('lung', 'cancer', 'asthma'):
+            index.postings('condition', term)
+
+        assert list(index._cache) == [('condition', 'cancer'), ('condition', 'asthma')]
+
+
+class TestIndexedBackend:
+    """Tests for LocalTrialsBackend with a text index."""
+
+    def test_backend_uses_current_index(self, store, index):
+        """Test phrase and title matching through the backend."""
+        backend = LocalTrialsBackend(store, index)
+
+        result = backend.fetch_all(SearchParams(condition='"lung cancer"', compound="pembro*"))
+
+        assert nct_ids(result.trials) == ["NCT00000001"]
+        assert backend.stats()['timings']['text_index']['count'] == 1
+
+    def test_backend_falls_back_to_scan_when_stale(self, store):
+        """Test that an unbuilt index is bypassed."""
+        backend = LocalTrialsBackend(store)
+
+        result = backend.fetch_all(SearchParams(condition="checkpoint", statuses=["RECRUITING"]))
+
+        assert nct_ids(result.trials) == ["NCT00000002"]
+        assert 'text_index' not in backend.stats()['timings']
+        assert backend.stats()['text_index'] is False
+
+    @pytest.mark.parametrize('params', [
+        SearchParams(compound="pembro*"),
+        SearchParams(compound="p*", condition="cancer"),
+        SearchParams(condition='"lung cancer"'),
+        SearchParams(condition='"cancer cell"'),
+        SearchParams(condition='"small cell lung cancer"'),
+        SearchParams(condition="non-small"),
+        SearchParams(condition="lung cancer", compound="nivolumab"),
+        SearchParams(condition="lun"),
+    ])
+    def test_scan_matches_index(self, store, index, params):
+        """Test that the SQL fallback and the index agree on every query form."""
+        backend = LocalTrialsBackend(store, index)
+        indexed = backend.fetch_all(params)
+
+        store.set_state(BUILT_FROM, 'stale')
+        result = backend.fetch_all(params)
+
+        assert backend.stats()['text_index'] is False
+        assert nct_ids(result.trials) == nct_ids(indexed.trials)
+        assert result.total_count == indexed.total_count
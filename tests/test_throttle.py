@@ -0,0 +1,169 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.models.trial import SearchParams
+from app.services.throttle import (
+    ConcurrencyGovernor, SharedTokenBucket, TokenBucket, UpstreamThrottle
+)
+from tests.test_async_service import make_service
+
+
+class TestTokenBucket:
+    """Tests for the in-process and SQLite token buckets."""
+
+    def test_burst_then_rate(self, clock):
+        """Test that a full bucket allows burst requests, then one per 1/rate."""
+        bucket = TokenBucket(rate=2, burst=3, clock=clock)
+
+        assert [bucket.reserve() for _ in range(3)] == [0, 0, 0]
+        assert bucket.reserve() == 0.5
+        assert bucket.reserve() == 1.0
+
+    def test_refills_over_time_up_to_burst(self, clock):
+        """Test that idle time refills the bucket but never past burst."""
+        bucket = TokenBucket(rate=1, burst=2, clock=clock)
+        bucket.reserve()
+        bucket.reserve()
+
+        clock.now += 60
+
+        assert [bucket.reserve() for _ in range(3)] == [0, 0, 1.0]
+
+    def test_shared_bucket_spans_instances(self, tmp_path, clock):
+        """Test that two workers using one file draw from one balance."""
+        path = str(tmp_path / 'limits' / 'rate.sqlite3')
+        first = SharedTokenBucket(path, rate=1, burst=2, clock=clock)
+        second = SharedTokenBucket(path, rate=1, burst=2, clock=clock)
+
+        assert first.reserve() == 0
+        assert second.reserve() == 0
+        assert first.reserve() == 1.0
+        assert second.reserve() == 2.0
+
+        clock.now += 10
+        assert second.reserve() == 0
+
+
+class TestConcurrencyGovernor:
+    """Tests for the in-flight request cap."""
+
+    def test_threads_never_exceed_limit(self):
+        """Test that blocked threads queue for a slot."""
+        governor = ConcurrencyGovernor(3)
+        lock = threading.Lock()
+        active = []
+        peak = []
+
+        def work():
+            governor.acquire()
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(0.01)
+            with lock:
+                active.pop()
+            governor.release()
+
+        threads = [threading.Thread(target=work) for _ in range(12)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert max(peak) == 3
+        assert governor.in_flight == 0
+        assert governor.waiting == 0
+
+    def test_coroutines_queue_in_order(self):
+        """Test that awaiting coroutines are served first come, first served."""
+        governor = ConcurrencyGovernor(1)
+        order = []
+
+        async def work(i):
+            queued = await governor.acquire_async()
+            order.append((i, queued))
+            await asyncio.sleep(0.001)
+            governor.release()
+
+        async def main():
+            await asyncio.gather(*(work(i) for i in range(5)))
+
+        asyncio.run(main())
+
+        assert order == [(0, False), (1, True), (2, True), (3, True), (4, True)]
+        assert governor.in_flight == 0
+
+    def test_cancelled_waiter_gives_up_its_place(self):
+        """Test that cancelling a queued coroutine does not leak a slot."""
+        governor = ConcurrencyGovernor(1)
+
+        async def main():
+            await governor.acquire_async()
+            waiter = asyncio.ensure_future(governor.acquire_async())
+            await asyncio.sleep(0)
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+            governor.release()
+            assert await governor.acquire_async() is False
+            governor.release()
+
+        asyncio.run(main())
+
+        assert governor.in_flight == 0
+        assert governor.waiting == 0
+
+
+class TestUpstreamThrottle:
+    """Tests for UpstreamThrottle and its use by the services."""
+
+    def test_zero_disables_limits(self):
+        """Test that a rate and limit of 0 never wait."""
+        throttle = UpstreamThrottle(rate=0, max_concurrent=0)
+        slept = []
+
+        for _ in range(50):
+            with throttle.slot(sleep=slept.append):
+                pass
+
+        assert slept == []
+        assert throttle.stats()['requests'] == 50
+
+    def test_slot_sleeps_for_rate(self):
+        """Test that requests past the burst wait and are counted as throttled."""
+        throttle = UpstreamThrottle(rate=10, burst=1, max_concurrent=2, path=None)
+        slept = []
+
+        for _ in range(3):
+            with throttle.slot(sleep=slept.append):
+                assert throttle.governor.in_flight == 1
+
+        assert len(slept) == 2
+        stats = throttle.stats()
+        assert stats['throttled'] == 2
+        assert stats['timings']['rate_wait']['count'] == 2
+        assert stats['in_flight'] == 0
+        assert stats['max_concurrent'] == 2
+
+    def test_async_service_respects_concurrency(self, sample_api_response_page1,
+                                                sample_api_response_page2):
+        """Test that concurrent async searches share the upstream slots."""
+        pages = {None: sample_api_response_page1, "token123": sample_api_response_page2}
+        service = make_service(pages, delay=0.01)
+        service.service.throttle = UpstreamThrottle(rate=0, max_concurrent=5)
+
+        async def main():
+            await asyncio.gather(*(
+                service.fetch_all(SearchParams(condition=f"Cancer {i}")) for i in range(20)
+            ))
+
+        asyncio.run(main())
+
+        stats = service.service.throttle.stats()
+        assert service.transport.max_in_flight == 5
+        assert stats['requests'] == 40
+        assert stats['queued'] > 0
+        assert stats['timings']['queue_wait']['count'] == stats['queued']
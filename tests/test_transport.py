@@ -0,0 +1,75 @@
+import threading
+from unittest.mock import patch, Mock
+
+from app.services.transport import PooledTransport
+from app.services.clinical_trials import ClinicalTrialsService
+from app.models.trial import SearchParams
+
+
+class TestPooledTransport:
+    """Tests for PooledTransport."""
+
+    def test_get_passes_explicit_timeouts(self):
+        """Test that connect and read timeouts are sent with every request."""
+        transport = PooledTransport(connect_timeout=2, read_timeout=7)
+
+        with patch('app.services.transport.requests.Session.get') as mock_get:
+            transport.get('https://example.org/api', params={'a': 1})
+
+            assert mock_get.call_args.kwargs['timeout'] == (2, 7)
+            assert mock_get.call_args.kwargs['params'] == {'a': 1}
+
+    def test_session_is_reused_within_thread(self):
+        """Test that a thread keeps using the same session."""
+        transport = PooledTransport()
+
+        assert transport.session is transport.session
+        assert transport.stats()['sessions'] == 1
+
+    def test_threads_get_own_sessions_sharing_one_adapter(self):
+        """Test that per-thread sessions all mount the shared adapter."""
+        transport = PooledTransport()
+        sessions = []
+
+        def worker():
+            sessions.append(transport.session)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len({id(s) for s in sessions}) == 4
+        for session in sessions:
+            assert session.get_adapter('https://clinicaltrials.gov') is transport.adapter
+
+    def test_adapter_uses_configured_pool_size(self):
+        """Test that pool sizing is applied to the adapter."""
+        transport = PooledTransport(pool_connections=2, pool_maxsize=8)
+
+        assert transport.adapter._pool_connections == 2
+        assert transport.adapter._pool_maxsize == 8
+
+    def test_stats_counts_requests(self):
+        """Test that stats report the number of requests issued."""
+        transport = PooledTransport()
+
+        with patch('app.services.transport.requests.Session.get'):
+            transport.get('https://example.org/api')
+            transport.get('https://example.org/api')
+
+        stats = transport.stats()
+        assert stats['requests'] == 2
+        assert stats['pools'] == []
+
+    def test_service_routes_pages_through_transport(self):
+        """Test that the service fetches pages via its transport."""
+        transport = Mock()
+        transport.get.return_value.json.return_value = {"totalCount": 0, "studies": []}
+        service = ClinicalTrialsService(transport=transport)
+
+        service.fetch_all(SearchParams(compound="test"))
+
+        transport.get.assert_called_once()
+        assert transport.get.call_args.args[0] == service.base_url